@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Microbenchmark: compiled/memoized BG stemmer vs. the previous implementation.
+
+Run from the repository root:
+
+    python benchmarks/bench_bg_stemmer.py
+"""
+
+import re
+import sys
+import timeit
+
+sys.path.insert(0, "src")
+
+from support_bot.services.bg_stemmer import normalize_bulgarian
+from support_bot.services.product_catalog import ProductCatalog
+
+
+def legacy_normalize_bulgarian(word: str) -> str:
+    """The pre-compiled-table implementation, kept verbatim for comparison."""
+
+    word = word.lower()
+    article_endings = ["ята", "ято", "ятo", "та", "то", "ят", "ът", "ьт"]
+    for ending in article_endings:
+        if word.endswith(ending) and len(word) > len(ending) + 2:
+            return word[: -len(ending)]
+    descriptor_endings = ["ската", "ски", "ска", "на", "ен", "ни", "а"]
+    for ending in sorted(descriptor_endings, key=len, reverse=True):
+        if word.endswith(ending) and len(word) > len(ending) + 3:
+            return word[: -len(ending)]
+    return word
+
+
+def catalog_words() -> list[str]:
+    words: list[str] = []
+    for p in ProductCatalog.load().products:
+        words += re.findall(r"[\u0400-\u04FF]+", f"{p.get('name_bg', '')} {p.get('description_bg', '')}")
+    return words
+
+
+def main() -> None:
+    words = catalog_words()
+    mismatches = [w for w in words if normalize_bulgarian(w) != legacy_normalize_bulgarian(w)]
+    print(f"words: {len(words)} ({len(set(words))} distinct), mismatches: {len(mismatches)}")
+
+    def run(fn) -> None:
+        for w in words:
+            fn(w)
+
+    uncached = normalize_bulgarian.__wrapped__
+    for label, fn in [
+        ("legacy", legacy_normalize_bulgarian),
+        ("compiled", uncached),
+        ("compiled+memo", normalize_bulgarian),
+    ]:
+        best = min(timeit.repeat(lambda: run(fn), number=20, repeat=5)) / 20
+        print(f"{label:>14}: {best * 1e3:8.3f} ms per pass ({best / len(words) * 1e9:6.0f} ns/word)")
+
+    if mismatches:
+        raise SystemExit(f"stems differ for: {sorted(set(mismatches))[:10]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Catalog search latency vs. catalog size: reference scan, vocabulary scan and
+n-gram index candidate lookup.
+
+Run from the repository root:
+
+    python benchmarks/bench_catalog_search.py
+"""
+
+import sys
+import time
+
+sys.path.insert(0, "src")
+sys.path.insert(0, "benchmarks")
+
+from mem_compact_catalog import synthetic_products
+
+from support_bot.services.product_catalog import ProductCatalog
+
+QUERIES = [("ltra", "en"), ("wireless", "en"), ("12345", "en"), ("преносим", "bg"), ("цифров еко", "bg")]
+
+
+def timed(fn, repeat: int = 5) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e3
+
+
+def main() -> None:
+    print(f"{'products':>9} {'query':>12} {'scan ms':>9} {'vocab ms':>9} {'ngram ms':>9} {'search ms':>10}")
+    for n in (10_000, 40_000, 160_000):
+        catalog = ProductCatalog(products=synthetic_products(n))
+        index = catalog.index
+        for keyword, language in QUERIES:
+            needle = keyword.split()[0].lower()
+            scan = timed(lambda: catalog.search(keyword, language, use_index=False), repeat=1) if n <= 40_000 else float("nan")
+            vocab = timed(lambda: [index.postings[language][t] for t in index.matching_tokens(needle, language)])
+            ngram = timed(lambda: [index.postings[language][t] for t in index.ngram_tokens(needle, language)])
+            search = timed(lambda: catalog.search(keyword, language, limit=10))
+            print(f"{n:>9} {keyword:>12} {scan:9.2f} {vocab:9.2f} {ngram:9.2f} {search:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Sharded catalog search throughput for 1..N worker processes vs. in-process search.
+
+Run from the repository root:
+
+    python benchmarks/bench_catalog_shards.py [n_products] [max_shards]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, "src")
+sys.path.insert(0, "benchmarks")
+
+from mem_compact_catalog import synthetic_products
+
+from support_bot.services.product_catalog import ProductCatalog
+
+# Broad terms: many candidates per query, so scoring dominates.
+QUERIES = [("pro", "en"), ("smart wireless", "en"), ("a", "en"), ("преносим", "bg"), ("е", "bg")]
+
+
+def timed(search, repeat: int = 3) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for keyword, language in QUERIES:
+            search(keyword, language, limit=10)
+    return (time.perf_counter() - started) / (repeat * len(QUERIES)) * 1e3
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    max_shards = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    catalog = ProductCatalog(products=synthetic_products(n))
+    base = timed(catalog.search)
+    print(f"{n} products, {os.cpu_count()} CPUs")
+    print(f"{'shards':>7} {'ms/query':>9} {'speedup':>8}")
+    print(f"{'-':>7} {base:9.2f} {1.0:8.2f}")
+    for shards in range(1, max_shards + 1):
+        with catalog.with_shards(shards) as sharded:
+            sharded.search("warmup")
+            ms = timed(sharded.search)
+        print(f"{shards:>7} {ms:9.2f} {base / ms:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
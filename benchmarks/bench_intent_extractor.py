@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""Intent extraction throughput: the single-scan `extract_intent` vs. the previous
+per-message regex pipeline (kept below verbatim for comparison).
+
+Over 50 000 messages the single scan measures about 1.25x the legacy throughput
+(1.2-1.35x across runs), not the 1.5x first reported for this change.
+
+Run from the repository root:
+
+    python benchmarks/bench_intent_extractor.py [n_messages]
+"""
+
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, "src")
+
+from support_bot.agent.archetypes.context_builder import STOPWORDS, extract_intent
+
+TEMPLATES = [
+    "Do you sell {p}?",
+    "What is the price of the {p}?",
+    "I want a {p} and the status of order #{o}",
+    "Where is my order {o}?",
+    "status {o}",
+    "Tell me about '{p}' please",
+    "Need something for my {p} today",
+    "Имате ли {pb}?",
+    "Търся {pb} за вкъщи",
+    "Цена на {pb}",
+    "Какъв е статусът на поръчка {o}?",
+    "Искам {pb} и поръчка #{o}",
+    "hello there",
+    "Здравей",
+]
+PRODUCTS = ["headphones", "smart watch", "Pro", "laptop stand", "coffee grinder", "keyboards"]
+PRODUCTS_BG = ["слушалки", "смарт часовник", "лаптоп", "кафемелачка", "клавиатура"]
+
+
+def legacy_extract(text):
+    is_bulgarian = bool(re.search(r"[\u0400-\u04FF]", text))
+    language = "bg" if is_bulgarian else "en"
+    return (
+        language,
+        legacy_order_id(text),
+        legacy_product_term(text=text, language=language, is_bulgarian=is_bulgarian),
+    )
+
+
+def ambiguous(text: str, language: str) -> bool:
+    """Whether the fallback product word is a tie between equally short words."""
+
+    if language == "bg":
+        words = set(re.findall(r"[\u0400-\u04FF]{3,}", text))
+    else:
+        words = set(re.findall(r"\b[a-z]{3,}\b", text.lower()))
+    lengths = [len(w) for w in words if w.lower() not in STOPWORDS]
+    return bool(lengths) and lengths.count(min(lengths)) > 1
+
+
+def corpus(n: int, seed: int = 3) -> list[str]:
+    rnd = random.Random(seed)
+    return [
+        rnd.choice(TEMPLATES).format(p=rnd.choice(PRODUCTS), pb=rnd.choice(PRODUCTS_BG), o=rnd.randint(100, 99999))
+        for _ in range(n)
+    ]
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    messages = corpus(n)
+
+    started = time.perf_counter()
+    legacy = [legacy_extract(m) for m in messages]
+    legacy_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    current = [extract_intent(m) for m in messages]
+    current_s = time.perf_counter() - started
+
+    same = ties = 0
+    for message, old, new in zip(messages, legacy, current):
+        if old == (new.language, new.order_id, new.product_term):
+            same += 1
+        elif old[:2] == (new.language, new.order_id) and ambiguous(message, old[0]):
+            ties += 1
+    # The legacy pipeline breaks ties between equally short words by set order.
+    print(f"{n} messages: {same} identical, {ties} differ only in tie-breaks, {n - same - ties} other differences")
+    print(f"legacy : {n / legacy_s:10.0f} msg/s")
+    print(f"single : {n / current_s:10.0f} msg/s  ({legacy_s / current_s:.2f}x)")
+
+
+# --- previous ContextBuilder extraction, unchanged -----------------------------------
+
+def legacy_order_id(text: str) -> str | None:
+    order_match = re.search(r"#?([0-9]{3,})", text)
+    if not order_match:
+        return None
+    return order_match.group(1)
+
+def legacy_product_term(*, text: str, language: str, is_bulgarian: bool) -> str | None:
+    # Important: allow multi-tool queries like:
+    # "What's the price of the 'Pro' model and status of order #123?"
+    # So we do NOT early-exit on order keywords.
+    #
+    # But we DO avoid false positives where the extracted term is literally "order"
+    # or "status" (these are order-intent tokens, not product terms).
+
+    qmatch = re.search(r"(?:(?<=\s)|(?<=^))'([^']+?)'(?=(?:\s|[.,?!]|$))|\"([^\"]+?)\"", text)
+    if qmatch:
+        candidate = (qmatch.group(1) or qmatch.group(2) or "").strip()
+        return candidate or None
+
+    patterns: list[tuple[str, str]] = [
+        (r"(?:sell|have|price\s+of|about|get|want)\s+(?:a\s+)?(?:an\s+)?(?:the\s+)?(.+?)(?:[?!.,]|$)", "en"),
+        (r"(?:търся|цена\s+на)\s+(.+?)(?:[?!.,]|$)", "bg"),
+        (r"(?:имате|имат|имаш)\s+(?:ли\s+)?(.+?)(?:[?!.,]|$)", "bg"),
+    ]
+
+    prod_term: str | None = None
+    for pattern, lang in patterns:
+        if language != lang:
+            continue
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            phrase = match.group(1).strip() if match.lastindex else match.group(0)
+            prod_term = phrase
+            break
+
+    if not prod_term:
+        common_words = {
+            "do",
+            "you",
+            "sell",
+            "have",
+            "what",
+            "can",
+            "is",
+            "it",
+            "the",
+            "a",
+            "an",
+            "or",
+            "and",
+            "price",
+            "of",
+            "for",
+            "with",
+            "in",
+            "on",
+            "at",
+            "to",
+            "that",
+            "this",
+            "about",
+            "does",
+            "need",
+            "get",
+            "want",
+            "да",
+            "вие",
+            "продавате",
+            "имате",
+            "имаш",
+            "ли",
+            "какво",
+            "е",
+            "цена",
+            "на",
+            "какъв",
+            "има",
+            "по",
+            "един",
+            "в",
+            "с",
+            "от",
+            "за",
+            "то",
+            "търся",
+            "той",
+            "тя",
+            "трябва",
+            "можеш",
+            "мога",
+            "можете",
+        }
+
+        if is_bulgarian:
+            words = re.findall(r"[\u0400-\u04FF]{3,}", text, re.IGNORECASE)
+        else:
+            words = re.findall(r"\b[a-z]{3,}\b", text.lower())
+
+        product_words = [w for w in set(words) if w.lower() not in common_words]
+        if product_words:
+            prod_term = min(product_words, key=lambda w: len(w))
+
+    if prod_term:
+        lowered = prod_term.strip().lower()
+        if lowered in {"order", "status", "поръчка", "статус"}:
+            return None
+
+    if prod_term and language == "en" and prod_term.endswith("s"):
+        singular = prod_term[:-1]
+        if len(singular) >= 3:
+            prod_term = singular
+
+    return prod_term
+
+
+if __name__ == "__main__":
+    main()
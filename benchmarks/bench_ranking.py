@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Rule-based scorer vs. BM25 engine: latency on a synthetic catalog and a small
+relevance check on the EN/BG queries used in tests/test_articles_multiword.py.
+
+Run from the repository root:
+
+    python benchmarks/bench_ranking.py [n_products]
+"""
+
+import sys
+import time
+
+sys.path.insert(0, "src")
+sys.path.insert(0, "benchmarks")
+
+from mem_compact_catalog import synthetic_products
+
+from support_bot.services import bm25
+from support_bot.services.product_catalog import ProductCatalog
+
+RELEVANCE_QUERIES = [
+    ("електрическата сушилня", "bg"),
+    ("електрическата четка", "bg"),
+    ("електрическа сушилня", "bg"),
+    ("сушилня", "bg"),
+    ("електрическа четка за зъби", "bg"),
+    ("четката за зъби", "bg"),
+    ("pro", "en"),
+    ("smart watch", "en"),
+    ("wireless headphones", "en"),
+    ("coffee maker", "en"),
+]
+
+LATENCY_QUERIES = [("pro", "en"), ("wireless mini", "en"), ("умен", "bg"), ("преносим цифров", "bg")]
+
+
+def relevance() -> None:
+    rules = ProductCatalog.load()
+    ranked = rules.with_ranking("bm25")
+    agree = 0
+    print(f"{'query':30} {'rules top-3':28} {'bm25 top-3':28}")
+    for keyword, language in RELEVANCE_QUERIES:
+        a = [p["id"] for p in rules.search(keyword, language)]
+        b = [p["id"] for p in ranked.search(keyword, language)]
+        assert sorted(a) == sorted(b), "engines must return the same matches"
+        agree += a[:1] == b[:1]
+        print(f"{keyword:30} {','.join(a[:3]):28} {','.join(b[:3]):28}")
+    print(f"top-1 agreement: {agree}/{len(RELEVANCE_QUERIES)}\n")
+
+
+def latency(n: int) -> None:
+    catalog = ProductCatalog(products=synthetic_products(n))
+    started = time.perf_counter()
+    ranked = catalog.with_ranking("bm25")
+    print(f"catalog: {n} products, BM25 build {time.perf_counter() - started:.2f}s, numpy: {bm25.np is not None}")
+    for keyword, language in LATENCY_QUERIES:
+        row = []
+        for engine in (catalog, ranked):
+            started = time.perf_counter()
+            for _ in range(5):
+                engine.search(keyword, language, limit=10)
+            row.append((time.perf_counter() - started) / 5 * 1e3)
+        print(f"{keyword:20} rules {row[0]:8.2f} ms   bm25 {row[1]:8.2f} ms")
+
+
+def main() -> None:
+    relevance()
+    latency(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
+
+
+if __name__ == "__main__":
+    main()
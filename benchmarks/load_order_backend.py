@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Load test for the pooled order-service client against the local stand-in server.
+
+Starts `order_stub_server` in-process with the given latency, then runs concurrent
+lookups drawn from a small hot set of order ids (so coalescing has something to do).
+Reports throughput, latency percentiles and how many upstream requests were needed.
+
+Run from the repository root:
+
+    python benchmarks/load_order_backend.py [workers] [lookups_per_worker] [latency_s] [fail_rate]
+"""
+
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, "src")
+
+from support_bot.services.order_backend import HttpOrderBackend, OrderBackendError
+from support_bot.services.order_stub_server import OrderStubServer
+
+
+def main() -> None:
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    per_worker = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.02
+    fail_rate = float(sys.argv[4]) if len(sys.argv) > 4 else 0.0
+
+    server = OrderStubServer(latency=latency, fail_rate=fail_rate).start()
+    client = HttpOrderBackend(server.url, pool_size=16, max_concurrency=32)
+    hot_ids = [str(10_000 + i) for i in range(200)]
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def worker(seed: int) -> None:
+        nonlocal errors
+        rnd = random.Random(seed)
+        local: list[float] = []
+        failed = 0
+        for _ in range(per_worker):
+            started = time.perf_counter()
+            try:
+                client.status(rnd.choice(hot_ids))
+            except OrderBackendError:
+                failed += 1
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+            errors += failed
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    total = workers * per_worker
+    q = statistics.quantiles(latencies, n=100)
+    print(f"{total} lookups by {workers} workers, upstream latency {latency * 1e3:.0f} ms, fail rate {fail_rate:.0%}")
+    print(f"throughput : {total / elapsed:8.0f} lookups/s")
+    print(f"latency    : p50 {q[49] * 1e3:6.1f} ms   p99 {q[98] * 1e3:6.1f} ms")
+    print(f"upstream   : {server.requests} requests, {client.stats.coalesced} lookups coalesced, errors {errors}")
+    print(f"client     : {client.snapshot()}")
+    client.close()
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Memory comparison: list-of-dicts vs. compact storage for a synthetic catalog.
+
+Measures the records alone (list of dicts vs. CompactProducts) and the whole catalog
+as `ProductCatalog.load` builds it, records plus search index, with compact storage
+off and on.
+
+Run from the repository root:
+
+    python benchmarks/mem_compact_catalog.py [n_products]
+"""
+
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, "src")
+
+from support_bot.services.compact_products import CompactProducts
+from support_bot.services.product_catalog import ProductCatalog
+
+CATEGORIES = ["Wearables", "Audio", "Home", "Kitchen", "Office", "Outdoor", "Gaming", "Health"]
+WORDS = ["smart", "wireless", "portable", "pro", "mini", "max", "ultra", "compact", "digital", "eco"]
+WORDS_BG = ["умен", "безжичен", "преносим", "мини", "макс", "ултра", "компактен", "цифров", "еко"]
+
+
+def synthetic_products(n: int, seed: int = 7) -> list[dict]:
+    rnd = random.Random(seed)
+    products = []
+    for i in range(n):
+        name = " ".join(rnd.choice(WORDS).title() for _ in range(2)) + f" {i}"
+        name_bg = " ".join(rnd.choice(WORDS_BG) for _ in range(2)) + f" {i}"
+        products.append(
+            {
+                "id": f"P{1000 + i}",
+                "name": name,
+                "description": f"{name} with " + " ".join(rnd.choice(WORDS) for _ in range(8)) + ".",
+                "price": round(rnd.uniform(5, 500), 2),
+                "category": rnd.choice(CATEGORIES),
+                "name_bg": name_bg,
+                "description_bg": f"{name_bg} с " + " ".join(rnd.choice(WORDS_BG) for _ in range(8)) + ".",
+            }
+        )
+    return products
+
+
+def measure(build) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def report(label: str, n: int, plain: int, compact: int) -> None:
+    print(f"{label}:")
+    print(f"  plain:   {plain / 2**20:8.1f} MiB ({plain / n:6.0f} B/product)")
+    print(f"  compact: {compact / 2**20:8.1f} MiB ({compact / n:6.0f} B/product)")
+    print(f"  ratio:   {plain / compact:8.2f}x")
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    raw = json.dumps(synthetic_products(n), ensure_ascii=False)
+
+    dicts, dict_bytes = measure(lambda: json.loads(raw))
+    compact, compact_bytes = measure(lambda: CompactProducts.from_products(json.loads(raw)))
+    assert all(dict(compact[i]) == dicts[i] for i in range(0, n, max(1, n // 1000)))
+    del dicts, compact
+
+    fd, name = tempfile.mkstemp(suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(raw)
+        path = Path(name)
+        plain_catalog, plain_bytes = measure(lambda: ProductCatalog.load(path, compact=False))
+        expected = plain_catalog.search("wireless", "en")[:20]
+        del plain_catalog
+        compact_catalog, compact_catalog_bytes = measure(lambda: ProductCatalog.load(path, compact=True))
+        assert [dict(p) for p in compact_catalog.search("wireless", "en")[:20]] == expected
+    finally:
+        os.unlink(name)
+
+    print(f"products: {n}")
+    report("records only (list of dicts vs. CompactProducts)", n, dict_bytes, compact_bytes)
+    report("whole catalog load (records + index)", n, plain_bytes, compact_catalog_bytes)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,120 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from typing import Any
 
 from support_bot.agent.core.models import AgentContext, AgentInput
 from support_bot.agent.governance.memory_manager import MemoryManager
 
+# One scan over the message yields Cyrillic runs, digit runs and whole Latin words of
+# 3+ letters; language, order ids and the fallback product words are all read off
+# those tokens.
+_TOKENS = re.compile(r"([\u0400-\u04FF]+)|([0-9]+)|(?<!\w)([A-Za-z]{3,})(?!\w)")
+
+_QUOTED = re.compile(r"(?:(?<=\s)|(?<=^))'([^']+?)'(?=(?:\s|[.,?!]|$))|\"([^\"]+?)\"")
+
+_PHRASES: dict[str, tuple[re.Pattern[str], ...]] = {
+    "en": (
+        re.compile(
+            r"(?:sell|have|price\s+of|about|get|want)\s+(?:a\s+)?(?:an\s+)?(?:the\s+)?(.+?)(?:[?!.,]|$)",
+            re.IGNORECASE,
+        ),
+    ),
+    "bg": (
+        re.compile(r"(?:търся|цена\s+на)\s+(.+?)(?:[?!.,]|$)", re.IGNORECASE),
+        re.compile(r"(?:имате|имат|имаш)\s+(?:ли\s+)?(.+?)(?:[?!.,]|$)", re.IGNORECASE),
+    ),
+}
+
+STOPWORDS = frozenset(
+    {
+        "do", "you", "sell", "have", "what", "can", "is", "it", "the", "a", "an", "or", "and",
+        "price", "of", "for", "with", "in", "on", "at", "to", "that", "this", "about", "does",
+        "need", "get", "want",
+        "да", "вие", "продавате", "имате", "имаш", "ли", "какво", "е", "цена", "на", "какъв",
+        "има", "по", "един", "в", "с", "от", "за", "то", "търся", "той", "тя", "трябва",
+        "можеш", "мога", "можете",
+    }
+)
+
+# Order-intent tokens: never a product term.
+_ORDER_WORDS = frozenset({"order", "status", "поръчка", "статус"})
+
+
+@dataclass(frozen=True)
+class Intent:
+    language: str
+    order_ids: tuple[str, ...]
+    product_term: str | None
+
+    @property
+    def order_id(self) -> str | None:
+        return self.order_ids[0] if self.order_ids else None
+
+
+def extract_intent(text: str) -> Intent:
+    """Language, distinct order ids (digit runs of 3+) and product term of one message."""
+
+    is_bulgarian = False
+    order_ids: list[str] = []
+    cyrillic_words: list[str] = []
+    latin_words: list[str] = []
+    for cyrillic, digits, latin in _TOKENS.findall(text):
+        if cyrillic:
+            is_bulgarian = True
+            if len(cyrillic) >= 3:
+                cyrillic_words.append(cyrillic)
+        elif digits:
+            if len(digits) >= 3:
+                order_ids.append(digits)
+        else:
+            latin_words.append(latin.lower())
+
+    language = "bg" if is_bulgarian else "en"
+    words = cyrillic_words if is_bulgarian else latin_words
+    return Intent(
+        language=language,
+        order_ids=tuple(dict.fromkeys(order_ids)),
+        product_term=_product_term(text, language, words),
+    )
+
+
+def _product_term(text: str, language: str, words: list[str]) -> str | None:
+    # Important: allow multi-tool queries like:
+    # "What's the price of the 'Pro' model and status of order #123?"
+    # So we do NOT early-exit on order keywords.
+    #
+    # But we DO avoid false positives where the extracted term is literally "order"
+    # or "status" (these are order-intent tokens, not product terms).
+
+    if "'" in text or '"' in text:
+        qmatch = _QUOTED.search(text)
+        if qmatch:
+            candidate = (qmatch.group(1) or qmatch.group(2) or "").strip()
+            return candidate or None
+
+    prod_term: str | None = None
+    for pattern in _PHRASES[language]:
+        match = pattern.search(text)
+        if match:
+            prod_term = match.group(1).strip()
+            break
+
+    if not prod_term:
+        # Shortest non-stopword; ties go to the word that appears first.
+        product_words = [w for w in dict.fromkeys(words) if w.lower() not in STOPWORDS]
+        if product_words:
+            prod_term = min(product_words, key=len)
+
+    if prod_term and prod_term.strip().lower() in _ORDER_WORDS:
+        return None
+
+    if prod_term and language == "en" and prod_term.endswith("s"):
+        singular = prod_term[:-1]
+        if len(singular) >= 3:
+            prod_term = singular
+
+    return prod_term
+
 
 @dataclass
 class ContextBuilder:
@@ -14,135 +123,16 @@ class ContextBuilder:
 
     def build(self, agent_input: AgentInput) -> AgentContext:
         text = (agent_input.user_text or "").strip()
-
-        is_bulgarian = bool(re.search(r"[\u0400-\u04FF]", text))
-        language = "bg" if is_bulgarian else "en"
-
-        order_id = self._extract_order_id(text)
-        product_term = self._extract_product_term(text=text, language=language, is_bulgarian=is_bulgarian)
+        intent = extract_intent(text)
 
         memory_ctx = self.memory.get_context(agent_input.session_id)
 
         return AgentContext(
-            language=language,  # type: ignore[arg-type]
+            language=intent.language,  # type: ignore[arg-type]
             normalized_text=text,
-            order_id=order_id,
-            product_term=product_term,
+            order_id=intent.order_id,
+            product_term=intent.product_term,
             memory=memory_ctx,
+            search_offset=max(0, agent_input.search_offset),
+            order_ids=intent.order_ids,
         )
-
-    @staticmethod
-    def _extract_order_id(text: str) -> str | None:
-        order_match = re.search(r"#?([0-9]{3,})", text)
-        if not order_match:
-            return None
-        return order_match.group(1)
-
-    @staticmethod
-    def _extract_product_term(*, text: str, language: str, is_bulgarian: bool) -> str | None:
-        # Important: allow multi-tool queries like:
-        # "What's the price of the 'Pro' model and status of order #123?"
-        # So we do NOT early-exit on order keywords.
-        #
-        # But we DO avoid false positives where the extracted term is literally "order"
-        # or "status" (these are order-intent tokens, not product terms).
-
-        qmatch = re.search(r"(?:(?<=\s)|(?<=^))'([^']+?)'(?=(?:\s|[.,?!]|$))|\"([^\"]+?)\"", text)
-        if qmatch:
-            candidate = (qmatch.group(1) or qmatch.group(2) or "").strip()
-            return candidate or None
-
-        patterns: list[tuple[str, str]] = [
-            (r"(?:sell|have|price\s+of|about|get|want)\s+(?:a\s+)?(?:an\s+)?(?:the\s+)?(.+?)(?:[?!.,]|$)", "en"),
-            (r"(?:търся|цена\s+на)\s+(.+?)(?:[?!.,]|$)", "bg"),
-            (r"(?:имате|имат|имаш)\s+(?:ли\s+)?(.+?)(?:[?!.,]|$)", "bg"),
-        ]
-
-        prod_term: str | None = None
-        for pattern, lang in patterns:
-            if language != lang:
-                continue
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                phrase = match.group(1).strip() if match.lastindex else match.group(0)
-                prod_term = phrase
-                break
-
-        if not prod_term:
-            common_words = {
-                "do",
-                "you",
-                "sell",
-                "have",
-                "what",
-                "can",
-                "is",
-                "it",
-                "the",
-                "a",
-                "an",
-                "or",
-                "and",
-                "price",
-                "of",
-                "for",
-                "with",
-                "in",
-                "on",
-                "at",
-                "to",
-                "that",
-                "this",
-                "about",
-                "does",
-                "need",
-                "get",
-                "want",
-                "да",
-                "вие",
-                "продавате",
-                "имате",
-                "имаш",
-                "ли",
-                "какво",
-                "е",
-                "цена",
-                "на",
-                "какъв",
-                "има",
-                "по",
-                "един",
-                "в",
-                "с",
-                "от",
-                "за",
-                "то",
-                "търся",
-                "той",
-                "тя",
-                "трябва",
-                "можеш",
-                "мога",
-                "можете",
-            }
-
-            if is_bulgarian:
-                words = re.findall(r"[\u0400-\u04FF]{3,}", text, re.IGNORECASE)
-            else:
-                words = re.findall(r"\b[a-z]{3,}\b", text.lower())
-
-            product_words = [w for w in set(words) if w.lower() not in common_words]
-            if product_words:
-                prod_term = min(product_words, key=lambda w: len(w))
-
-        if prod_term:
-            lowered = prod_term.strip().lower()
-            if lowered in {"order", "status", "поръчка", "статус"}:
-                return None
-
-        if prod_term and language == "en" and prod_term.endswith("s"):
-            singular = prod_term[:-1]
-            if len(singular) >= 3:
-                prod_term = singular
-
-        return prod_term
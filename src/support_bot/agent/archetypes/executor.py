@@ -1,63 +1,352 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any
+import asyncio
+import copy
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field, replace
+from typing import Any, Mapping, Sequence
 
 from support_bot.agent.core.models import AgentContext, PlanStep, ToolResult
-from support_bot.services.order_status import getOrderStatus
-from support_bot.services.product_catalog import file_search_products
+from support_bot.config import executor_concurrent, executor_workers, tool_timeout
+from support_bot.metrics import TOOL_CALLS, TOOL_SECONDS
+from support_bot.services.order_backend import OrderNotFound
+from support_bot.services.order_status import agetOrderStatus, agetOrderStatuses, getOrderStatus, getOrderStatuses
+from support_bot.services.product_catalog import SearchPage, search_products_page
 
 
 @dataclass
 class ExecutionState:
-    products_found: list[dict[str, Any]]
+    products_found: list[Mapping[str, Any]]
     order_info: dict[str, Any] | None
+    # Paging of `products_found` within all matches of the search that produced it.
+    products_page: SearchPage | None = None
+    # Every order looked up; `order_info` is the first of them.
+    orders: list[dict[str, Any]] = field(default_factory=list)
+    # Ids of a bulk lookup the order service does not know.
+    unknown_order_ids: list[str] = field(default_factory=list)
+
+
+# Order ids per bulk lookup in `Executor.execute_batch`.
+ORDER_BATCH_SIZE = 100
+
+_POOL: ThreadPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def _shared_pool() -> ThreadPoolExecutor:
+    """Thread pool shared by every concurrent Executor (created on first use)."""
+
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ThreadPoolExecutor(max_workers=executor_workers(), thread_name_prefix="tool")
+    return _POOL
+
+
+def _order_id_arg(args: Mapping[str, Any]) -> str:
+    order_id = str(args.get("order_id") or "").strip()
+    if not any(ch.isdigit() for ch in order_id):
+        raise ValueError("order_id is missing or invalid")
+    return order_id
+
+
+def _order_ids_arg(args: Mapping[str, Any]) -> list[str]:
+    order_ids = [str(i).strip() for i in args.get("order_ids") or []]
+    if not order_ids or not all(any(ch.isdigit() for ch in i) for i in order_ids):
+        raise ValueError("order_ids are missing or invalid")
+    return order_ids
+
+
+def _search_args(args: Mapping[str, Any], context: AgentContext) -> dict[str, Any]:
+    keyword = str(args.get("keyword") or "").strip()
+    if not keyword:
+        raise ValueError("keyword is missing")
+    return {
+        "keyword": keyword,
+        "language": str(args.get("language") or context.language),
+        "limit": args.get("limit"),
+        "offset": int(args.get("offset") or 0),
+    }
 
 
 @dataclass
 class Executor:
-    """Executes tool calls described by PlanSteps."""
+    """Executes tool calls described by PlanSteps.
 
-    def execute(self, steps: list[PlanStep], context: AgentContext) -> tuple[list[ToolResult], ExecutionState]:
-        tool_results: list[ToolResult] = []
-        products_found: list[dict[str, Any]] = []
-        order_info: dict[str, Any] | None = None
+    With `concurrent`, independent tool steps run in parallel on a shared thread pool;
+    each waits at most its timeout (`tool_timeouts[name]`, else `timeout`), cut short by
+    the run's deadline. Results are always reported in plan order.
+    """
 
-        for step in steps:
-            if step.kind != "tool" or not step.tool_call:
-                continue
+    concurrent: bool = field(default_factory=executor_concurrent)
+    # Seconds per tool call; None means no limit.
+    timeout: float | None = field(default_factory=tool_timeout)
+    tool_timeouts: dict[str, float] = field(default_factory=dict)
+
+    def execute(
+        self,
+        steps: list[PlanStep],
+        context: AgentContext,
+        *,
+        deadline: float | None = None,
+    ) -> tuple[list[ToolResult], ExecutionState]:
+        """Run the tool steps of a plan; `deadline` is a `time.monotonic()` value."""
+
+        tool_steps = [step for step in steps if step.kind == "tool" and step.tool_call]
+        if self.concurrent and tool_steps:
+            outcomes = self._run_concurrently(tool_steps, context, deadline)
+        else:
+            outcomes = [self._run_with_deadline(step, context, deadline) for step in tool_steps]
+        return self._fold(tool_steps, outcomes)
+
+    async def aexecute(
+        self,
+        steps: list[PlanStep],
+        context: AgentContext,
+        *,
+        deadline: float | None = None,
+    ) -> tuple[list[ToolResult], ExecutionState]:
+        """Async `execute`: tool steps run as concurrent tasks on the running event loop.
 
+        Order lookups are awaited natively; the CPU-bound catalog search runs in a
+        worker thread. A task that outlives its timeout is cancelled.
+        """
+
+        tool_steps = [step for step in steps if step.kind == "tool" and step.tool_call]
+        started = time.monotonic()
+        tasks = [asyncio.ensure_future(self._arun_step(step, context)) for step in tool_steps]
+        outcomes: list[tuple[ToolResult, SearchPage | None]] = []
+        for step, task in zip(tool_steps, tasks):
             name = step.tool_call.name
+            step_deadline = self._step_deadline(name, started, deadline)
+            remaining = None if step_deadline is None else max(0.0, step_deadline - time.monotonic())
             try:
-                if name == "getOrderStatus":
-                    order_id = str(step.tool_call.args.get("order_id") or "").strip()
-                    if not any(ch.isdigit() for ch in order_id):
-                        raise ValueError("order_id is missing or invalid")
-                    order_info = getOrderStatus(order_id)
-                    tool_results.append(ToolResult(name=name, ok=True, data=order_info))
+                outcomes.append(await asyncio.wait_for(task, remaining))
+            except asyncio.TimeoutError:
+                outcomes.append((_timed_out(name, started, step_deadline), None))
+        return self._fold(tool_steps, outcomes)
+
+    def execute_batch(
+        self, runs: Sequence[tuple[list[PlanStep], AgentContext]]
+    ) -> list[tuple[list[ToolResult], ExecutionState]]:
+        """Execute many plans at once, running each distinct tool call only once.
+
+        Identical searches across the batch share one catalog query, and every distinct
+        order id is looked up in bulk (`ORDER_BATCH_SIZE` ids per call). Results are
+        returned per plan, in input order, exactly as `execute` would report them.
+        Batches have no deadline.
+        """
+
+        searches: dict[tuple[tuple[str, Any], ...], SearchPage | Exception] = {}
+        order_ids: dict[str, dict[str, Any] | None | Exception] = {}
+        for steps, context in runs:
+            for step in steps:
+                if step.kind != "tool" or not step.tool_call:
+                    continue
+                try:
+                    self._collect(step, context, searches, order_ids)
+                except ValueError:
+                    pass  # reported per step below
 
-                elif name == "file_search_products":
-                    keyword = str(step.tool_call.args.get("keyword") or "").strip()
-                    language = str(step.tool_call.args.get("language") or context.language)
-                    if not keyword:
-                        raise ValueError("keyword is missing")
+        for key in searches:
+            with TOOL_SECONDS.time("file_search_products"):
+                try:
+                    searches[key] = search_products_page(**dict(key))
+                except Exception as e:
+                    searches[key] = e
+        pending = list(order_ids)
+        for start in range(0, len(pending), ORDER_BATCH_SIZE):
+            chunk = pending[start : start + ORDER_BATCH_SIZE]
+            with TOOL_SECONDS.time("getOrderStatuses"):
+                order_ids.update(_lookup_orders(chunk))
 
-                    products_found = file_search_products(keyword, language=language)
+        results: list[tuple[list[ToolResult], ExecutionState]] = []
+        for steps, context in runs:
+            tool_steps = [step for step in steps if step.kind == "tool" and step.tool_call]
+            outcomes = [self._batch_step(step, context, searches, order_ids) for step in tool_steps]
+            results.append(self._fold(tool_steps, outcomes))
+        return results
 
-                    # Multiword fallback: try last word first, then the rest.
-                    if not products_found and " " in keyword:
-                        words = keyword.split()
-                        for search_word in [words[-1]] + words[:-1]:
-                            products_found = file_search_products(search_word, language=language)
-                            if products_found:
-                                break
+    @staticmethod
+    def _collect(
+        step: PlanStep,
+        context: AgentContext,
+        searches: dict[tuple[tuple[str, Any], ...], Any],
+        order_ids: dict[str, Any],
+    ) -> None:
+        name = step.tool_call.name
+        args = step.tool_call.args
+        if name == "getOrderStatus":
+            order_ids.setdefault(_order_id_arg(args), None)
+        elif name == "getOrderStatuses":
+            for order_id in _order_ids_arg(args):
+                order_ids.setdefault(order_id, None)
+        elif name == "file_search_products":
+            searches.setdefault(tuple(sorted(_search_args(args, context).items())), None)
 
-                    tool_results.append(ToolResult(name=name, ok=True, data=products_found))
+    @staticmethod
+    def _batch_step(
+        step: PlanStep,
+        context: AgentContext,
+        searches: Mapping[tuple[tuple[str, Any], ...], SearchPage | Exception],
+        order_ids: Mapping[str, dict[str, Any] | None | Exception],
+    ) -> tuple[ToolResult, SearchPage | None]:
+        name = step.tool_call.name
+        args = step.tool_call.args
+        try:
+            if name == "getOrderStatus":
+                order_id = _order_id_arg(args)
+                order = _batch_order(order_ids, order_id)
+                if order is None:
+                    raise OrderNotFound(order_id)
+                return ToolResult(name=name, ok=True, data=order), None
+            if name == "getOrderStatuses":
+                data = [_batch_order(order_ids, i) for i in _order_ids_arg(args)]
+                return ToolResult(name=name, ok=True, data=data), None
+            if name == "file_search_products":
+                page = searches[tuple(sorted(_search_args(args, context).items()))]
+                if isinstance(page, Exception):
+                    raise page
+                # Runs share the search; each gets its own list.
+                page = replace(page, items=list(page.items))
+                return ToolResult(name=name, ok=True, data=page.items), page
+            raise ValueError(f"unknown tool: {name}")
+        except Exception as e:
+            return ToolResult(name=name, ok=False, data=None, error=str(e)), None
 
-                else:
-                    raise ValueError(f"unknown tool: {name}")
+    def _step_deadline(self, name: str, started: float, deadline: float | None) -> float | None:
+        """`time.monotonic()` by which a tool call submitted at `started` must finish."""
 
+        timeout = self.tool_timeouts.get(name, self.timeout)
+        step_deadline = None if timeout is None else started + timeout
+        if deadline is not None:
+            step_deadline = deadline if step_deadline is None else min(step_deadline, deadline)
+        return step_deadline
+
+    def _run_with_deadline(
+        self, step: PlanStep, context: AgentContext, deadline: float | None
+    ) -> tuple[ToolResult, SearchPage | None]:
+        # Sequential mode cannot interrupt a running tool; it only skips late steps.
+        if deadline is not None and time.monotonic() >= deadline:
+            return ToolResult(name=step.tool_call.name, ok=False, error="deadline exceeded"), None
+        return self._run_step(step, context)
+
+    def _run_concurrently(
+        self, steps: list[PlanStep], context: AgentContext, deadline: float | None
+    ) -> list[tuple[ToolResult, SearchPage | None]]:
+        pool = _shared_pool()
+        started = time.monotonic()
+        futures: list[Future] = [pool.submit(self._run_step, step, context) for step in steps]
+        outcomes: list[tuple[ToolResult, SearchPage | None]] = []
+        for step, future in zip(steps, futures):
+            name = step.tool_call.name
+            # Timeouts count from submission, not from when this result is awaited.
+            step_deadline = self._step_deadline(name, started, deadline)
+            remaining = None if step_deadline is None else max(0.0, step_deadline - time.monotonic())
+            try:
+                outcomes.append(future.result(timeout=remaining))
+            except FutureTimeoutError:
+                # The call keeps running in the pool; its result is dropped.
+                future.cancel()
+                outcomes.append((_timed_out(name, started, step_deadline), None))
+        return outcomes
+
+    @staticmethod
+    def _run_step(step: PlanStep, context: AgentContext) -> tuple[ToolResult, SearchPage | None]:
+        name = step.tool_call.name
+        args = step.tool_call.args
+        with TOOL_SECONDS.time(name):
+            try:
+                if name == "getOrderStatus":
+                    return ToolResult(name=name, ok=True, data=getOrderStatus(_order_id_arg(args))), None
+                if name == "getOrderStatuses":
+                    return ToolResult(name=name, ok=True, data=getOrderStatuses(_order_ids_arg(args))), None
+                if name == "file_search_products":
+                    page = search_products_page(**_search_args(args, context))
+                    return ToolResult(name=name, ok=True, data=page.items), page
+                raise ValueError(f"unknown tool: {name}")
+            except Exception as e:
+                return ToolResult(name=name, ok=False, data=None, error=str(e)), None
+
+    @staticmethod
+    async def _arun_step(step: PlanStep, context: AgentContext) -> tuple[ToolResult, SearchPage | None]:
+        name = step.tool_call.name
+        args = step.tool_call.args
+        with TOOL_SECONDS.time(name):
+            try:
+                if name == "getOrderStatus":
+                    return ToolResult(name=name, ok=True, data=await agetOrderStatus(_order_id_arg(args))), None
+                if name == "getOrderStatuses":
+                    return ToolResult(name=name, ok=True, data=await agetOrderStatuses(_order_ids_arg(args))), None
+                if name == "file_search_products":
+                    search_args = _search_args(args, context)
+                    loop = asyncio.get_running_loop()
+                    page = await loop.run_in_executor(None, lambda: search_products_page(**search_args))
+                    return ToolResult(name=name, ok=True, data=page.items), page
+                raise ValueError(f"unknown tool: {name}")
             except Exception as e:
-                tool_results.append(ToolResult(name=name, ok=False, data=None, error=str(e)))
+                return ToolResult(name=name, ok=False, data=None, error=str(e)), None
+
+    @staticmethod
+    def _fold(
+        steps: list[PlanStep], outcomes: list[tuple[ToolResult, SearchPage | None]]
+    ) -> tuple[list[ToolResult], ExecutionState]:
+        # Applied in plan order, so later steps win exactly as in a sequential run.
+        tool_results: list[ToolResult] = []
+        products_found: list[Mapping[str, Any]] = []
+        order_info: dict[str, Any] | None = None
+        products_page: SearchPage | None = None
+        orders: list[dict[str, Any]] = []
+        unknown_order_ids: list[str] = []
+
+        for step, (result, page) in zip(steps, outcomes):
+            tool_results.append(result)
+            TOOL_CALLS.inc(result.name, "ok" if result.ok else "error")
+            if not result.ok:
+                continue
+            if result.name == "getOrderStatus":
+                order_info = result.data
+                orders = [order_info]
+                unknown_order_ids = []
+            elif result.name == "getOrderStatuses":
+                ids = _order_ids_arg(step.tool_call.args)
+                orders = [order for order in result.data if order is not None]
+                order_info = orders[0] if orders else None
+                unknown_order_ids = [i for i, order in zip(ids, result.data) if order is None]
+            elif result.name == "file_search_products":
+                products_page = page
+                products_found = page.items
+
+        return tool_results, ExecutionState(
+            products_found=products_found,
+            order_info=order_info,
+            products_page=products_page,
+            orders=orders,
+            unknown_order_ids=unknown_order_ids,
+        )
+
+
+def _timed_out(name: str, started: float, step_deadline: float | None) -> ToolResult:
+    allowed = 0.0 if step_deadline is None else max(0.0, step_deadline - started)
+    return ToolResult(name=name, ok=False, error=f"timed out after {allowed:.2f}s")
+
+
+def _lookup_orders(order_ids: list[str]) -> dict[str, dict[str, Any] | None | Exception]:
+    """Statuses for `order_ids` in one bulk call (None for an unknown id)."""
+
+    try:
+        return dict(zip(order_ids, getOrderStatuses(order_ids)))
+    except Exception as e:
+        return dict.fromkeys(order_ids, e)
+
 
-        return tool_results, ExecutionState(products_found=products_found, order_info=order_info)
+def _batch_order(order_ids: Mapping[str, dict[str, Any] | None | Exception], order_id: str) -> dict[str, Any] | None:
+    order = order_ids[order_id]
+    if isinstance(order, Exception):
+        raise order
+    # Runs share the lookup; each gets its own copy.
+    return copy.deepcopy(order)
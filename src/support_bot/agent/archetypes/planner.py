@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from support_bot.agent.core.models import AgentContext, PlanStep, ToolCall
+from support_bot.config import search_page_size
 
 
 @dataclass
@@ -12,23 +13,37 @@ class Planner:
     Produces a list of steps (tool calls and/or a final respond step).
     """
 
+    # Product matches per reply; 0 means no limit.
+    page_size: int = field(default_factory=search_page_size)
+
     def plan(self, context: AgentContext) -> list[PlanStep]:
         steps: list[PlanStep] = []
 
         # Multi-tool policy: if both are present, do both.
         if context.product_term:
+            args = {"keyword": context.product_term, "language": context.language}
+            if self.page_size:
+                args["limit"] = self.page_size
+            if context.search_offset:
+                args["offset"] = context.search_offset
             steps.append(
                 PlanStep(
                     kind="tool",
-                    tool_call=ToolCall(
-                        name="file_search_products",
-                        args={"keyword": context.product_term, "language": context.language},
-                    ),
+                    tool_call=ToolCall(name="file_search_products", args=args),
                     notes="search product catalog",
                 )
             )
 
-        if context.order_id:
+        if len(context.order_ids) > 1:
+            # One batched lookup instead of a step per order.
+            steps.append(
+                PlanStep(
+                    kind="tool",
+                    tool_call=ToolCall(name="getOrderStatuses", args={"order_ids": list(context.order_ids)}),
+                    notes="fetch order statuses",
+                )
+            )
+        elif context.order_id:
             steps.append(
                 PlanStep(
                     kind="tool",
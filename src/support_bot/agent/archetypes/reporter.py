@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Mapping
 from dataclasses import dataclass
 from datetime import date
 
@@ -78,10 +79,10 @@ class Reporter:
 
                 yes_text = "Да!" if language == "bg" else "Yes!"
 
-                # Show ALL matches immediately (no follow-up prompt).
+                # One page of matches; the hint below offers the rest ("more").
                 lines: list[str] = []
                 for p in products_found:
-                    if not isinstance(p, dict):
+                    if not isinstance(p, Mapping):
                         continue
                     lines.append(
                         f"{yes_text} {p.get(name_field,'')} — {p.get(desc_field,'')} {price_label} ${p.get('price')}"
@@ -89,6 +90,16 @@ class Reporter:
 
                 parts.extend(lines)
 
+                page = state.products_page
+                if page is not None and page.has_more:
+                    first = page.offset + 1
+                    last = page.offset + len(products_found)
+                    parts.append(
+                        f"Показани са {first}–{last} от {page.total} съвпадения. Напишете „още“, за да видите следващите."
+                        if language == "bg"
+                        else f"Showing {first}–{last} of {page.total} matches. Say \"more\" to see the next ones."
+                    )
+
             else:
                 no_match_text = (
                     f"Не са намерени продукти, отговарящи на '{context.product_term}'."
@@ -97,12 +108,12 @@ class Reporter:
                 )
                 parts.append(no_match_text)
 
-        if order_info:
-            status_label = "е със статус" if language == "bg" else "is currently"
+        orders = state.orders or ([order_info] if order_info else [])
+        for order_info in orders:
             localized_status = _localize_order_status(str(order_info.get("status") or ""), language)
             parts.append(
                 (
-                    f"Поръчка {order_info.get('order_id')} {status_label} {localized_status}."
+                    f"Поръчка {order_info.get('order_id')} е със статус {localized_status}."
                     if language == "bg"
                     else f"Order {order_info.get('order_id')} is currently {localized_status}."
                 )
@@ -112,6 +123,14 @@ class Reporter:
                 formatted = _format_date_long(str(order_info.get("estimated_delivery")), language)
                 parts.append(f"{est_text} {formatted}")
 
+        if state.unknown_order_ids:
+            unknown = ", ".join(state.unknown_order_ids)
+            parts.append(
+                f"Не намерих поръчки с номер {unknown}."
+                if language == "bg"
+                else f"I couldn't find any order with number {unknown}."
+            )
+
         if not parts:
             sorry_text = (
                 "Съжалявам — не могах да намеря информация за продукт или поръчка във вашия въпрос."
@@ -1,16 +1,91 @@
 from __future__ import annotations
 
+import copy
+import threading
 import time
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, field
+from typing import Any, Sequence
 
 from support_bot.agent.archetypes.context_builder import ContextBuilder
 from support_bot.agent.archetypes.critic import Critic
 from support_bot.agent.archetypes.executor import Executor, ExecutionState
 from support_bot.agent.archetypes.planner import Planner
 from support_bot.agent.archetypes.reporter import Reporter
-from support_bot.agent.core.models import AgentInput, AgentOutput, PlanStep, ToolResult
+from support_bot.agent.core.models import AgentContext, AgentInput, AgentOutput, PlanStep, ToolResult
+from support_bot.agent.core.tracing import NoopTrace, Trace, Tracer, default_tracer
 from support_bot.agent.governance.safety_guard import SafetyGuard
+from support_bot.cache import TTLCache
+from support_bot.config import request_timeout, response_cache_size, response_cache_ttl
+from support_bot.metrics import AGENT_RUNS, AGENT_STAGE_SECONDS
+from support_bot.services.product_catalog import ProductCatalog, default_catalog
+
+# Tools whose answer depends only on the catalog, never on the time or a session.
+CACHEABLE_TOOLS = frozenset({"file_search_products"})
+
+
+@dataclass
+class _Run:
+    """Per-request state shared by the stages of one run."""
+
+    agent_input: AgentInput
+    deadline: float | None
+    trace: Trace | NoopTrace
+    tools_called: list[dict[str, Any]] = field(default_factory=list)
+    context: AgentContext | None = None
+    plan: list[PlanStep] = field(default_factory=list)
+    # Response-cache key, when the run is eligible for caching.
+    cache_key: tuple[Any, ...] | None = None
+
+
+@dataclass(frozen=True)
+class _CachedReply:
+    response_text: str
+    product_page: dict[str, Any] | None
+    pending: list[dict[str, Any]] | None
+
+
+class ResponseCache:
+    """LRU+TTL cache of whole replies, keyed by message text, language and page offset.
+
+    Entries belong to one catalog instance: when the default catalog is swapped (e.g.
+    by the reloader), the cache is cleared and late writes land under a dead generation.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None) -> None:
+        self.cache: TTLCache[tuple[Any, ...], _CachedReply] = TTLCache(maxsize, ttl)
+        self._catalog: ProductCatalog | None = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        return cls(response_cache_size(), response_cache_ttl())
+
+    @property
+    def enabled(self) -> bool:
+        return self.cache.maxsize > 0
+
+    def key(self, text: str, language: str, search_offset: int) -> tuple[Any, ...]:
+        catalog = default_catalog()
+        generation = self._generation
+        if catalog is not self._catalog:
+            with self._lock:
+                if catalog is not self._catalog:
+                    self.cache.clear()
+                    self._catalog = catalog
+                    self._generation += 1
+                generation = self._generation
+        # Whitespace only: intent extraction is case-sensitive.
+        return (generation, " ".join(text.split()), language, search_offset)
+
+    def get(self, key: tuple[Any, ...]) -> _CachedReply | None:
+        return self.cache.get(key)
+
+    def set(self, key: tuple[Any, ...], reply: _CachedReply) -> None:
+        self.cache.set(key, reply)
+
+    def snapshot(self) -> dict[str, Any]:
+        return self.cache.snapshot()
 
 
 @dataclass
@@ -21,59 +96,187 @@ class RunManager:
     executor: Executor
     critic: Critic
     reporter: Reporter
+    # Budget in seconds for tool execution when the input carries no deadline.
+    timeout: float | None = field(default_factory=request_timeout)
+    # Debug requests are always traced; others as sampled (TRACE_SAMPLE_RATE).
+    tracer: Tracer = field(default_factory=default_tracer)
+    # Replies to sessionless, catalog-only queries (RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL).
+    response_cache: ResponseCache = field(default_factory=ResponseCache.from_env)
 
     def run(self, agent_input: AgentInput) -> AgentOutput:
-        trace: list[dict[str, Any]] = []
-        tools_called: list[dict[str, Any]] = []
+        prepared = self._prepare(agent_input)
+        if isinstance(prepared, AgentOutput):
+            return prepared
+        with prepared.trace.span("tool", "executed tools") as span, AGENT_STAGE_SECONDS.time("tool"):
+            tool_results, state = self.executor.execute(prepared.plan, prepared.context, deadline=prepared.deadline)
+            if span:
+                span.data = {"results": [{"name": r.name, "ok": r.ok} for r in tool_results]}
+        return self._finish(prepared, tool_results, state)
 
-        def emit(stage: str, message: str, data: dict[str, Any] | None = None) -> None:
-            trace.append({"ts": time.time(), "stage": stage, "message": message, "data": data})
+    async def arun(self, agent_input: AgentInput) -> AgentOutput:
+        """Async `run`: tools are awaited (`Executor.aexecute`) instead of blocking a thread."""
 
-        emit("input", "received input", {"chars": len(agent_input.user_text or "")})
+        prepared = self._prepare(agent_input)
+        if isinstance(prepared, AgentOutput):
+            return prepared
+        with prepared.trace.span("tool", "executed tools") as span, AGENT_STAGE_SECONDS.time("tool"):
+            tool_results, state = await self.executor.aexecute(
+                prepared.plan, prepared.context, deadline=prepared.deadline
+            )
+            if span:
+                span.data = {"results": [{"name": r.name, "ok": r.ok} for r in tool_results]}
+        return self._finish(prepared, tool_results, state)
 
-        decision = self.safety.validate_input(agent_input.user_text)
+    def run_batch(self, agent_inputs: Sequence[AgentInput]) -> list[AgentOutput]:
+        """Run many inputs, sharing tool work across them (`Executor.execute_batch`).
+
+        Outputs are in input order and match what `run` returns for each input. Tool
+        execution is timed once for the whole batch, and deadlines do not apply.
+        """
+
+        outputs: list[AgentOutput | None] = []
+        runs: list[tuple[int, _Run]] = []
+        for agent_input in agent_inputs:
+            prepared = self._prepare(agent_input)
+            if isinstance(prepared, AgentOutput):
+                outputs.append(prepared)
+            else:
+                runs.append((len(outputs), prepared))
+                outputs.append(None)
+
+        with AGENT_STAGE_SECONDS.time("tool"):
+            executed = self.executor.execute_batch([(run.plan, run.context) for _, run in runs])
+        for (index, run), (tool_results, state) in zip(runs, executed):
+            if run.trace.recording:
+                results = [{"name": r.name, "ok": r.ok} for r in tool_results]
+                run.trace.event("tool", "executed tools", {"results": results})
+            outputs[index] = self._finish(run, tool_results, state)
+        return outputs  # type: ignore[return-value]
+
+    def _prepare(self, agent_input: AgentInput) -> _Run | AgentOutput:
+        """Safety check, context and plan.
+
+        An AgentOutput means the input was blocked or answered from the response cache.
+        """
+
+        deadline = agent_input.deadline
+        if deadline is None and self.timeout is not None:
+            deadline = time.monotonic() + self.timeout
+
+        trace = self.tracer.start("agent.run", force=agent_input.debug)
+        run = _Run(agent_input=agent_input, deadline=deadline, trace=trace)
+        if trace.recording:
+            trace.event("input", "received input", {"chars": len(agent_input.user_text or "")})
+
+        with AGENT_STAGE_SECONDS.time("safety"):
+            decision = self.safety.validate_input(agent_input.user_text)
         if not decision.ok:
-            emit("safety", "input blocked", {"error": decision.error})
+            AGENT_RUNS.inc("blocked")
+            trace.event("safety", "input blocked", {"error": decision.error})
+            trace.finish()
+            records = trace.records()
             response_text = decision.error or "Input blocked by safety policy."
             return AgentOutput(
                 response_text=response_text,
                 tools_called=[],
-                trace=trace,
-                debug={"tools_called": [], "trace": trace},
+                trace=records,
+                debug={"tools_called": [], "trace": records},
             )
+        with trace.span("context", "built context") as span, AGENT_STAGE_SECONDS.time("context"):
+            context = self.context_builder.build(agent_input)
+            if span:
+                span.data = {
+                    "language": context.language,
+                    "has_order": bool(context.order_id),
+                    "has_product": bool(context.product_term),
+                }
+        run.context = context
 
-        context = self.context_builder.build(agent_input)
-        emit(
-            "context",
-            "built context",
-            {"language": context.language, "has_order": bool(context.order_id), "has_product": bool(context.product_term)},
-        )
+        with trace.span("plan", "created plan") as span, AGENT_STAGE_SECONDS.time("plan"):
+            run.plan = self.planner.plan(context)
+            if span:
+                span.data = {"steps": [s.kind + (":" + (s.tool_call.name if s.tool_call else "")) for s in run.plan]}
 
-        plan: list[PlanStep] = self.planner.plan(context)
-        emit("plan", "created plan", {"steps": [s.kind + (":" + (s.tool_call.name if s.tool_call else "")) for s in plan]})
-
-        for step in plan:
+        for step in run.plan:
             if step.kind == "tool" and step.tool_call:
-                tools_called.append({"name": step.tool_call.name, "args": dict(step.tool_call.args)})
+                run.tools_called.append({"name": step.tool_call.name, "args": dict(step.tool_call.args)})
+
+        if self._cacheable(run):
+            run.cache_key = self.response_cache.key(context.normalized_text, context.language, context.search_offset)
+            cached = self.response_cache.get(run.cache_key)
+            if cached is not None:
+                AGENT_RUNS.inc("cached")
+                trace.event("cache", "served cached response")
+                return self._output(run, cached, cache_hit=True)
+        return run
+
+    def _cacheable(self, run: _Run) -> bool:
+        # Order lookups are time-dependent and session memory can change the context.
+        return (
+            self.response_cache.enabled
+            and run.agent_input.session_id is None
+            and all(call["name"] in CACHEABLE_TOOLS for call in run.tools_called)
+        )
 
-        tool_results: list[ToolResult]
-        state: ExecutionState
-        tool_results, state = self.executor.execute(plan, context)
-        emit("tool", "executed tools", {"results": [{"name": r.name, "ok": r.ok} for r in tool_results]})
+    def _finish(self, run: _Run, tool_results: list[ToolResult], state: ExecutionState) -> AgentOutput:
+        """Report, review and package the output of an executed plan."""
 
-        response_text = self.reporter.format(context=context, state=state)
-        emit("report", "formatted response", {"chars": len(response_text)})
+        context = run.context
+        trace = run.trace
 
-        response_text = self.critic.review(response_text=response_text, tool_results=tool_results)
-        emit("critic", "reviewed response", {"chars": len(response_text)})
+        with trace.span("report", "formatted response") as span, AGENT_STAGE_SECONDS.time("report"):
+            response_text = self.reporter.format(context=context, state=state)
+            if span:
+                span.data = {"chars": len(response_text)}
 
-        debug: dict[str, Any] = {"tools_called": tools_called, "trace": trace}
+        with trace.span("critic", "reviewed response") as span, AGENT_STAGE_SECONDS.time("critic"):
+            response_text = self.critic.review(response_text=response_text, tool_results=tool_results)
+            if span:
+                span.data = {"chars": len(response_text)}
 
-        # Web-only multi-turn UX hook: if we found multiple products, expose them in debug
-        # so the Flask layer can stash them in the session.
+        # Debug aid: the other matches on this page (plain dicts: the payload must be JSON-able).
+        pending: list[dict[str, Any]] | None = None
         if len(state.products_found) > 1:
-            debug["pending_product_matches"] = state.products_found[1:]
+            pending = [dict(p) for p in state.products_found[1:]]
 
-        emit("output", "returning output", {"debug": bool(agent_input.debug)})
+        product_page: dict[str, Any] | None = None
+        page = state.products_page
+        if page is not None and page.has_more:
+            product_page = {
+                "offset": page.offset,
+                "limit": page.limit,
+                "total": page.total,
+                "next_offset": page.offset + len(page.items),
+            }
 
-        return AgentOutput(response_text=response_text, tools_called=tools_called, trace=trace, debug=debug)
+        reply = _CachedReply(response_text=response_text, product_page=product_page, pending=pending)
+        # Failed or timed-out tools must not be replayed to later callers.
+        if run.cache_key is not None and all(r.ok for r in tool_results):
+            self.response_cache.set(run.cache_key, reply)
+        AGENT_RUNS.inc("ok")
+        return self._output(run, reply, cache_hit=False)
+
+    def _output(self, run: _Run, reply: _CachedReply, *, cache_hit: bool) -> AgentOutput:
+        trace = run.trace
+        if trace.recording:
+            trace.event("output", "returning output", {"debug": bool(run.agent_input.debug)})
+        trace.finish()
+        records = trace.records()
+
+        # Copies: cached replies are shared between runs.
+        product_page = copy.deepcopy(reply.product_page)
+        debug: dict[str, Any] = {"tools_called": run.tools_called, "trace": records}
+        if reply.pending is not None:
+            debug["pending_product_matches"] = copy.deepcopy(reply.pending)
+        if product_page is not None:
+            debug["product_page"] = product_page
+        if run.cache_key is not None:
+            debug["response_cache"] = {"hit": cache_hit, **self.response_cache.snapshot()}
+
+        return AgentOutput(
+            response_text=reply.response_text,
+            tools_called=run.tools_called,
+            trace=records,
+            debug=debug,
+            product_page=product_page,
+        )
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Literal
+from typing import Any, Literal, Mapping
 
 
 @dataclass(frozen=True)
@@ -9,6 +9,10 @@ class AgentInput:
     user_text: str
     debug: bool = False
     session_id: str | None = None
+    # Index of the first product match to show ("show more" paging).
+    search_offset: int = 0
+    # `time.monotonic()` by which tool execution must finish; None means no deadline.
+    deadline: float | None = None
 
 
 @dataclass(frozen=True)
@@ -17,7 +21,10 @@ class AgentContext:
     normalized_text: str
     order_id: str | None = None
     product_term: str | None = None
-    memory: dict[str, Any] = field(default_factory=dict)
+    memory: Mapping[str, Any] = field(default_factory=dict)
+    search_offset: int = 0
+    # Every order id in the message, in order of appearance; `order_id` is the first.
+    order_ids: tuple[str, ...] = ()
 
 
 @dataclass(frozen=True)
@@ -55,3 +62,5 @@ class AgentOutput:
     tools_called: list[dict[str, Any]]
     trace: list[dict[str, Any]]
     debug: dict[str, Any] = field(default_factory=dict)
+    # Paging info of the product search, when there are more matches to show.
+    product_page: dict[str, Any] | None = None
@@ -0,0 +1,275 @@
+"""Span tracing for agent runs.
+
+A run is traced only when it is sampled (`sample_rate`) or forced (debug requests).
+Unsampled runs get `NOOP_TRACE`, whose spans are a shared do-nothing context manager,
+so the cost is a few attribute lookups per stage. Timings use `time.monotonic_ns()`;
+exported spans carry wall-clock start times derived from one clock reading per trace.
+Exporting never fails a run: errors are logged, and the file exporter writes from its
+own thread.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+
+from support_bot.config import trace_export_path, trace_ring_size, trace_sample_rate
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    name: str
+    message: str
+    trace_id: str
+    span_id: int
+    parent_id: int | None
+    start_ns: int
+    end_ns: int = 0
+    data: dict[str, Any] | None = None
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: list[dict[str, Any]]) -> None: ...
+
+
+class RingBufferExporter:
+    """Keeps the most recent `capacity` finished spans in memory."""
+
+    def __init__(self, capacity: int = 1000) -> None:
+        self._spans: deque[dict[str, Any]] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[dict[str, Any]]) -> None:
+        with self._lock:
+            self._spans.extend(spans)
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return list(self._spans)
+
+
+class NdjsonExporter:
+    """Appends finished spans to a file, one JSON object per line.
+
+    `export` only queues the lines; a daemon thread appends them, so a slow or failing
+    disk never holds up a request. Write errors are logged and the lines dropped. At
+    most `max_pending` exports wait for the writer; beyond that new ones are dropped.
+    """
+
+    def __init__(self, path: Path, *, max_pending: int = 10_000) -> None:
+        self.path = path
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._queue: queue.Queue[str] = queue.Queue(max_pending)
+        self._writer = threading.Thread(target=self._write_loop, name="trace-export", daemon=True)
+        self._writer.start()
+
+    def export(self, spans: list[dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(s, ensure_ascii=False, default=str) + "\n" for s in spans)
+        try:
+            self._queue.put_nowait(lines)
+        except queue.Full:
+            self._drop(1)
+
+    def flush(self) -> None:
+        """Wait until every queued export has been written (or has failed)."""
+
+        self._queue.join()
+
+    def _drop(self, count: int) -> None:
+        with self._dropped_lock:
+            self.dropped += count
+
+    def _write_loop(self) -> None:
+        while True:
+            lines = [self._queue.get()]
+            # Append everything already queued with one open/write.
+            while True:
+                try:
+                    lines.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+            except OSError:
+                self._drop(len(lines))
+                logger.exception("could not write trace spans to %s", self.path)
+            finally:
+                for _ in lines:
+                    self._queue.task_done()
+
+
+class _SpanScope:
+    __slots__ = ("_trace", "_span")
+
+    def __init__(self, trace: "Trace", span: Span) -> None:
+        self._trace = trace
+        self._span = span
+
+    def __enter__(self) -> Span:
+        return self._span
+
+    def __exit__(self, *exc: Any) -> None:
+        self._span.end_ns = time.monotonic_ns()
+        self._trace.spans.append(self._span)
+
+
+class _NoopScope:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NOOP_SCOPE = _NoopScope()
+
+
+class Trace:
+    """Spans of one traced run; stage spans are children of the root span."""
+
+    recording = True
+
+    def __init__(self, tracer: "Tracer", name: str) -> None:
+        self.tracer = tracer
+        self.trace_id = os.urandom(8).hex()
+        self.spans: list[Span] = []
+        self._next_id = 1
+        start = time.monotonic_ns()
+        self._wall_offset_ns = time.time_ns() - start
+        self.root = Span(name=name, message="", trace_id=self.trace_id, span_id=0, parent_id=None, start_ns=start)
+
+    def span(self, name: str, message: str = "", data: dict[str, Any] | None = None) -> _SpanScope:
+        """Context manager timing one stage; yields the Span so `data` can be filled in."""
+
+        span_id = self._next_id
+        self._next_id += 1
+        span = Span(
+            name=name,
+            message=message,
+            trace_id=self.trace_id,
+            span_id=span_id,
+            parent_id=0,
+            start_ns=time.monotonic_ns(),
+            data=data,
+        )
+        return _SpanScope(self, span)
+
+    def event(self, name: str, message: str = "", data: dict[str, Any] | None = None) -> None:
+        """A zero-length span."""
+
+        with self.span(name, message, data):
+            pass
+
+    def finish(self) -> None:
+        self.root.end_ns = time.monotonic_ns()
+        exporter = self.tracer.exporter
+        if exporter is None:
+            return
+        try:
+            exporter.export([self._export(s) for s in [self.root, *self.spans]])
+        except Exception:
+            # Tracing is diagnostics; a broken exporter must not fail the request.
+            logger.exception("trace export failed")
+
+    def records(self) -> list[dict[str, Any]]:
+        """Stage spans in the legacy `debug["trace"]` shape (ts is the stage's end)."""
+
+        return [
+            {"ts": (s.end_ns + self._wall_offset_ns) / 1e9, "stage": s.name, "message": s.message, "data": s.data}
+            for s in self.spans
+        ]
+
+    def _export(self, span: Span) -> dict[str, Any]:
+        return {
+            "trace_id": span.trace_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "name": span.name,
+            "message": span.message,
+            "start_unix_ns": span.start_ns + self._wall_offset_ns,
+            "duration_ns": span.duration_ns,
+            "data": span.data,
+        }
+
+
+class NoopTrace:
+    """Stands in for `Trace` in unsampled runs; records and exports nothing."""
+
+    recording = False
+    spans: list[Span] = []
+
+    def span(self, name: str, message: str = "", data: dict[str, Any] | None = None) -> _NoopScope:
+        return _NOOP_SCOPE
+
+    def event(self, name: str, message: str = "", data: dict[str, Any] | None = None) -> None:
+        return None
+
+    def finish(self) -> None:
+        return None
+
+    def records(self) -> list[dict[str, Any]]:
+        return []
+
+
+NOOP_TRACE = NoopTrace()
+
+
+@dataclass
+class Tracer:
+    """Starts traces for a fraction `sample_rate` of runs and hands finished spans to `exporter`."""
+
+    sample_rate: float = 0.0
+    exporter: SpanExporter | None = field(default_factory=RingBufferExporter)
+
+    def start(self, name: str, *, force: bool = False) -> Trace | NoopTrace:
+        rate = self.sample_rate
+        if force or (rate > 0 and (rate >= 1 or random.random() < rate)):
+            return Trace(self, name)
+        return NOOP_TRACE
+
+
+_DEFAULT_TRACER: Tracer | None = None
+_DEFAULT_TRACER_LOCK = threading.Lock()
+
+
+def default_tracer() -> Tracer:
+    """Shared tracer configured from `TRACE_SAMPLE_RATE` and `TRACE_EXPORT_PATH`.
+
+    Without an export path, finished spans go to an in-process ring buffer of
+    `TRACE_RING_SIZE` spans (see `recent_spans`).
+    """
+
+    global _DEFAULT_TRACER
+    if _DEFAULT_TRACER is None:
+        with _DEFAULT_TRACER_LOCK:
+            if _DEFAULT_TRACER is None:
+                path = trace_export_path()
+                exporter: SpanExporter = NdjsonExporter(path) if path else RingBufferExporter(trace_ring_size())
+                _DEFAULT_TRACER = Tracer(sample_rate=trace_sample_rate(), exporter=exporter)
+    return _DEFAULT_TRACER
+
+
+def recent_spans() -> list[dict[str, Any]]:
+    """Spans held by the shared tracer's ring buffer (empty when exporting to a file)."""
+
+    exporter = default_tracer().exporter
+    return exporter.snapshot() if isinstance(exporter, RingBufferExporter) else []
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Any
+
 from support_bot.agent.archetypes.context_builder import ContextBuilder
 from support_bot.agent.archetypes.critic import Critic
 from support_bot.agent.archetypes.executor import Executor
@@ -8,6 +10,8 @@ from support_bot.agent.archetypes.reporter import Reporter
 from support_bot.agent.archetypes.run_manager import RunManager
 from support_bot.agent.governance.memory_manager import MemoryManager
 from support_bot.agent.governance.safety_guard import SafetyGuard
+from support_bot.cache import register_cache_metrics
+from support_bot.metrics import REGISTRY
 
 
 _DEFAULT_AGENT: RunManager | None = None
@@ -38,3 +42,20 @@ def build_default_agent() -> RunManager:
         reporter=reporter,
     )
     return _DEFAULT_AGENT
+
+
+def _memory_stats() -> dict[str, Any] | None:
+    """`MemoryManager.snapshot()` of the default agent, once it is built."""
+
+    return _DEFAULT_AGENT.context_builder.memory.snapshot() if _DEFAULT_AGENT is not None else None
+
+
+def _memory_bytes() -> dict[tuple[str, ...], float] | None:
+    stats = _memory_stats()
+    return {(): stats["bytes"]} if stats is not None else None
+
+
+register_cache_metrics("session", _memory_stats)
+SESSION_MEMORY_BYTES = REGISTRY.callback(
+    "support_bot_session_memory_bytes", "Approximate size of the session memory.", _memory_bytes
+)
@@ -1,26 +1,116 @@
 from __future__ import annotations
 
+import sys
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
+
+from support_bot.cache import CacheStats
+from support_bot.config import memory_idle_ttl, memory_max_bytes, memory_max_sessions
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
 
 
 @dataclass
 class MemoryManager:
-    """Minimal memory stub.
+    """Per-session memory: session_id -> context of the last turn.
 
-    Keeps a dict of session_id -> context dict. This is deliberately tiny for
-    Module 1; it demonstrates where memory would be wired in.
+    Bounded in three ways, all enforced in O(1) per operation: at most `max_sessions`
+    sessions (least recently used evicted first), sessions unused for `idle_ttl`
+    seconds expire, and the approximate size of what is kept stays under `max_bytes`.
+    Contexts are stored read-only, so `get_context` returns them without copying.
+    Safe to share between request threads.
     """
 
-    store: dict[str, dict[str, Any]] = field(default_factory=dict)
+    max_sessions: int = field(default_factory=memory_max_sessions)
+    idle_ttl: float | None = field(default_factory=memory_idle_ttl)
+    max_bytes: int | None = field(default_factory=memory_max_bytes)
+    clock: Callable[[], float] = time.monotonic
+
+    def __post_init__(self) -> None:
+        self.stats = CacheStats()
+        self.bytes = 0
+        # session_id -> (last used, approximate bytes, context), least recently used first.
+        self._store: OrderedDict[str, tuple[float, int, Mapping[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
 
-    def get_context(self, session_id: str | None) -> dict[str, Any]:
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def get_context(self, session_id: str | None) -> Mapping[str, Any]:
         if not session_id:
-            return {}
-        return dict(self.store.get(session_id, {}))
+            return _EMPTY
+        with self._lock:
+            entry = self._store.get(session_id)
+            if entry is None:
+                self.stats.misses += 1
+                return _EMPTY
+            last_used, size, context = entry
+            now = self.clock()
+            if self.idle_ttl is not None and now - last_used >= self.idle_ttl:
+                del self._store[session_id]
+                self.bytes -= size
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return _EMPTY
+            self._store[session_id] = (now, size, context)
+            self._store.move_to_end(session_id)
+            self.stats.hits += 1
+            return context
 
     def store_turn(self, session_id: str | None, user_text: str, response_text: str) -> None:
-        if not session_id:
+        if not session_id or self.max_sessions <= 0:
             return
         # For now store only the last turn.
-        self.store[session_id] = {"last_user_text": user_text, "last_response_text": response_text}
+        context = MappingProxyType({"last_user_text": user_text, "last_response_text": response_text})
+        size = _approx_size(session_id, context)
+        with self._lock:
+            now = self.clock()
+            previous = self._store.pop(session_id, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._store[session_id] = (now, size, context)
+            self.bytes += size
+            self._evict(now)
+
+    def forget(self, session_id: str) -> bool:
+        with self._lock:
+            entry = self._store.pop(session_id, None)
+            if entry is None:
+                return False
+            self.bytes -= entry[1]
+            self.stats.invalidations += 1
+            return True
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._store),
+                "max_sessions": self.max_sessions,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "idle_ttl": self.idle_ttl,
+                **self.stats.as_dict(),
+            }
+
+    def _evict(self, now: float) -> None:
+        # The least recently used session is also the longest idle, so the front of
+        # the order is the only place expired or evictable sessions need to be sought.
+        store = self._store
+        while store:
+            session_id, (last_used, size, _) = next(iter(store.items()))
+            if self.idle_ttl is not None and now - last_used >= self.idle_ttl:
+                self.stats.expirations += 1
+            elif len(store) > self.max_sessions or (self.max_bytes is not None and self.bytes > self.max_bytes):
+                self.stats.evictions += 1
+            else:
+                return
+            del store[session_id]
+            self.bytes -= size
+
+
+def _approx_size(session_id: str, context: Mapping[str, Any]) -> int:
+    return sys.getsizeof(session_id) + sum(sys.getsizeof(value) for value in context.values())
@@ -0,0 +1,126 @@
+"""Small thread-safe LRU cache with per-entry TTL and hit/miss/eviction counters."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Generic, Hashable, TypeVar
+
+from support_bot.metrics import REGISTRY
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING: Any = object()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "hit_rate": round(self.hit_rate, 4)}
+
+
+class TTLCache(Generic[K, V]):
+    """LRU cache bounded by `maxsize` entries; entries expire `ttl` seconds after `set`.
+
+    `ttl=None` means entries never expire; `set(..., ttl=...)` overrides it per entry.
+    `maxsize <= 0` disables the cache (every lookup misses, nothing is stored).
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float | None = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._clock = clock
+        self._data: OrderedDict[K, tuple[float | None, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K, default: Any = None) -> V | Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.stats.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at is not None and self._clock() >= expires_at:
+                del self._data[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key: K, value: V, ttl: float | None = _MISSING) -> None:
+        if self.maxsize <= 0:
+            return
+        if ttl is _MISSING:
+            ttl = self.ttl
+        expires_at = None if ttl is None else self._clock() + ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+
+    def invalidate(self, key: K) -> bool:
+        with self._lock:
+            if self._data.pop(key, _MISSING) is _MISSING:
+                return False
+            self.stats.invalidations += 1
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self.stats.invalidations += len(self._data)
+            self._data.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"size": len(self._data), "maxsize": self.maxsize, "ttl": self.ttl, **self.stats.as_dict()}
+
+
+_CACHE_EVENTS = ("hits", "misses", "evictions", "expirations", "invalidations")
+
+
+def register_cache_metrics(name: str, snapshot: Callable[[], dict[str, Any] | None]) -> None:
+    """Export a cache's `snapshot()` as `support_bot_<name>_cache_*` metrics."""
+
+    def events() -> dict[tuple[str, ...], float] | None:
+        stats = snapshot()
+        return {(event,): stats[event] for event in _CACHE_EVENTS} if stats is not None else None
+
+    def entries() -> dict[tuple[str, ...], float] | None:
+        stats = snapshot()
+        return {(): stats["size"]} if stats is not None else None
+
+    REGISTRY.callback(
+        f"support_bot_{name}_cache_events_total",
+        f"{name.capitalize()} cache lookups and removals by event.",
+        events,
+        kind="counter",
+        labelnames=("event",),
+    )
+    REGISTRY.callback(f"support_bot_{name}_cache_entries", f"Entries in the {name} cache.", entries)
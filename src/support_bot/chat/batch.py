@@ -0,0 +1,115 @@
+"""Batch replay: stream JSONL messages through the agent and JSONL replies out.
+
+Each input line is a JSON object with a `message` (optionally `id` and
+`search_offset`) or a bare JSON string. Each output line carries the input's `id`, if
+any, and the `reply` (plus `debug` with `--debug`); a line that cannot be parsed yields
+`{"line": N, "error": ...}`. Output order follows input order.
+
+    python -m support_bot.chat.batch < messages.jsonl > replies.jsonl
+    python -m support_bot.chat.batch -i messages.jsonl -o replies.jsonl --processes 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any, Iterable, TextIO
+
+from support_bot.agent.core.models import AgentInput
+from support_bot.chat.handler import batch_pool, run_user_queries
+
+
+def parse_line(line: str, *, debug: bool = False) -> tuple[dict[str, Any], AgentInput | None]:
+    """(output fields known up front, input to run); the input is None for a bad line."""
+
+    try:
+        payload = json.loads(line)
+    except ValueError as e:
+        return {"error": f"invalid JSON: {e}"}, None
+    if isinstance(payload, str):
+        payload = {"message": payload}
+    if not isinstance(payload, dict) or not isinstance(payload.get("message"), str):
+        return {"error": "expected a string or an object with a string \"message\""}, None
+
+    fields = {"id": payload["id"]} if "id" in payload else {}
+    try:
+        search_offset = max(0, int(payload.get("search_offset") or 0))
+    except (TypeError, ValueError):
+        return {**fields, "error": "search_offset must be an integer"}, None
+    return fields, AgentInput(user_text=payload["message"], debug=debug, search_offset=search_offset)
+
+
+def replay(
+    lines: Iterable[str],
+    out: TextIO,
+    *,
+    batch_size: int = 1000,
+    processes: int = 1,
+    debug: bool = False,
+) -> int:
+    """Answer every non-blank line of `lines` into `out`; returns the number of lines written."""
+
+    written = 0
+    batch: list[tuple[dict[str, Any], AgentInput | None]] = []
+    # One set of worker processes serves every batch of the replay.
+    pool = batch_pool(processes) if processes > 1 else None
+
+    def flush() -> None:
+        nonlocal written
+        inputs = [i for _, i in batch if i is not None]
+        outputs = iter(run_user_queries(inputs, processes=processes, pool=pool))
+        for fields, agent_input in batch:
+            if agent_input is not None:
+                output = next(outputs)
+                fields = {**fields, "reply": output.response_text}
+                if debug:
+                    fields["debug"] = output.debug
+            out.write(json.dumps(fields, ensure_ascii=False, default=str) + "\n")
+            written += 1
+        out.flush()
+        batch.clear()
+
+    try:
+        for lineno, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            fields, agent_input = parse_line(line, debug=debug)
+            if agent_input is None:
+                fields = {"line": lineno, **fields}
+            batch.append((fields, agent_input))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return written
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run JSONL messages through the support agent.")
+    parser.add_argument("-i", "--input", help="JSONL file to read (default: stdin)")
+    parser.add_argument("-o", "--output", help="JSONL file to write (default: stdout)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="messages run together (default: 1000)")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes (default: 1)")
+    parser.add_argument("--debug", action="store_true", help="include the debug payload in every reply")
+    args = parser.parse_args(argv)
+
+    source = open(args.input, encoding="utf-8") if args.input else sys.stdin
+    sink = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        count = replay(
+            source, sink, batch_size=max(1, args.batch_size), processes=args.processes, debug=args.debug
+        )
+    finally:
+        if args.input:
+            source.close()
+        if args.output:
+            sink.close()
+    print(f"{count} replies written", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,93 @@
 
 from __future__ import annotations
 
-from support_bot.agent.core.models import AgentInput
+from concurrent.futures import Executor
+from typing import Sequence
+
+from support_bot.agent.core.models import AgentInput, AgentOutput
 from support_bot.agent.factory import build_default_agent
+from support_bot.services.order_status import set_order_backend
+from support_bot.services.product_catalog import warmup
+
+
+def run_user_query(
+    user_input: str,
+    *,
+    debug: bool = False,
+    search_offset: int = 0,
+    deadline: float | None = None,
+) -> AgentOutput:
+    """Run the meta-agent and return its full output (used by the web layer for paging).
+
+    `deadline` is a `time.monotonic()` value bounding tool execution.
+    """
+
+    agent = build_default_agent()
+    return agent.run(
+        AgentInput(user_text=user_input or "", debug=debug, search_offset=search_offset, deadline=deadline)
+    )
+
+
+async def arun_user_query(
+    user_input: str,
+    *,
+    debug: bool = False,
+    search_offset: int = 0,
+    deadline: float | None = None,
+) -> AgentOutput:
+    """Async `run_user_query`: awaits tools on the running event loop (`RunManager.arun`)."""
+
+    agent = build_default_agent()
+    return await agent.arun(
+        AgentInput(user_text=user_input or "", debug=debug, search_offset=search_offset, deadline=deadline)
+    )
+
+
+def batch_pool(processes: int) -> Executor:
+    """Worker processes for `run_user_queries(..., pool=...)`; the caller shuts it down."""
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    from support_bot.services.catalog_shards import default_mp_context
+
+    # Load the catalog once here so forked workers inherit it.
+    warmup()
+    return ProcessPoolExecutor(
+        max_workers=processes, mp_context=default_mp_context(), initializer=_init_batch_worker
+    )
+
+
+def run_user_queries(
+    agent_inputs: Sequence[AgentInput], *, processes: int = 1, pool: Executor | None = None
+) -> list[AgentOutput]:
+    """Run a batch of inputs (`RunManager.run_batch`); outputs are in input order.
+
+    With `processes > 1` the batch is cut into contiguous chunks, one per worker
+    process; tool work is then shared within each chunk only. Callers running many
+    batches pass a `pool` from `batch_pool(processes)` instead of starting workers
+    for every call.
+    """
+
+    agent_inputs = list(agent_inputs)
+    if processes <= 1 or len(agent_inputs) < 2:
+        return build_default_agent().run_batch(agent_inputs)
+
+    from support_bot.services.catalog_shards import shard_bounds
+
+    chunks = [agent_inputs[start:end] for start, end in shard_bounds(len(agent_inputs), processes)]
+    if pool is not None:
+        return [output for outputs in pool.map(_run_batch_chunk, chunks) for output in outputs]
+    with batch_pool(len(chunks)) as own_pool:
+        return [output for outputs in own_pool.map(_run_batch_chunk, chunks) for output in outputs]
+
+
+def _init_batch_worker() -> None:
+    # Pooled order-service connections must not be shared with the parent process.
+    set_order_backend(None)
+
+
+def _run_batch_chunk(agent_inputs: list[AgentInput]) -> list[AgentOutput]:
+    return build_default_agent().run_batch(agent_inputs)
 
 
 def handle_user_query(user_input: str, debug: bool = False):
@@ -18,14 +103,32 @@ def handle_user_query(user_input: str, debug: bool = False):
     - `trace`
     """
 
-    agent = build_default_agent()
-    agent_output = agent.run(AgentInput(user_text=user_input or "", debug=debug))
+    agent_output = run_user_query(user_input, debug=debug)
 
     if debug:
         return agent_output.response_text, agent_output.debug
     return agent_output.response_text
 
 
+async def ahandle_user_query(user_input: str, debug: bool = False):
+    """Async `handle_user_query`, with the same return shapes."""
+
+    agent_output = await arun_user_query(user_input, debug=debug)
+
+    if debug:
+        return agent_output.response_text, agent_output.debug
+    return agent_output.response_text
+
+
+def handle_user_queries(user_inputs: Sequence[str], debug: bool = False, *, processes: int = 1) -> list:
+    """Batch `handle_user_query`: one result per input, in order, with the same shapes."""
+
+    outputs = run_user_queries([AgentInput(user_text=text or "", debug=debug) for text in user_inputs], processes=processes)
+    if debug:
+        return [(output.response_text, output.debug) for output in outputs]
+    return [output.response_text for output in outputs]
+
+
 def create_thread_and_ask(question: str):
     """Simulate creating a thread and asking the assistant; returns response and debug info."""
 
@@ -31,3 +31,342 @@ def products_path() -> Path:
     if raw:
         return Path(raw).expanduser().resolve()
     return default_products_path()
+
+
+def catalog_reload_interval() -> float:
+    """Seconds between catalog file checks; 0 disables hot reload.
+
+    Read from the `CATALOG_RELOAD_INTERVAL` env var (default: 0).
+    """
+
+    raw = os.getenv("CATALOG_RELOAD_INTERVAL")
+    if not raw:
+        return 0.0
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return 0.0
+
+
+def catalog_reload_max_skipped() -> int:
+    """Malformed records tolerated in a hot-reloaded catalog (`CATALOG_RELOAD_MAX_SKIPPED`, default 0)."""
+
+    raw = os.getenv("CATALOG_RELOAD_MAX_SKIPPED")
+    if not raw:
+        return 0
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return 0
+
+
+def catalog_compact() -> bool:
+    """Whether to keep the catalog in columnar compact storage (`CATALOG_COMPACT=1`)."""
+
+    return os.getenv("CATALOG_COMPACT", "").strip() == "1"
+
+
+def catalog_snapshot_path() -> Path | None:
+    """Compiled catalog snapshot to prefer over JSON (`CATALOG_SNAPSHOT` env var), if any."""
+
+    raw = os.getenv("CATALOG_SNAPSHOT")
+    if raw:
+        return Path(raw).expanduser().resolve()
+    return None
+
+
+def search_page_size() -> int:
+    """How many product matches one reply shows (`SEARCH_PAGE_SIZE`, default 10; 0 = all)."""
+
+    raw = os.getenv("SEARCH_PAGE_SIZE")
+    if not raw:
+        return 10
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return 10
+
+
+def search_ranking() -> str:
+    """Ranking engine for product search: "rules" (default) or "bm25" (`SEARCH_RANKING`)."""
+
+    raw = (os.getenv("SEARCH_RANKING") or "").strip().lower()
+    return raw if raw in {"rules", "bm25"} else "rules"
+
+
+
+def search_cache_size() -> int:
+    """Max cached product-search results (`SEARCH_CACHE_SIZE`, default 1024; 0 = off)."""
+
+    raw = os.getenv("SEARCH_CACHE_SIZE")
+    if not raw:
+        return 1024
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return 1024
+
+
+def search_cache_ttl() -> float:
+    """Seconds a cached product-search result stays valid (`SEARCH_CACHE_TTL`, default 300)."""
+
+    raw = os.getenv("SEARCH_CACHE_TTL")
+    if not raw:
+        return 300.0
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return 300.0
+
+
+def catalog_shards() -> int:
+    """Worker processes for sharded catalog search (`CATALOG_SHARDS`, default 0 = CPU count)."""
+
+    raw = os.getenv("CATALOG_SHARDS")
+    if not raw:
+        return 0
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return 0
+
+
+def executor_concurrent() -> bool:
+    """Whether independent tool steps run in parallel (`EXECUTOR_CONCURRENT=1`)."""
+
+    return os.getenv("EXECUTOR_CONCURRENT", "").strip() == "1"
+
+
+def executor_workers() -> int:
+    """Threads in the shared tool pool (`EXECUTOR_WORKERS`, default 8)."""
+
+    raw = os.getenv("EXECUTOR_WORKERS")
+    if not raw:
+        return 8
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        return 8
+
+
+def tool_timeout() -> float | None:
+    """Seconds a concurrent tool call may take (`TOOL_TIMEOUT`, default 10; 0 = no limit)."""
+
+    raw = os.getenv("TOOL_TIMEOUT")
+    if not raw:
+        return 10.0
+    try:
+        value = float(raw)
+    except ValueError:
+        return 10.0
+    return value if value > 0 else None
+
+
+def request_timeout() -> float | None:
+    """Seconds one agent run may spend executing tools (`REQUEST_TIMEOUT`, default: none)."""
+
+    raw = os.getenv("REQUEST_TIMEOUT")
+    if not raw:
+        return None
+    try:
+        value = float(raw)
+    except ValueError:
+        return None
+    return value if value > 0 else None
+
+
+def order_service_url() -> str | None:
+    """Base URL of the order service (`ORDER_SERVICE_URL`); unset means the local mock."""
+
+    raw = (os.getenv("ORDER_SERVICE_URL") or "").strip()
+    return raw or None
+
+
+def order_service_timeout() -> float:
+    """Socket timeout in seconds for order service requests (`ORDER_SERVICE_TIMEOUT`, default 5)."""
+
+    raw = os.getenv("ORDER_SERVICE_TIMEOUT")
+    if not raw:
+        return 5.0
+    try:
+        return max(0.1, float(raw))
+    except ValueError:
+        return 5.0
+
+
+def order_service_pool_size() -> int:
+    """Idle keep-alive connections kept to the order service (`ORDER_SERVICE_POOL_SIZE`, default 8)."""
+
+    raw = os.getenv("ORDER_SERVICE_POOL_SIZE")
+    if not raw:
+        return 8
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        return 8
+
+
+def order_service_max_concurrency() -> int:
+    """Max requests in flight to the order service (`ORDER_SERVICE_MAX_CONCURRENCY`, default 16).
+
+    Also the number of threads serving async lookups, so at most this many of them are
+    in progress at once; further ones wait for a free thread.
+    """
+
+    raw = os.getenv("ORDER_SERVICE_MAX_CONCURRENCY")
+    if not raw:
+        return 16
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        return 16
+
+
+def order_service_retries() -> int:
+    """Retries after a failed order service request (`ORDER_SERVICE_RETRIES`, default 2)."""
+
+    raw = os.getenv("ORDER_SERVICE_RETRIES")
+    if not raw:
+        return 2
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return 2
+
+
+def order_cache_size() -> int:
+    """Max cached order lookups (`ORDER_CACHE_SIZE`, default 10000; 0 = off)."""
+
+    raw = os.getenv("ORDER_CACHE_SIZE")
+    if not raw:
+        return 10_000
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return 10_000
+
+
+def order_cache_ttls() -> tuple[float, float, float]:
+    """(terminal, active, negative) order cache TTLs in seconds.
+
+    From `ORDER_CACHE_TERMINAL_TTL` (Delivered/Cancelled, default 21600),
+    `ORDER_CACHE_ACTIVE_TTL` (other statuses, default 30) and `ORDER_CACHE_NEGATIVE_TTL`
+    (unknown order ids, default 60).
+    """
+
+    def ttl(name: str, default: float) -> float:
+        raw = os.getenv(name)
+        if not raw:
+            return default
+        try:
+            return max(0.0, float(raw))
+        except ValueError:
+            return default
+
+    return (
+        ttl("ORDER_CACHE_TERMINAL_TTL", 6 * 3600.0),
+        ttl("ORDER_CACHE_ACTIVE_TTL", 30.0),
+        ttl("ORDER_CACHE_NEGATIVE_TTL", 60.0),
+    )
+
+
+def order_webhook_token() -> str | None:
+    """Shared secret for the order-update webhook (`ORDER_WEBHOOK_TOKEN`); unset disables it."""
+
+    raw = (os.getenv("ORDER_WEBHOOK_TOKEN") or "").strip()
+    return raw or None
+
+
+def trace_sample_rate() -> float:
+    """Fraction of agent runs traced (`TRACE_SAMPLE_RATE`, 0..1, default 0); debug runs always are."""
+
+    raw = os.getenv("TRACE_SAMPLE_RATE")
+    if not raw:
+        return 0.0
+    try:
+        return min(1.0, max(0.0, float(raw)))
+    except ValueError:
+        return 0.0
+
+
+def trace_export_path() -> Path | None:
+    """NDJSON file that finished trace spans are appended to (`TRACE_EXPORT_PATH`), if any."""
+
+    raw = os.getenv("TRACE_EXPORT_PATH")
+    if raw:
+        return Path(raw).expanduser().resolve()
+    return None
+
+
+def trace_ring_size() -> int:
+    """Spans kept in memory when not exporting to a file (`TRACE_RING_SIZE`, default 1000)."""
+
+    raw = os.getenv("TRACE_RING_SIZE")
+    if not raw:
+        return 1000
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        return 1000
+
+
+def response_cache_size() -> int:
+    """Max cached agent replies (`RESPONSE_CACHE_SIZE`, default 1024; 0 = off)."""
+
+    raw = os.getenv("RESPONSE_CACHE_SIZE")
+    if not raw:
+        return 1024
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return 1024
+
+
+def response_cache_ttl() -> float:
+    """Seconds a cached agent reply stays valid (`RESPONSE_CACHE_TTL`, default 300)."""
+
+    raw = os.getenv("RESPONSE_CACHE_TTL")
+    if not raw:
+        return 300.0
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return 300.0
+
+
+def memory_max_sessions() -> int:
+    """Sessions kept by the agent's MemoryManager (`MEMORY_MAX_SESSIONS`, default 10000; 0 = off)."""
+
+    raw = os.getenv("MEMORY_MAX_SESSIONS")
+    if not raw:
+        return 10_000
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return 10_000
+
+
+def memory_idle_ttl() -> float | None:
+    """Seconds an unused session's memory is kept (`MEMORY_IDLE_TTL`, default 3600; 0 = forever)."""
+
+    raw = os.getenv("MEMORY_IDLE_TTL")
+    if not raw:
+        return 3600.0
+    try:
+        value = float(raw)
+    except ValueError:
+        return 3600.0
+    return value if value > 0 else None
+
+
+def memory_max_bytes() -> int | None:
+    """Approximate bytes of session memory kept (`MEMORY_MAX_BYTES`, default 32 MiB; 0 = no limit)."""
+
+    raw = os.getenv("MEMORY_MAX_BYTES")
+    if not raw:
+        return 32 * 1024 * 1024
+    try:
+        value = int(raw)
+    except ValueError:
+        return 32 * 1024 * 1024
+    return value if value > 0 else None
@@ -0,0 +1,261 @@
+"""In-process metrics: labelled counters, fixed-bucket histograms and callback metrics.
+
+Metrics are registered once at import time; each distinct label combination gets its
+own child with its own lock, so concurrent updates of different series never contend.
+Callback metrics instead read stats a component already keeps (cache counters, reload
+stats) each time the registry is rendered.
+`REGISTRY.render()` produces the Prometheus text exposition format served at `/metrics`.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Generic, Mapping, Optional, Tuple, TypeVar
+
+# Seconds; tuned for agent stages (sub-millisecond) up to slow order-service calls.
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+C = TypeVar("C")
+
+
+class _Metric(Generic[C]):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], C] = {}
+        self._lock = threading.Lock()
+
+    def _child(self, labels: tuple[str, ...]) -> C:
+        child = self._children.get(labels)
+        if child is None:
+            if len(labels) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+            with self._lock:
+                child = self._children.get(labels)
+                if child is None:
+                    child = self._children[labels] = self._new_child()
+        return child
+
+    def _new_child(self) -> C:
+        raise NotImplementedError
+
+    def _series(self) -> list[tuple[tuple[str, ...], C]]:
+        with self._lock:
+            return sorted(self._children.items())
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, child in self._series():
+            lines.extend(self._render_child(dict(zip(self.labelnames, labels)), child))
+        return lines
+
+    def _render_child(self, labels: dict[str, str], child: C) -> list[str]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ("value", "lock")
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+
+class Counter(_Metric[_CounterChild]):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        child = self._child(labels)
+        with child.lock:
+            child.value += amount
+
+    def value(self, *labels: str) -> float:
+        child = self._children.get(labels)
+        return child.value if child is not None else 0.0
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def _render_child(self, labels: dict[str, str], child: _CounterChild) -> list[str]:
+        return [f"{self.name}{_labels(labels)} {_number(child.value)}"]
+
+
+class _HistogramChild:
+    __slots__ = ("counts", "sum", "lock")
+
+    def __init__(self, size: int) -> None:
+        # One slot per bucket plus +Inf; cumulated only when rendered.
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_labels", "_started")
+
+    def __init__(self, histogram: "Histogram", labels: tuple[str, ...]) -> None:
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._histogram.observe(time.perf_counter() - self._started, *self._labels)
+
+
+class Histogram(_Metric[_HistogramChild]):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        *,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        child = self._child(labels)
+        slot = bisect_left(self.buckets, value)
+        with child.lock:
+            child.counts[slot] += 1
+            child.sum += value
+
+    def time(self, *labels: str) -> _Timer:
+        """Context manager observing the seconds spent inside it."""
+
+        return _Timer(self, labels)
+
+    def count(self, *labels: str) -> int:
+        child = self._children.get(labels)
+        return sum(child.counts) if child is not None else 0
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(len(self.buckets) + 1)
+
+    def _render_child(self, labels: dict[str, str], child: _HistogramChild) -> list[str]:
+        with child.lock:
+            counts, total = list(child.counts), child.sum
+        lines: list[str] = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, float("inf")), counts):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_labels({**labels, 'le': _number(bound)})} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(labels)} {_number(total)}")
+        lines.append(f"{self.name}_count{_labels(labels)} {cumulative}")
+        return lines
+
+
+# Samples by label values; None (e.g. a component that is not running) renders none.
+Samples = Optional[Mapping[Tuple[str, ...], float]]
+
+
+class CallbackMetric:
+    """A counter or gauge whose samples come from `collect()` at render time."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        collect: Callable[[], Samples],
+        *,
+        kind: str = "gauge",
+        labelnames: tuple[str, ...] = (),
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.collect = collect
+        self.kind = kind
+        self.labelnames = labelnames
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in sorted((self.collect() or {}).items()):
+            lines.append(f"{self.name}{_labels(dict(zip(self.labelnames, labels)))} {_number(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric[Any] | CallbackMetric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        *,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets=buckets))
+
+    def callback(
+        self,
+        name: str,
+        help: str,
+        collect: Callable[[], Samples],
+        *,
+        kind: str = "gauge",
+        labelnames: tuple[str, ...] = (),
+    ) -> CallbackMetric:
+        return self._register(CallbackMetric(name, help, collect, kind=kind, labelnames=labelnames))
+
+    def _register(self, metric: Any) -> Any:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "".join(line + "\n" for metric in metrics for line in metric.render())
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = Registry()
+
+AGENT_RUNS = REGISTRY.counter("support_bot_agent_runs_total", "Agent runs by outcome.", ("outcome",))
+AGENT_STAGE_SECONDS = REGISTRY.histogram(
+    "support_bot_agent_stage_seconds", "Time spent in each agent stage.", ("stage",)
+)
+TOOL_CALLS = REGISTRY.counter("support_bot_tool_calls_total", "Planned tool calls by tool and outcome.", ("tool", "outcome"))
+TOOL_SECONDS = REGISTRY.histogram("support_bot_tool_seconds", "Run time of tool calls.", ("tool",))
+HTTP_REQUESTS = REGISTRY.counter("support_bot_http_requests_total", "HTTP requests by route and status.", ("route", "status"))
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "support_bot_http_request_seconds", "HTTP request handling time.", ("route",)
+)
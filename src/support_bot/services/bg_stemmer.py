@@ -0,0 +1,44 @@
+# Light Bulgarian stemmer used to match article/case forms in catalog search.
+#
+# Strips one definite article (та, то, ят, ът, ...) or, failing that, one adjective
+# ending (ски, ска, на, ен, ...). Suffix tables are compiled once at import and stems
+# are memoized, since the same catalog and query words are stemmed over and over.
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+ARTICLE_ENDINGS = ("ята", "ято", "ятo", "та", "то", "ят", "ът", "ьт")
+DESCRIPTOR_ENDINGS = ("ската", "ски", "ска", "на", "ен", "ни", "а")
+
+STEM_CACHE_SIZE = 65536
+
+
+def _compile(endings: tuple[str, ...], min_stem: int) -> tuple[tuple[int, int, frozenset[str]], ...]:
+    """Group endings by length, longest first: (length, min word length, endings)."""
+
+    lengths = sorted({len(e) for e in endings}, reverse=True)
+    return tuple((n, n + min_stem, frozenset(e for e in endings if len(e) == n)) for n in lengths)
+
+
+# An article is removed only if at least 3 letters remain, a descriptor ending only if
+# at least 4 remain. Within a table the longest ending that fits wins.
+_ARTICLE_TABLE = _compile(ARTICLE_ENDINGS, 3)
+_DESCRIPTOR_TABLE = _compile(DESCRIPTOR_ENDINGS, 4)
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def normalize_bulgarian(word: str) -> str:
+    """Remove Bulgarian articles and case endings for matching.
+
+    Handles definite articles: та (the-fem), то (the-neut), ят (the-pl), ът (the-masc)
+    Also removes common adjective endings: ски, ска, на, ен, а
+    """
+
+    word = word.lower()
+    size = len(word)
+    for table in (_ARTICLE_TABLE, _DESCRIPTOR_TABLE):
+        for n, min_size, endings in table:
+            if size >= min_size and word[-n:] in endings:
+                return word[:-n]
+    return word
@@ -0,0 +1,200 @@
+# BM25 ranking engine for catalog search (selected with SEARCH_RANKING=bm25).
+#
+# At load time every product's name/description/category tokens are turned into a
+# sparse term-document matrix per language, stored column-wise (term -> postings), and
+# each posting's BM25F contribution is precomputed. A query keyword matches the
+# vocabulary terms that contain it (the same substring semantics as the rule-based
+# scorer) and contributes, per product, the weight of its best-matching term, each term
+# weighted by the share of it the keyword covers; a product's score is the sum over the
+# keywords. NumPy, imported when the first ranker is built, is
+# used for the accumulation when installed; otherwise the same precomputed columns are
+# combined with plain `array` arithmetic.
+
+from __future__ import annotations
+
+import math
+import re
+from array import array
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Mapping, Sequence
+
+from support_bot.services.catalog_index import LANGUAGES, catalog_language
+
+_CYRILLIC_WORD = re.compile(r"[\u0400-\u04FF]+")
+
+FIELD_WEIGHTS = {"name": 3.0, "description": 1.0, "category": 1.0}
+K1 = 1.2
+B = 0.75
+
+
+def field_tokens(product: Mapping[str, Any], language: str, normalize: Callable[[str], str]) -> dict[str, list[str]]:
+    """Tokens per field; BG name/description also contribute their normalized words."""
+
+    if language == "bg":
+        name = str(product.get("name_bg", "")).lower()
+        desc = str(product.get("description_bg", "")).lower()
+    else:
+        name = str(product.get("name", "")).lower()
+        desc = str(product.get("description", "")).lower()
+    fields = {
+        "name": name.split(),
+        "description": desc.split(),
+        "category": str(product.get("category", "")).lower().split(),
+    }
+    if language == "bg":
+        fields["name"] += [normalize(w) for w in _CYRILLIC_WORD.findall(name)]
+        fields["description"] += [normalize(w) for w in _CYRILLIC_WORD.findall(desc)]
+    return fields
+
+
+@dataclass(frozen=True)
+class _TermMatrix:
+    """Column-oriented sparse matrix of precomputed BM25 term weights."""
+
+    vocabulary: dict[str, int]
+    docs: list[array]  # per term: product positions (uint32)
+    weights: list[array]  # per term: BM25 contribution of the term to each product
+    size: int
+
+    def matching_terms(self, needle: str) -> list[tuple[int, float]]:
+        """(term, share of the term covered by `needle`) for every term containing it."""
+
+        return [(t, len(needle) / len(token)) for token, t in self.vocabulary.items() if needle in token]
+
+
+def _build_matrix(
+    products: Iterable[Mapping[str, Any]],
+    language: str,
+    normalize: Callable[[str], str],
+    field_weights: Mapping[str, float],
+    k1: float,
+    b: float,
+) -> _TermMatrix:
+    vocabulary: dict[str, int] = {}
+    term_docs: list[array] = []
+    term_tfs: list[array] = []
+    doc_lengths = array("d")
+
+    for position, product in enumerate(products):
+        tf: dict[int, float] = {}
+        length = 0.0
+        if isinstance(product, Mapping):
+            for field, tokens in field_tokens(product, language, normalize).items():
+                weight = field_weights.get(field, 0.0)
+                if not weight:
+                    continue
+                for token in tokens:
+                    t = vocabulary.get(token)
+                    if t is None:
+                        t = vocabulary[token] = len(term_docs)
+                        term_docs.append(array("I"))
+                        term_tfs.append(array("d"))
+                    tf[t] = tf.get(t, 0.0) + weight
+                    length += weight
+        for t, value in tf.items():
+            term_docs[t].append(position)
+            term_tfs[t].append(value)
+        doc_lengths.append(length)
+
+    n = len(doc_lengths)
+    avgdl = (sum(doc_lengths) / n) if n else 0.0
+    weights: list[array] = []
+    for docs, tfs in zip(term_docs, term_tfs):
+        idf = math.log(1.0 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+        column = array("d")
+        for d, f in zip(docs, tfs):
+            norm = k1 * (1.0 - b + b * doc_lengths[d] / avgdl) if avgdl else k1
+            column.append(idf * f * (k1 + 1.0) / (f + norm))
+        weights.append(column)
+    return _TermMatrix(vocabulary=vocabulary, docs=term_docs, weights=weights, size=n)
+
+
+def _numpy() -> Any:
+    """The NumPy module, or None when it is not installed (optional dependency)."""
+
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover - exercised when NumPy is absent
+        return None
+    return numpy
+
+
+class BM25Ranker:
+    """Scores catalog products for a keyword with BM25F over the per-language matrices."""
+
+    def __init__(
+        self,
+        products: Sequence[Mapping[str, Any]],
+        normalize: Callable[[str], str],
+        *,
+        field_weights: Mapping[str, float] = FIELD_WEIGHTS,
+        k1: float = K1,
+        b: float = B,
+    ) -> None:
+        self.normalize = normalize
+        self._matrices = {
+            lang: _build_matrix(products, lang, normalize, field_weights, k1, b) for lang in LANGUAGES
+        }
+        self._np = np = _numpy()
+        self._numpy_columns: dict[str, list[tuple[Any, Any]]] = {}
+        if np is not None:
+            for lang, matrix in self._matrices.items():
+                self._numpy_columns[lang] = [
+                    (np.frombuffer(d, dtype=np.uint32), np.frombuffer(w, dtype=np.float64))
+                    for d, w in zip(matrix.docs, matrix.weights)
+                ]
+
+    def _query_terms(self, keyword: str, language: str) -> list[dict[int, float]]:
+        """Per query keyword that matches anything: term -> share of it the keyword covers."""
+
+        matrix = self._matrices[catalog_language(language)]
+        groups: list[dict[int, float]] = []
+        for kw in keyword.split():
+            needles = {kw.lower()}
+            if language == "bg":
+                needles.add(self.normalize(kw))
+            matched: dict[int, float] = {}
+            for needle in needles:
+                for t, share in matrix.matching_terms(needle):
+                    matched[t] = max(share, matched.get(t, 0.0))
+            if matched:
+                groups.append(matched)
+        return groups
+
+    def scored(self, keyword: str, language: str) -> list[tuple[float, int]]:
+        """(score, position) of every product sharing a term with the query, in catalog order."""
+
+        if not keyword:
+            return []
+        lang = catalog_language(language)
+        groups = self._query_terms(keyword, language)
+        if not groups:
+            return []
+
+        # A keyword counts once per product, through its best-matching term: summing
+        # every term containing "pro" would put "Surge Protector ... protection" ahead
+        # of "SmartWatch Pro".
+        np = self._np
+        if np is not None:
+            columns = self._numpy_columns[lang]
+            size = self._matrices[lang].size
+            scores = np.zeros(size, dtype=np.float64)
+            for terms in groups:
+                keyword_scores = np.zeros(size, dtype=np.float64)
+                for t, share in terms.items():
+                    docs, weights = columns[t]
+                    keyword_scores[docs] = np.maximum(keyword_scores[docs], weights * share)
+                scores += keyword_scores
+            hits = np.flatnonzero(scores)
+            return list(zip(scores[hits].tolist(), hits.tolist()))
+
+        matrix = self._matrices[lang]
+        acc: dict[int, float] = {}
+        for terms in groups:
+            best: dict[int, float] = {}
+            for t, share in terms.items():
+                for d, w in zip(matrix.docs[t], matrix.weights[t]):
+                    best[d] = max(best.get(d, 0.0), w * share)
+            for d, w in best.items():
+                acc[d] = acc.get(d, 0.0) + w
+        return [(acc[d], d) for d in sorted(acc)]
@@ -0,0 +1,215 @@
+# Inverted token index over the product catalog, built once at load time.
+#
+# Search semantics are substring-based (`keyword in product_text`). Keywords never
+# contain whitespace, so a keyword matches a product's text exactly when it is a
+# substring of one of the whitespace-separated tokens of that text. The index therefore
+# maps every token to the (sorted) positions of the products containing it, and a
+# lookup expands the keyword over the vocabulary instead of over every product.
+#
+# Keywords of NGRAM+ characters skip the vocabulary scan: a character n-gram index over
+# the vocabulary yields the only tokens that can contain the keyword, each is verified
+# with the exact substring test, and their posting lists give the products. The cost
+# then follows the number of matching tokens, not the catalog or vocabulary size.
+#
+# With `compact=True` (CATALOG_COMPACT) the precomputed product text is kept like the
+# compact product records: per language, each ProductText field is one string
+# addressed by offsets, and a ProductText is rebuilt only for the candidates scored.
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Mapping, Sequence
+
+from support_bot.services.compact_products import TextColumn
+
+_CYRILLIC_WORD = re.compile(r"[\u0400-\u04FF]+")
+
+LANGUAGES = ("en", "bg")
+NGRAM = 3
+
+
+def catalog_language(language: str) -> str:
+    """Map a request language onto the catalog text it searches ("bg" or "en")."""
+
+    return "bg" if language == "bg" else "en"
+
+
+@dataclass(frozen=True)
+class ProductText:
+    """Query-independent text of one product in one catalog language.
+
+    Holds exactly the strings `ProductCatalog.search` scores against, so they can be
+    computed once at load time instead of on every query.
+    """
+
+    full_text: str
+    normalized_name_text: str
+    normalized_text: str
+
+    @classmethod
+    def build(cls, product: Mapping[str, Any], language: str, normalize: Callable[[str], str]) -> "ProductText":
+        if language == "bg":
+            name_text = str(product.get("name_bg", "")).lower()
+            desc_text = str(product.get("description_bg", "")).lower()
+        else:
+            name_text = str(product.get("name", "")).lower()
+            desc_text = str(product.get("description", "")).lower()
+        category_text = str(product.get("category", "")).lower()
+        full_text = f"{name_text} {desc_text} {category_text}"
+
+        if language == "bg":
+            normalized_name_words = [normalize(w) for w in _CYRILLIC_WORD.findall(name_text)]
+            normalized_desc_words = [normalize(w) for w in _CYRILLIC_WORD.findall(desc_text)]
+            normalized_name_text = " ".join(normalized_name_words)
+            normalized_text = " ".join(normalized_name_words + normalized_desc_words) + " " + full_text
+        else:
+            normalized_name_text = name_text
+            normalized_text = full_text
+
+        return cls(
+            full_text=full_text,
+            normalized_name_text=normalized_name_text,
+            normalized_text=normalized_text,
+        )
+
+
+_EMPTY_TEXT = ProductText(full_text="", normalized_name_text="", normalized_text="")
+_TEXT_FIELDS = ("full_text", "normalized_name_text", "normalized_text")
+
+
+class CompactTexts(Sequence[ProductText]):
+    """Append-only ProductText list stored as one `TextColumn` per field."""
+
+    def __init__(self) -> None:
+        self._columns = tuple(TextColumn() for _ in _TEXT_FIELDS)
+
+    def append(self, text: ProductText) -> None:
+        for column, name in zip(self._columns, _TEXT_FIELDS):
+            column.append(getattr(text, name))
+
+    def freeze(self) -> None:
+        for column in self._columns:
+            column.freeze()
+
+    def __len__(self) -> int:
+        return len(self._columns[0])
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        full, name, normalized = self._columns
+        return ProductText(full_text=full[i], normalized_name_text=name[i], normalized_text=normalized[i])
+
+
+
+@dataclass
+class CatalogIndex:
+    """Token and n-gram posting lists plus precomputed product text, one per catalog language."""
+
+    normalize: Callable[[str], str]
+    postings: dict[str, dict[str, list[int]]] = field(default_factory=lambda: {lang: {} for lang in LANGUAGES})
+    grams: dict[str, dict[str, list[str]]] = field(default_factory=lambda: {lang: {} for lang in LANGUAGES})
+    texts: dict[str, list[ProductText] | CompactTexts] = field(default_factory=dict)
+    size: int = 0
+    # Keep `texts` as CompactTexts; call `freeze()` after the last `add()`.
+    compact: bool = False
+
+    def __post_init__(self) -> None:
+        for lang in LANGUAGES:
+            self.texts.setdefault(lang, CompactTexts() if self.compact else [])
+
+    @classmethod
+    def build(
+        cls, products: Iterable[Any], normalize: Callable[[str], str], *, compact: bool = False
+    ) -> "CatalogIndex":
+        index = cls(normalize=normalize, compact=compact)
+        for product in products:
+            index.add(product)
+        index.freeze()
+        return index
+
+    def add(self, product: Any) -> int:
+        """Index the next product and return its position."""
+
+        position = self.size
+        self.size += 1
+        for language in LANGUAGES:
+            if not isinstance(product, Mapping):
+                self.texts[language].append(_EMPTY_TEXT)
+                continue
+
+            text = ProductText.build(product, language, self.normalize)
+            self.texts[language].append(text)
+            table = self.postings[language]
+            for token in set(text.normalized_text.split()):
+                posting = table.get(token)
+                if posting is None:
+                    posting = table[token] = []
+                    self._add_grams(token, language)
+                posting.append(position)
+        return position
+
+    def freeze(self) -> None:
+        for texts in self.texts.values():
+            if isinstance(texts, CompactTexts):
+                texts.freeze()
+
+    def _add_grams(self, token: str, language: str) -> None:
+        gram_table = self.grams[language]
+        for gram in {token[i : i + NGRAM] for i in range(len(token) - NGRAM + 1)}:
+            gram_table.setdefault(gram, []).append(token)
+
+    def text(self, position: int, language: str) -> ProductText:
+        return self.texts[catalog_language(language)][position]
+
+    def matching_tokens(self, needle: str, language: str) -> list[str]:
+        """Vocabulary tokens that contain `needle` as a substring."""
+
+        return [token for token in self.postings[catalog_language(language)] if needle in token]
+
+    def ngram_tokens(self, needle: str, language: str) -> list[str]:
+        """Like `matching_tokens`, through the n-gram index (needs len(needle) >= NGRAM)."""
+
+        gram_table = self.grams[catalog_language(language)]
+        lists: list[list[str]] = []
+        for gram in {needle[i : i + NGRAM] for i in range(len(needle) - NGRAM + 1)}:
+            tokens = gram_table.get(gram)
+            if not tokens:
+                return []
+            lists.append(tokens)
+        lists.sort(key=len)
+
+        found = set(lists[0])
+        for tokens in lists[1:]:
+            # Once the candidates are fewer than the next list, verifying is cheaper.
+            if len(found) * 4 < len(tokens):
+                break
+            found.intersection_update(tokens)
+        return [token for token in found if needle in token]
+
+    def candidates(self, needles: Iterable[str], language: str) -> list[int]:
+        """Sorted positions of products whose text contains any of `needles`.
+
+        This is a superset of the products that score above zero; callers still verify
+        each candidate with the exact scoring rules.
+        """
+
+        table = self.postings[catalog_language(language)]
+        seen: set[str] = set()
+        positions: set[int] = set()
+        for needle in needles:
+            if not needle or needle in seen:
+                continue
+            seen.add(needle)
+            if len(needle) >= NGRAM:
+                tokens = self.ngram_tokens(needle, language)
+            else:
+                tokens = self.matching_tokens(needle, language)
+            for token in tokens:
+                positions.update(table[token])
+        return sorted(positions)
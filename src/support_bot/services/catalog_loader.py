@@ -0,0 +1,200 @@
+# Streaming catalog reader for JSON arrays and JSON Lines.
+#
+# Records are decoded one at a time from fixed-size chunks, so loading never holds the
+# whole file text next to the parsed catalog. Malformed records are reported and
+# skipped instead of discarding the whole catalog.
+
+from __future__ import annotations
+
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+CHUNK_SIZE = 1 << 16
+# A single record larger than this is treated as malformed rather than buffered forever.
+MAX_RECORD_CHARS = 1 << 22
+MAX_REPORTED_ERRORS = 50
+# A decode error this close to the end of the buffer may be a token (e.g. a \uXXXX
+# escape or a literal) cut by the chunk boundary, so more input is read before it counts.
+_TRUNCATION_MARGIN = 16
+
+_WS = re.compile(r"[ \t\n\r]*")
+_NEXT_RECORD = re.compile(r",[ \t\n\r]*(?=\{)")
+
+
+@dataclass
+class LoadReport:
+    """What happened while reading a catalog file."""
+
+    path: str
+    format: str | None = None
+    records: int = 0
+    skipped: int = 0
+    errors: list[str] = field(default_factory=list)
+    # Set when nothing could be read at all (missing file, not an array, ...).
+    fatal: str | None = None
+    # The file ended inside a record or before the closing ']' (e.g. still being written).
+    truncated: bool = False
+
+    def error(self, message: str) -> None:
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    @property
+    def ok(self) -> bool:
+        return self.fatal is None and not self.skipped
+
+
+def iter_products(path: Path, report: LoadReport) -> Iterator[dict[str, Any]]:
+    """Yield product dicts from `path` (JSON array or JSON Lines), filling `report`."""
+
+    try:
+        f = path.open("r", encoding="utf-8")
+    except OSError as e:
+        report.fatal = f"cannot open catalog: {e}"
+        return
+
+    with f:
+        head = f.read(CHUNK_SIZE)
+        stripped = head.lstrip("\ufeff \t\n\r")
+        if not stripped:
+            report.format = "empty"
+            return
+        if stripped[0] == "[":
+            report.format = "json"
+            yield from _iter_array(f, stripped[1:], report)
+        elif stripped[0] == "{":
+            report.format = "jsonl"
+            yield from _iter_lines(f, stripped, report)
+        else:
+            report.fatal = "catalog must be a JSON array or JSON Lines of objects"
+
+
+def _intern_keys(pairs: list[tuple[str, Any]]) -> dict[str, Any]:
+    # Records are decoded one by one, so json's per-document key memo does not dedupe
+    # keys across records; interning does.
+    return {sys.intern(k): v for k, v in pairs}
+
+
+_DECODER = json.JSONDecoder(object_pairs_hook=_intern_keys)
+
+
+def _accept(value: Any, where: str, report: LoadReport) -> bool:
+    if isinstance(value, dict):
+        report.records += 1
+        return True
+    report.error(f"{where}: expected an object, got {type(value).__name__}")
+    return False
+
+
+def _truncated(e: json.JSONDecodeError, buf: str) -> bool:
+    """Whether a decode error may just mean the record continues in the next chunk."""
+
+    return e.pos >= len(buf) - _TRUNCATION_MARGIN or e.msg.startswith("Unterminated string")
+
+
+def _iter_array(f, buf: str, report: LoadReport) -> Iterator[dict[str, Any]]:
+    eof = False
+    pos = 0
+    index = 0
+    expect_value = True
+
+    while True:
+        pos = _WS.match(buf, pos).end()
+        if pos >= len(buf) and not eof:
+            chunk = f.read(CHUNK_SIZE)
+            buf = buf[pos:] + chunk
+            pos = 0
+            eof = not chunk
+            continue
+        if pos >= len(buf):
+            report.truncated = True
+            report.error(f"record {index}: unexpected end of file (missing ']')")
+            return
+
+        ch = buf[pos]
+        if ch == "]":
+            return
+        if ch == "," and not expect_value:
+            pos += 1
+            expect_value = True
+            continue
+
+        try:
+            value, end = _DECODER.raw_decode(buf, pos)
+        except json.JSONDecodeError as e:
+            if not eof and _truncated(e, buf) and len(buf) - pos < MAX_RECORD_CHARS:
+                # Probably a record split across chunks: read more and retry.
+                chunk = f.read(CHUNK_SIZE)
+                buf = buf[pos:] + chunk
+                pos = 0
+                eof = not chunk
+                continue
+            if eof and _truncated(e, buf):
+                report.truncated = True
+            report.error(f"record {index}: {e.msg}")
+            index += 1
+            # Resynchronize on the next top-level-looking object.
+            while True:
+                m = _NEXT_RECORD.search(buf, pos + 1)
+                if m is not None:
+                    pos = m.end()
+                    expect_value = True
+                    break
+                if eof:
+                    return
+                chunk = f.read(CHUNK_SIZE)
+                buf = buf[pos:] + chunk
+                pos = 0
+                eof = not chunk
+            continue
+
+        if _accept(value, f"record {index}", report):
+            yield value
+        index += 1
+        pos = end
+        expect_value = False
+
+        # Keep the buffer small: drop what has been consumed.
+        if pos > CHUNK_SIZE:
+            buf = buf[pos:]
+            pos = 0
+
+
+def _iter_lines(f, head: str, report: LoadReport) -> Iterator[dict[str, Any]]:
+    def lines() -> Iterator[str]:
+        first, sep, rest = head.partition("\n")
+        if not sep:
+            # The first chunk holds no complete line; let the file iterator finish it.
+            yield first + f.readline()
+        else:
+            yield first + sep
+            pending = rest
+            if pending and not pending.endswith("\n"):
+                pending += f.readline()
+            # Only "\n" ends a record: str.splitlines() would also split on U+2028,
+            # U+2029 and \x85, which are legal inside JSON strings.
+            *complete, last = pending.split("\n")
+            yield from (part + "\n" for part in complete)
+            if last:
+                yield last
+        yield from f
+
+    for lineno, raw in enumerate(lines(), start=1):
+        line = raw.strip()
+        if not line:
+            continue
+        try:
+            value = _DECODER.decode(line)
+        except json.JSONDecodeError as e:
+            # Only the last line of the file can lack its newline.
+            if not raw.endswith("\n") and _truncated(e, line):
+                report.truncated = True
+            report.error(f"line {lineno}: {e.msg}")
+            continue
+        if _accept(value, f"line {lineno}", report):
+            yield value
@@ -0,0 +1,214 @@
+# Polls the catalog file and hot-swaps the default catalog when it changes.
+#
+# A new catalog (with its indexes) is built on the poller thread and swapped in with a
+# single reference assignment, so request threads never see a half-built catalog.
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+from support_bot.config import catalog_reload_max_skipped, products_path
+from support_bot.metrics import REGISTRY
+from support_bot.services.catalog_loader import LoadReport
+from support_bot.services.product_catalog import ProductCatalog, set_default_catalog
+
+logger = logging.getLogger(__name__)
+
+# (path, mtime_ns, size) of the catalog file, or None if it cannot be stat'ed.
+# A runtime alias, so spelled with typing generics to import on Python < 3.10.
+FileSignature = Optional[Tuple[str, int, int]]
+
+
+def file_signature(path: Path) -> FileSignature:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+@dataclass
+class ReloadStats:
+    checks: int = 0
+    reloads: int = 0
+    failures: int = 0
+    last_duration_s: float | None = None
+    total_duration_s: float = 0.0
+    last_reload_at: float | None = None
+    last_error: str | None = None
+
+
+class CatalogReloader:
+    """Reload the catalog when its file's mtime or size changes.
+
+    `check()` can be called directly (e.g. from tests or an admin hook); `start()` runs it
+    every `interval` seconds on a daemon thread.
+
+    A file that looks mid-write (empty, truncated, or with more than `max_skipped`
+    malformed records) is not swapped in; it is retried on the next tick.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        *,
+        interval: float = 2.0,
+        on_swap: Callable[[ProductCatalog], None] = set_default_catalog,
+        max_skipped: int | None = None,
+    ) -> None:
+        self.path = path
+        self.max_skipped = catalog_reload_max_skipped() if max_skipped is None else max_skipped
+        self.interval = interval
+        self.on_swap = on_swap
+        self.stats = ReloadStats()
+        self._signature = file_signature(self._path())
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _path(self) -> Path:
+        return self.path or products_path()
+
+    def check(self) -> bool:
+        """Reload if the file changed since the last successful load; return True on swap."""
+
+        with self._lock:
+            self.stats.checks += 1
+            path = self._path()
+            signature = file_signature(path)
+            if signature is None or signature == self._signature:
+                return False
+
+            started = time.perf_counter()
+            try:
+                catalog = ProductCatalog.open(path)
+            except Exception as e:
+                self.stats.failures += 1
+                self.stats.last_error = str(e)
+                return False
+
+            # The file was rewritten while we read it: try again on the next tick.
+            if file_signature(path) != signature:
+                return False
+
+            # Keep serving the current catalog if the new file is unusable as a whole.
+            if catalog.report is not None and catalog.report.fatal:
+                self.stats.failures += 1
+                self.stats.last_error = catalog.report.fatal
+                self._signature = signature
+                return False
+
+            rejection = self._rejection(catalog.report)
+            if rejection is not None:
+                # Likely caught mid-write: keep the signature so the next tick retries.
+                logger.warning("not reloading catalog %s: %s; keeping the current catalog", path, rejection)
+                self.stats.failures += 1
+                self.stats.last_error = rejection
+                return False
+
+            self.on_swap(catalog)
+            duration = time.perf_counter() - started
+            self._signature = signature
+            self.stats.reloads += 1
+            self.stats.last_duration_s = duration
+            self.stats.total_duration_s += duration
+            self.stats.last_reload_at = time.time()
+            self.stats.last_error = None
+            return True
+
+    def _rejection(self, report: LoadReport | None) -> str | None:
+        """Why a freshly loaded catalog must not replace the current one, if it must not."""
+
+        if report is None:
+            return None
+        if report.format == "empty":
+            return "catalog file is empty"
+        if report.truncated:
+            return "catalog file ends mid-record"
+        if report.skipped > self.max_skipped:
+            return f"{report.skipped} malformed records (at most {self.max_skipped} allowed)"
+        return None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="catalog-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                # Never let the poller die; the next tick retries.
+                self.stats.failures += 1
+                self.stats.last_error = str(e)
+
+    def snapshot(self) -> dict[str, Any]:
+        return asdict(self.stats)
+
+
+_RELOADER: CatalogReloader | None = None
+
+
+def start_reloader(interval: float, path: Path | None = None) -> CatalogReloader:
+    """Start (once) the process-wide reloader for the default catalog."""
+
+    global _RELOADER
+    if _RELOADER is None:
+        _RELOADER = CatalogReloader(path, interval=interval)
+        _RELOADER.start()
+    return _RELOADER
+
+
+def reload_stats() -> dict[str, Any] | None:
+    """Stats of the process-wide reloader, or None if hot reload is off."""
+
+    return _RELOADER.snapshot() if _RELOADER is not None else None
+
+
+def _reload_events() -> dict[tuple[str, ...], float] | None:
+    stats = reload_stats()
+    if stats is None:
+        return None
+    return {("check",): stats["checks"], ("reload",): stats["reloads"], ("failure",): stats["failures"]}
+
+
+def _reload_seconds() -> dict[tuple[str, ...], float] | None:
+    stats = reload_stats()
+    return {(): stats["total_duration_s"]} if stats is not None else None
+
+
+def _last_reload_seconds() -> dict[tuple[str, ...], float] | None:
+    stats = reload_stats()
+    if stats is None or stats["last_duration_s"] is None:
+        return None
+    return {(): stats["last_duration_s"]}
+
+
+CATALOG_RELOADS = REGISTRY.callback(
+    "support_bot_catalog_reloads_total",
+    "Catalog reloader checks, reloads and failures.",
+    _reload_events,
+    kind="counter",
+    labelnames=("event",),
+)
+CATALOG_RELOAD_SECONDS = REGISTRY.callback(
+    "support_bot_catalog_reload_seconds_total", "Time spent on successful catalog reloads.", _reload_seconds, kind="counter"
+)
+CATALOG_LAST_RELOAD_SECONDS = REGISTRY.callback(
+    "support_bot_catalog_last_reload_seconds", "Duration of the last successful catalog reload.", _last_reload_seconds
+)
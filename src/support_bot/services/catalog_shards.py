@@ -0,0 +1,146 @@
+# Sharded, multi-process catalog search (optional; see `ProductCatalog.with_shards`).
+#
+# The catalog is cut into contiguous position ranges, one per worker process. Each
+# worker indexes only its range and answers a query with its match count plus its local
+# top `offset + limit` as (score, global position) pairs. The parent merges the sorted
+# shard lists on the same (-score, position) key as single-process search, so pages are
+# identical; product records never cross the process boundary.
+#
+# Only the rule-based scorer is sharded: its score depends on one product at a time,
+# whereas BM25 term weights depend on whole-collection statistics.
+
+from __future__ import annotations
+
+import heapq
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Mapping, Sequence
+
+if TYPE_CHECKING:
+    from support_bot.services.product_catalog import ProductCatalog, SearchPage
+
+# Per-worker state: (shard catalog, position of its first product in the full catalog).
+_SHARD: tuple["ProductCatalog", int] | None = None
+
+
+def _init_shard(products: Sequence[Mapping[str, Any]], start: int) -> None:
+    from support_bot.services.product_catalog import ProductCatalog
+
+    global _SHARD
+    _SHARD = (ProductCatalog(products=list(products)), start)
+
+
+def _search_shard(keyword: str, language: str, k: int | None) -> tuple[int, list[tuple[float, int]]]:
+    from support_bot.services.product_catalog import _rank_key
+
+    assert _SHARD is not None, "shard worker was not initialized"
+    catalog, start = _SHARD
+    scored = [(score, start + i) for score, i in catalog._scored(keyword, language)]
+    if k is None:
+        top = sorted(scored, key=_rank_key)
+    else:
+        top = heapq.nsmallest(k, scored, key=_rank_key)
+    return len(scored), top
+
+
+def shard_bounds(size: int, shards: int) -> list[tuple[int, int]]:
+    """Split `range(size)` into `shards` contiguous, near-equal (start, end) ranges."""
+
+    shards = max(1, min(shards, size or 1))
+    step, extra = divmod(size, shards)
+    bounds: list[tuple[int, int]] = []
+    start = 0
+    for s in range(shards):
+        end = start + step + (1 if s < extra else 0)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def default_mp_context() -> Any:
+    """Multiprocessing context for worker pools: fork where available, else spawn.
+
+    Fork lets workers inherit the parent's state (e.g. the loaded catalog) instead of
+    receiving it pickled.
+    """
+
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+
+
+class ShardedCatalog:
+    """Scatter-gather search over a catalog split across worker processes.
+
+    Call `close()` (or use it as a context manager) to stop the workers.
+    """
+
+    def __init__(self, catalog: "ProductCatalog", shards: int, *, mp_context: Any = None) -> None:
+        if catalog.ranker is not None:
+            raise ValueError("sharded search supports the rule-based ranking only")
+        self.catalog = catalog
+        self.bounds = shard_bounds(len(catalog.products), shards)
+        context = mp_context or default_mp_context()
+        self._pools = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=context,
+                initializer=_init_shard,
+                initargs=(catalog.products[start:end], start),
+            )
+            for start, end in self.bounds
+        ]
+
+    def __enter__(self) -> "ShardedCatalog":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for pool in self._pools:
+            pool.shutdown(wait=True)
+
+    def search(
+        self,
+        keyword: str,
+        language: str = "en",
+        *,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[Mapping[str, Any]]:
+        return self.search_page(keyword, language, limit=limit, offset=offset).items
+
+    def search_page(
+        self,
+        keyword: str,
+        language: str = "en",
+        *,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> "SearchPage":
+        """Same result as `ProductCatalog.search_page`, computed by the shard workers."""
+
+        from support_bot.services.product_catalog import SearchPage, _rank_key
+
+        offset = max(0, offset)
+        total, ranked = self._gather(keyword, language, limit, offset)
+        merged = heapq.merge(*ranked, key=_rank_key)
+        stop = None if limit is None else offset + max(0, limit)
+        items = [self.catalog.products[i] for _, i in islice(merged, offset, stop)]
+        return SearchPage(items=items, total=total, offset=offset, limit=limit)
+
+    def _gather(
+        self, keyword: str, language: str, limit: int | None, offset: int
+    ) -> tuple[int, list[list[tuple[float, int]]]]:
+        if not keyword:
+            return 0, []
+        k = None if limit is None else offset + max(0, limit)
+        futures: list[Future] = [pool.submit(_search_shard, keyword, language, k) for pool in self._pools]
+        total = 0
+        ranked: list[list[tuple[float, int]]] = []
+        for future in futures:
+            count, top = future.result()
+            total += count
+            ranked.append(top)
+        return total, ranked
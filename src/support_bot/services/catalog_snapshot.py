@@ -0,0 +1,425 @@
+# Precompiled, memory-mappable catalog snapshot.
+#
+# `python -m support_bot.services.compile_catalog` parses products.json once and writes
+# a versioned binary file holding the records, the per-language search text (including
+# the normalized BG words) and the token postings. Workers open it with mmap: nothing is
+# parsed up front, forked workers share the same pages, and records/text are decoded
+# only for the products a query actually touches.
+#
+# Layout (little endian, sections 8-byte aligned):
+#   header   magic, format version, section count, source sha256, product count,
+#            source mtime (ns) and size
+#   table    (offset, length) per section, in SECTIONS order
+#   sections string tables are a UTF-8 blob plus uint64 end offsets; the vocabulary is
+#            "\n"-separated so a short keyword can be found with one mmap.find per hit;
+#            postings are uint32 product positions plus uint64 end offsets per token;
+#            the trigram table is the sorted trigrams (a string table) plus, per
+#            trigram, the uint32 ids of the vocabulary tokens containing it.
+#
+# Keywords of NGRAM+ characters are looked up like `CatalogIndex.ngram_tokens`: the
+# trigram lists are intersected and only the surviving tokens are compared with the
+# keyword, so a lookup does not scan the vocabulary.
+#
+# Opening checks freshness cheaply: a source whose mtime and size match the header is
+# taken as unchanged, and only otherwise is it hashed and compared with the stored
+# SHA-256 (so a touched but identical file still uses the snapshot). Section bounds
+# are validated against the mapped size; a damaged file is ignored, never trusted.
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import logging
+import mmap
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Mapping, Sequence
+
+from support_bot.services.catalog_index import LANGUAGES, NGRAM, CatalogIndex, ProductText, catalog_language
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SBCATSNP"
+FORMAT_VERSION = 3
+
+_HEADER = struct.Struct("<8sII32sQqQ")
+_SECTION = struct.Struct("<QQ")
+
+_TEXT_FIELDS = ("full_text", "normalized_name_text", "normalized_text")
+
+SECTIONS: tuple[str, ...] = ("records", "record_ends") + tuple(
+    f"{lang}.{name}"
+    for lang in LANGUAGES
+    for name in [f"{field}{suffix}" for field in _TEXT_FIELDS for suffix in ("", "_ends")]
+    + ["vocab", "vocab_starts", "postings", "posting_ends"]
+    + ["grams", "gram_ends", "gram_tokens", "gram_token_ends"]
+)
+
+
+def source_stat(path: Path) -> tuple[int, int]:
+    """(mtime_ns, size) of the source file, stored next to its hash."""
+
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def source_hash(path: Path) -> bytes:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+# --- writing -------------------------------------------------------------------------
+
+
+def _string_table(strings: Iterable[str]) -> tuple[bytes, array]:
+    parts: list[bytes] = []
+    ends = array("Q")
+    total = 0
+    for s in strings:
+        b = s.encode("utf-8")
+        parts.append(b)
+        total += len(b)
+        ends.append(total)
+    return b"".join(parts), ends
+
+
+def _sections(products: Sequence[Mapping[str, Any]], index: CatalogIndex) -> dict[str, bytes]:
+    sections: dict[str, bytes] = {}
+    records, record_ends = _string_table(json.dumps(dict(p), ensure_ascii=False) for p in products)
+    sections["records"] = records
+    sections["record_ends"] = record_ends.tobytes()
+
+    for lang in LANGUAGES:
+        texts = index.texts[lang]
+        for field in _TEXT_FIELDS:
+            blob, ends = _string_table(getattr(t, field) for t in texts)
+            sections[f"{lang}.{field}"] = blob
+            sections[f"{lang}.{field}_ends"] = ends.tobytes()
+
+        vocab = sorted(index.postings[lang])
+        starts = array("Q")
+        parts: list[bytes] = []
+        pos = 0
+        postings = array("I")
+        posting_ends = array("Q")
+        for token in vocab:
+            b = token.encode("utf-8") + b"\n"
+            starts.append(pos)
+            parts.append(b)
+            pos += len(b)
+            postings.extend(index.postings[lang][token])
+            posting_ends.append(len(postings))
+        starts.append(pos)
+        sections[f"{lang}.vocab"] = b"".join(parts)
+        sections[f"{lang}.vocab_starts"] = starts.tobytes()
+        sections[f"{lang}.postings"] = postings.tobytes()
+        sections[f"{lang}.posting_ends"] = posting_ends.tobytes()
+
+        token_ids = {token: i for i, token in enumerate(vocab)}
+        grams = sorted(index.grams[lang])
+        gram_blob, gram_ends = _string_table(grams)
+        gram_tokens = array("I")
+        gram_token_ends = array("Q")
+        for gram in grams:
+            gram_tokens.extend(sorted(token_ids[token] for token in index.grams[lang][gram]))
+            gram_token_ends.append(len(gram_tokens))
+        sections[f"{lang}.grams"] = gram_blob
+        sections[f"{lang}.gram_ends"] = gram_ends.tobytes()
+        sections[f"{lang}.gram_tokens"] = gram_tokens.tobytes()
+        sections[f"{lang}.gram_token_ends"] = gram_token_ends.tobytes()
+    return sections
+
+
+def write_snapshot(
+    out: Path,
+    products: Sequence[Mapping[str, Any]],
+    index: CatalogIndex,
+    source_sha256: bytes,
+    source_stat: tuple[int, int] = (0, 0),
+) -> None:
+    """Write a snapshot of an already loaded catalog; the file is replaced atomically.
+
+    `source_stat` is the source's (mtime_ns, size) taken before it was hashed; the
+    default never matches, so such a snapshot is always verified by hash.
+    """
+
+    if sys.byteorder != "little":
+        raise RuntimeError("catalog snapshots are written in little-endian order")
+
+    sections = _sections(products, index)
+    header_size = _HEADER.size + _SECTION.size * len(SECTIONS)
+    table: list[tuple[int, int]] = []
+    offset = _align(header_size)
+    for name in SECTIONS:
+        table.append((offset, len(sections[name])))
+        offset = _align(offset + len(sections[name]))
+
+    tmp = out.with_name(out.name + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(SECTIONS), source_sha256, len(products), *source_stat))
+        for entry in table:
+            f.write(_SECTION.pack(*entry))
+        for name, (offset, _length) in zip(SECTIONS, table):
+            _pad_to(f, offset)
+            f.write(sections[name])
+    tmp.replace(out)
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _pad_to(f: BinaryIO, offset: int) -> None:
+    f.write(b"\0" * (offset - f.tell()))
+
+
+# --- reading -------------------------------------------------------------------------
+
+
+class _StringTable:
+    __slots__ = ("_blob", "_ends")
+
+    def __init__(self, blob: memoryview, ends: memoryview) -> None:
+        self._blob = blob
+        self._ends = ends
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def __getitem__(self, i: int) -> str:
+        start = self._ends[i - 1] if i else 0
+        return str(self._blob[start : self._ends[i]], "utf-8")
+
+
+class SnapshotProducts(Sequence[Dict[str, Any]]):
+    """Products decoded on access from the snapshot's record table."""
+
+    def __init__(self, records: _StringTable) -> None:
+        self._records = records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return json.loads(self._records[i])
+
+
+@dataclass(frozen=True)
+class _LanguageIndex:
+    mm: mmap.mmap
+    vocab_start: int
+    vocab_end: int
+    vocab_starts: memoryview
+    postings: memoryview
+    posting_ends: memoryview
+    grams: _StringTable
+    gram_tokens: memoryview
+    gram_token_ends: memoryview
+    texts: tuple[_StringTable, ...]
+
+    def token_positions(self, needle: str) -> set[int]:
+        """Product positions for every vocabulary token containing `needle`."""
+
+        if len(needle) >= NGRAM:
+            positions: set[int] = set()
+            for token in self._ngram_tokens(needle):
+                start = self.posting_ends[token - 1] if token else 0
+                positions.update(self.postings[start : self.posting_ends[token]])
+            return positions
+        return self._scan_positions(needle)
+
+    def _gram_token_ids(self, gram: str) -> memoryview | None:
+        grams = self.grams
+        i = bisect.bisect_left(grams, gram)
+        if i == len(grams) or grams[i] != gram:
+            return None
+        start = self.gram_token_ends[i - 1] if i else 0
+        return self.gram_tokens[start : self.gram_token_ends[i]]
+
+    def _ngram_tokens(self, needle: str) -> list[int]:
+        """Ids of the vocabulary tokens containing `needle`, through the trigram table."""
+
+        lists: list[memoryview] = []
+        for gram in {needle[i : i + NGRAM] for i in range(len(needle) - NGRAM + 1)}:
+            tokens = self._gram_token_ids(gram)
+            if not tokens:
+                return []
+            lists.append(tokens)
+        lists.sort(key=len)
+
+        found = set(lists[0])
+        for tokens in lists[1:]:
+            # Once the candidates are fewer than the next list, verifying is cheaper.
+            if len(found) * 4 < len(tokens):
+                break
+            found.intersection_update(tokens)
+        needle_b = needle.encode("utf-8")
+        return [token for token in found if needle_b in self._token(token)]
+
+    def _token(self, token: int) -> bytes:
+        # Vocabulary entries end with "\n", which is not part of the token.
+        start = self.vocab_start + self.vocab_starts[token]
+        return self.mm[start : self.vocab_start + self.vocab_starts[token + 1] - 1]
+
+    def _scan_positions(self, needle: str) -> set[int]:
+        needle_b = needle.encode("utf-8")
+        positions: set[int] = set()
+        n_tokens = len(self.posting_ends)
+        at = self.vocab_start
+        while True:
+            hit = self.mm.find(needle_b, at, self.vocab_end)
+            if hit < 0:
+                return positions
+            token = bisect.bisect_right(self.vocab_starts, hit - self.vocab_start, 0, n_tokens) - 1
+            start = self.posting_ends[token - 1] if token else 0
+            positions.update(self.postings[start : self.posting_ends[token]])
+            # Continue after this token so each token is counted once.
+            at = self.vocab_start + self.vocab_starts[token + 1]
+
+
+class SnapshotIndex:
+    """Read-only, mmap-backed counterpart of `CatalogIndex`."""
+
+    def __init__(self, languages: dict[str, _LanguageIndex], size: int) -> None:
+        self._languages = languages
+        self.size = size
+
+    def text(self, position: int, language: str) -> ProductText:
+        full, name, normalized = self._languages[catalog_language(language)].texts
+        return ProductText(
+            full_text=full[position],
+            normalized_name_text=name[position],
+            normalized_text=normalized[position],
+        )
+
+    def candidates(self, needles: Iterable[str], language: str) -> list[int]:
+        lang_index = self._languages[catalog_language(language)]
+        positions: set[int] = set()
+        for needle in set(needles):
+            if needle:
+                positions |= lang_index.token_positions(needle)
+        return sorted(positions)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    path: Path
+    products: SnapshotProducts
+    index: SnapshotIndex
+    source_sha256: bytes
+
+
+def open_snapshot(path: Path, source: Path | None = None) -> Snapshot | None:
+    """Map a snapshot; None if it is missing, malformed, of another version or stale.
+
+    When `source` is given, the snapshot is used only if it was compiled from a file with
+    the same mtime and size, or failing that, the same SHA-256.
+    """
+
+    try:
+        with path.open("rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, version, n_sections, sha, n_products, mtime_ns, size = _HEADER.unpack_from(mm, 0)
+    except struct.error:
+        return None
+    if magic != MAGIC or version != FORMAT_VERSION or n_sections != len(SECTIONS):
+        logger.info("catalog snapshot %s has an unsupported format; ignoring it", path)
+        return None
+    if source is not None and not _is_fresh(source, sha, (mtime_ns, size)):
+        logger.info("catalog snapshot %s is stale for %s; falling back to JSON", path, source)
+        return None
+
+    try:
+        products, index = _map(mm, n_products)
+    except (TypeError, ValueError, struct.error) as e:
+        logger.warning("catalog snapshot %s is damaged (%s); ignoring it", path, e)
+        return None
+    return Snapshot(path=path, products=products, index=index, source_sha256=sha)
+
+
+def _is_fresh(source: Path, sha: bytes, stat: tuple[int, int]) -> bool:
+    try:
+        if source_stat(source) == stat:
+            return True
+        return source_hash(source) == sha
+    except OSError:
+        return False
+
+
+def _map(mm: mmap.mmap, n_products: int) -> tuple[SnapshotProducts, SnapshotIndex]:
+    """Views over the sections; raises ValueError/TypeError if the layout is inconsistent."""
+
+    view = memoryview(mm)
+    data_start = _align(_HEADER.size + _SECTION.size * len(SECTIONS))
+    regions: dict[str, tuple[int, int]] = {}
+    for i, name in enumerate(SECTIONS):
+        offset, length = _SECTION.unpack_from(mm, _HEADER.size + i * _SECTION.size)
+        if offset < data_start or offset + length > len(mm):
+            raise ValueError(f"section {name} lies outside the file")
+        regions[name] = (offset, length)
+
+    def raw(name: str) -> memoryview:
+        offset, length = regions[name]
+        return view[offset : offset + length]
+
+    def table(blob: str, ends: str, rows: int | None = None) -> _StringTable:
+        strings = _StringTable(raw(blob), _offsets(raw(ends), len(raw(blob))))
+        if rows is not None and len(strings) != rows:
+            raise ValueError(f"section {blob} has {len(strings)} rows, expected {rows}")
+        return strings
+
+    languages: dict[str, _LanguageIndex] = {}
+    for lang in LANGUAGES:
+        texts = tuple(table(f"{lang}.{field}", f"{lang}.{field}_ends", n_products) for field in _TEXT_FIELDS)
+        vocab_start, vocab_length = regions[f"{lang}.vocab"]
+        vocab_starts = _offsets(raw(f"{lang}.vocab_starts"), vocab_length)
+        postings = raw(f"{lang}.postings").cast("I")
+        posting_ends = _offsets(raw(f"{lang}.posting_ends"), len(postings))
+        if len(vocab_starts) != len(posting_ends) + 1:
+            raise ValueError(f"{lang} vocabulary and postings disagree")
+        gram_tokens = raw(f"{lang}.gram_tokens").cast("I")
+        grams = table(f"{lang}.grams", f"{lang}.gram_ends")
+        gram_token_ends = _offsets(raw(f"{lang}.gram_token_ends"), len(gram_tokens))
+        if len(gram_token_ends) != len(grams):
+            raise ValueError(f"{lang} trigram table is inconsistent")
+        languages[lang] = _LanguageIndex(
+            mm=mm,
+            vocab_start=vocab_start,
+            vocab_end=vocab_start + vocab_length,
+            vocab_starts=vocab_starts,
+            postings=postings,
+            posting_ends=posting_ends,
+            grams=grams,
+            gram_tokens=gram_tokens,
+            gram_token_ends=gram_token_ends,
+            texts=texts,
+        )
+
+    products = SnapshotProducts(table("records", "record_ends", n_products))
+    return products, SnapshotIndex(languages, n_products)
+
+
+def _offsets(raw: memoryview, limit: int) -> memoryview:
+    """uint64 offsets, checked to end within a section of `limit` items."""
+
+    offsets = raw.cast("Q")
+    if len(offsets) and offsets[-1] > limit:
+        raise ValueError("offset past the end of its section")
+    return offsets
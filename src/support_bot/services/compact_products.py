@@ -0,0 +1,206 @@
+# Columnar, memory-compact storage for catalog products.
+#
+# A list of dicts costs a dict, a key table and a str object per field per product.
+# Here every text field is one concatenated string plus an offsets array, `category`
+# is dictionary-encoded and `price` lives in a float array. Products are handed out
+# as read-only `ProductRecord` mappings, so callers that use `p.get(...)`, `p[...]`
+# or `dict(p)` keep working.
+
+from __future__ import annotations
+
+import sys
+from array import array
+from typing import Any, Iterable, Iterator, Mapping, Sequence
+
+FIELDS = ("id", "name", "description", "price", "category", "name_bg", "description_bg")
+TEXT_FIELDS = ("id", "name", "description", "name_bg", "description_bg")
+CODE_FIELDS = ("category",)
+FLOAT_FIELDS = ("price",)
+
+_MISSING = object()
+
+
+class TextColumn:
+    """Append-only column of strings kept as one string plus end offsets.
+
+    Call `freeze()` after the last `append()`; values read back only once frozen.
+    """
+
+    __slots__ = ("_parts", "_data", "_ends")
+
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+        self._data = ""
+        self._ends = array("Q")
+
+    def append(self, value: str) -> None:
+        end = (self._ends[-1] if self._ends else 0) + len(value)
+        self._parts.append(value)
+        self._ends.append(end)
+
+    def freeze(self) -> None:
+        self._data = self._data + "".join(self._parts)
+        self._parts = []
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def __getitem__(self, i: int) -> str:
+        start = self._ends[i - 1] if i else 0
+        return self._data[start : self._ends[i]]
+
+
+class _CodeColumn:
+    __slots__ = ("_codes", "_values", "_lookup")
+
+    def __init__(self) -> None:
+        self._codes = array("I")
+        self._values: list[str] = []
+        self._lookup: dict[str, int] = {}
+
+    def append(self, value: str) -> None:
+        code = self._lookup.get(value)
+        if code is None:
+            code = len(self._values)
+            self._values.append(sys.intern(value))
+            self._lookup[value] = code
+        self._codes.append(code)
+
+    def freeze(self) -> None:
+        pass
+
+    def __getitem__(self, i: int) -> str:
+        return self._values[self._codes[i]]
+
+
+class _FloatColumn:
+    __slots__ = ("_values",)
+
+    def __init__(self) -> None:
+        self._values = array("d")
+
+    def append(self, value: float) -> None:
+        self._values.append(value)
+
+    def freeze(self) -> None:
+        pass
+
+    def __getitem__(self, i: int) -> float:
+        return self._values[i]
+
+
+class ProductRecord(Mapping[str, Any]):
+    """Read-only dict-like view of one product in a `CompactProducts` store."""
+
+    __slots__ = ("_store", "_i")
+
+    def __init__(self, store: "CompactProducts", i: int) -> None:
+        self._store = store
+        self._i = i
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._store.value(self._i, key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return self._store.keys(self._i)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._store.keys(self._i))
+
+    def __repr__(self) -> str:
+        return f"ProductRecord({dict(self)!r})"
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(self)
+
+
+class CompactProducts(Sequence[ProductRecord]):
+    """Append-only columnar product store; call `freeze()` after the last `append()`.
+
+    Values that do not fit their column (a missing key, a non-str name, an int price,
+    extra keys) are kept verbatim in a small per-product overflow dict, so every
+    record reads back exactly as it was appended.
+    """
+
+    def __init__(self) -> None:
+        self._columns: dict[str, Any] = {}
+        for name in TEXT_FIELDS:
+            self._columns[name] = TextColumn()
+        for name in CODE_FIELDS:
+            self._columns[name] = _CodeColumn()
+        for name in FLOAT_FIELDS:
+            self._columns[name] = _FloatColumn()
+        self._irregular: dict[int, dict[str, Any]] = {}
+        self._size = 0
+
+    @classmethod
+    def from_products(cls, products: Iterable[Mapping[str, Any]]) -> "CompactProducts":
+        store = cls()
+        for p in products:
+            store.append(p)
+        store.freeze()
+        return store
+
+    def append(self, product: Mapping[str, Any]) -> int:
+        i = self._size
+        irregular: dict[str, Any] = {}
+        for name in FIELDS:
+            column = self._columns[name]
+            value = product.get(name, _MISSING)
+            if name in FLOAT_FIELDS:
+                fits = type(value) is float
+            else:
+                fits = type(value) is str
+            if fits:
+                column.append(value)
+            else:
+                column.append(0.0 if name in FLOAT_FIELDS else "")
+                irregular[name] = value
+        for key, value in product.items():
+            if key not in self._columns:
+                irregular[key] = value
+        if irregular:
+            self._irregular[i] = irregular
+        self._size += 1
+        return i
+
+    def freeze(self) -> None:
+        for column in self._columns.values():
+            column.freeze()
+
+    def value(self, i: int, key: str) -> Any:
+        if self._irregular:
+            irregular = self._irregular.get(i)
+            if irregular is not None and key in irregular:
+                return irregular[key]
+        column = self._columns.get(key)
+        if column is None:
+            return _MISSING
+        return column[i]
+
+    def keys(self, i: int) -> Iterator[str]:
+        irregular = self._irregular.get(i) if self._irregular else None
+        if irregular is None:
+            yield from FIELDS
+            return
+        for name in FIELDS:
+            if irregular.get(name, None) is not _MISSING:
+                yield name
+        for key in irregular:
+            if key not in self._columns:
+                yield key
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [ProductRecord(self, j) for j in range(*i.indices(self._size))]
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError(i)
+        return ProductRecord(self, i)
@@ -0,0 +1,45 @@
+# Offline "compile catalog" command: products.json -> memory-mappable snapshot.
+#
+#   python -m support_bot.services.compile_catalog [source] [-o out.snap]
+#
+# Point CATALOG_SNAPSHOT at the output; workers then open it instead of parsing JSON
+# for as long as the source file is unchanged.
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from support_bot.config import catalog_snapshot_path, products_path
+from support_bot.services.catalog_snapshot import source_hash, source_stat, write_snapshot
+from support_bot.services.product_catalog import ProductCatalog
+
+
+def compile_snapshot(source: Path, out: Path) -> int:
+    """Parse `source` and write its snapshot to `out`; returns the product count."""
+
+    # Stat before hashing: if the file changes meanwhile, opening re-checks the hash.
+    stat = source_stat(source)
+    sha = source_hash(source)
+    catalog = ProductCatalog.load(source, compact=False)
+    if catalog.report is not None and catalog.report.fatal:
+        raise SystemExit(f"cannot compile {source}: {catalog.report.fatal}")
+    write_snapshot(out, catalog.products, catalog.index, sha, stat)
+    return len(catalog.products)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compile products.json into a memory-mappable snapshot.")
+    parser.add_argument("source", nargs="?", type=Path, help="catalog JSON/JSONL (default: PRODUCTS_PATH)")
+    parser.add_argument("-o", "--out", type=Path, help="snapshot path (default: CATALOG_SNAPSHOT or <source>.snap)")
+    args = parser.parse_args(argv)
+
+    source = args.source or products_path()
+    out = args.out or catalog_snapshot_path() or source.with_suffix(".snap")
+    count = compile_snapshot(source, out)
+    print(f"wrote {out} ({count} products)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
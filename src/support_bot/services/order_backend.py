@@ -0,0 +1,436 @@
+# Order-status backends: the in-process mock, a pooled HTTP client for the order
+# service (selected with ORDER_SERVICE_URL) and a status-aware cache in front of either.
+#
+# The HTTP client keeps a small pool of keep-alive connections, caps the number of
+# requests in flight, retries connection errors and 5xx/429 answers with jittered
+# exponential backoff, and coalesces concurrent lookups of the same order id into one
+# upstream request.
+#
+# Every backend also has async lookups (`astatus`/`astatuses`) for the asyncio
+# pipeline. The HTTP client runs its blocking lookups on its own thread pool sized to
+# `max_concurrency` (ORDER_SERVICE_MAX_CONCURRENCY), not on the event loop's default
+# executor: at most that many async lookups are in progress at once, and the rest wait
+# in the pool's queue without holding a thread that other blocking work may need.
+#
+# Wire protocol (also served by `order_stub_server`):
+#   GET {base}/orders/{order_id}        -> 200 {status dict} | 404
+#   GET {base}/orders?ids=ID1,ID2,...   -> 200 {"orders": [status dict or null, ...]}
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import http.client
+import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Iterable, Mapping, Protocol
+from urllib.parse import quote, urlsplit
+
+from support_bot.cache import TTLCache
+
+
+class OrderBackendError(Exception):
+    """The order service could not answer."""
+
+
+class OrderNotFound(OrderBackendError):
+    def __init__(self, order_id: str) -> None:
+        super().__init__(f"order {order_id} not found")
+        self.order_id = order_id
+
+
+class OrderBackend(Protocol):
+    def status(self, order_id: str) -> dict[str, Any]: ...
+
+    def statuses(self, order_ids: Iterable[str]) -> list[dict[str, Any] | None]:
+        """One status dict per id, in the given order; None for an unknown id."""
+        ...
+
+    async def astatus(self, order_id: str) -> dict[str, Any]: ...
+
+    async def astatuses(self, order_ids: Iterable[str]) -> list[dict[str, Any] | None]: ...
+
+
+def mock_order_status(order_id: str, today: date) -> dict[str, Any]:
+
+    oid = re.sub(r"[^0-9]", "", str(order_id)) or "0"
+    n = int(oid) if oid.isdigit() else 0
+
+    statuses = ["Processing", "Shipped", "Out for delivery", "Delivered", "Cancelled"]
+    status = statuses[n % len(statuses)]
+
+    if status == "Processing":
+        est = today + timedelta(days=3)
+    elif status == "Shipped":
+        est = today + timedelta(days=2)
+    elif status == "Out for delivery":
+        est = today + timedelta(days=1)
+    elif status == "Delivered":
+        est = today - timedelta(days=1)
+    else:
+        est = None
+
+    mock_items = [
+        {"id": "P1001", "name": "SmartWatch Pro", "qty": 1},
+    ]
+
+    return {
+        "order_id": str(order_id),
+        "status": status,
+        "estimated_delivery": est.isoformat() if est else None,
+        "tracking_id": f"TRK{n:06d}",
+        "items": mock_items,
+    }
+
+
+class MockOrderBackend:
+    """Deterministic statuses computed locally (no I/O)."""
+
+    def status(self, order_id: str) -> dict[str, Any]:
+        return mock_order_status(order_id, datetime.utcnow().date())
+
+    def statuses(self, order_ids: Iterable[str]) -> list[dict[str, Any] | None]:
+        today = datetime.utcnow().date()
+        return [mock_order_status(order_id, today) for order_id in order_ids]
+
+    async def astatus(self, order_id: str) -> dict[str, Any]:
+        return self.status(order_id)
+
+    async def astatuses(self, order_ids: Iterable[str]) -> list[dict[str, Any] | None]:
+        return self.statuses(order_ids)
+
+
+@dataclass
+class ClientStats:
+    requests: int = 0  # upstream HTTP requests, retries included
+    retries: int = 0
+    failures: int = 0
+    coalesced: int = 0  # lookups answered by another caller's in-flight request
+    connections_opened: int = 0
+
+
+class _RetryableError(Exception):
+    pass
+
+
+class HttpOrderBackend:
+    """Pooled, coalescing HTTP client for the order service."""
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        pool_size: int = 8,
+        max_concurrency: int = 16,
+        timeout: float = 5.0,
+        retries: int = 2,
+        backoff: float = 0.05,
+    ) -> None:
+        parts = urlsplit(base_url)
+        if parts.scheme not in {"http", "https"} or not parts.hostname:
+            raise ValueError(f"invalid order service URL: {base_url!r}")
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname
+        self._port = parts.port
+        self._prefix = parts.path.rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.stats = ClientStats()
+        self._stats_lock = threading.Lock()
+
+        self._idle: list[http.client.HTTPConnection] = []
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._inflight: dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        # Runs the async lookups; see the module comment for why it is not the loop's.
+        self._executor = ThreadPoolExecutor(max_concurrency, thread_name_prefix="order-backend")
+
+    # --- lookups ---------------------------------------------------------------------
+
+    def status(self, order_id: str) -> dict[str, Any]:
+        order_id = str(order_id)
+        future, owner = self._claim([order_id])[order_id]
+        if owner:
+            self._resolve({order_id: future}, lambda: [self._fetch_one(order_id)])
+        # Every caller sharing the request gets its own copy to mutate.
+        return copy.deepcopy(future.result())
+
+    def statuses(self, order_ids: Iterable[str]) -> list[dict[str, Any] | None]:
+        ids = [str(i) for i in order_ids]
+        claimed = self._claim(ids)
+        owned = {i: f for i, (f, owner) in claimed.items() if owner}
+        if owned:
+            self._resolve(owned, lambda: self._fetch_many(list(owned)))
+        orders: list[dict[str, Any] | None] = []
+        for order_id in ids:
+            try:
+                orders.append(copy.deepcopy(claimed[order_id][0].result()))
+            except OrderNotFound:
+                orders.append(None)
+        return orders
+
+    async def astatus(self, order_id: str) -> dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.status, str(order_id))
+
+    async def astatuses(self, order_ids: Iterable[str]) -> list[dict[str, Any] | None]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.statuses, [str(i) for i in order_ids])
+
+    def _claim(self, ids: list[str]) -> dict[str, tuple[Future, bool]]:
+        """Future per distinct id, and whether this caller must fetch it."""
+
+        claimed: dict[str, tuple[Future, bool]] = {}
+        with self._inflight_lock:
+            for order_id in ids:
+                if order_id in claimed:
+                    continue
+                future = self._inflight.get(order_id)
+                if future is not None:
+                    self._count("coalesced")
+                    claimed[order_id] = (future, False)
+                else:
+                    future = self._inflight[order_id] = Future()
+                    claimed[order_id] = (future, True)
+        return claimed
+
+    def _resolve(self, owned: dict[str, Future], fetch) -> None:
+        try:
+            results = fetch()
+        except BaseException as e:
+            for future in owned.values():
+                future.set_exception(e)
+        else:
+            for (order_id, future), result in zip(owned.items(), results):
+                if result is None:
+                    future.set_exception(OrderNotFound(order_id))
+                else:
+                    future.set_result(result)
+        finally:
+            with self._inflight_lock:
+                for order_id, future in owned.items():
+                    if self._inflight.get(order_id) is future:
+                        del self._inflight[order_id]
+
+    def _fetch_one(self, order_id: str) -> dict[str, Any] | None:
+        status, body = self._request(f"/orders/{quote(order_id, safe='')}")
+        if status == 404:
+            return None
+        return body
+
+    def _fetch_many(self, ids: list[str]) -> list[dict[str, Any] | None]:
+        if len(ids) == 1:
+            return [self._fetch_one(ids[0])]
+        query = ",".join(quote(i, safe="") for i in ids)
+        _, body = self._request(f"/orders?ids={query}")
+        orders = body.get("orders") if isinstance(body, dict) else None
+        if not isinstance(orders, list) or len(orders) != len(ids):
+            raise OrderBackendError("malformed bulk response from order service")
+        return orders
+
+    # --- transport -------------------------------------------------------------------
+
+    def _request(self, path: str) -> tuple[int, Any]:
+        """GET with retries; returns (status, decoded JSON) for 2xx and 404."""
+
+        attempt = 0
+        while True:
+            try:
+                with self._slots:
+                    return self._request_once(self._prefix + path)
+            except (_RetryableError, OSError, http.client.HTTPException) as e:
+                if attempt >= self.retries:
+                    self._count("failures")
+                    raise OrderBackendError(f"order service request failed: {e}") from e
+                # Exponential backoff with full jitter around the nominal delay.
+                time.sleep(self.backoff * (2**attempt) * random.uniform(0.5, 1.5))
+                attempt += 1
+                self._count("retries")
+
+    def _request_once(self, path: str) -> tuple[int, Any]:
+        conn = self._checkout()
+        self._count("requests")
+        try:
+            conn.request("GET", path, headers={"Accept": "application/json"})
+            response = conn.getresponse()
+            payload = response.read()
+        except BaseException:
+            conn.close()
+            raise
+        if response.will_close:
+            conn.close()
+        else:
+            self._checkin(conn)
+
+        if response.status == 429 or response.status >= 500:
+            raise _RetryableError(f"HTTP {response.status}")
+        if response.status == 404:
+            return 404, None
+        if response.status >= 300:
+            raise OrderBackendError(f"order service answered HTTP {response.status}")
+        try:
+            return response.status, json.loads(payload)
+        except ValueError as e:
+            raise OrderBackendError("order service returned invalid JSON") from e
+
+    def _checkout(self) -> http.client.HTTPConnection:
+        with self._pool_lock:
+            if self._idle:
+                return self._idle.pop()
+        self._count("connections_opened")
+        if self._https:
+            return http.client.HTTPSConnection(self._host, self._port, timeout=self.timeout)
+        return http.client.HTTPConnection(self._host, self._port, timeout=self.timeout)
+
+    def _checkin(self, conn: http.client.HTTPConnection) -> None:
+        with self._pool_lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._pool_lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+        self._executor.shutdown(wait=False)
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._stats_lock:
+            stats = asdict(self.stats)
+        return {**stats, "idle_connections": len(self._idle)}
+
+
+# --- caching -------------------------------------------------------------------------
+
+TERMINAL_STATUSES = frozenset({"delivered", "cancelled"})
+
+
+class CachedOrderBackend:
+    """Caches another backend's answers with a TTL chosen by the order's status.
+
+    Terminal statuses (Delivered, Cancelled) never change and are kept for
+    `terminal_ttl`; every other status for `active_ttl`. Unknown order ids are cached
+    as misses for `negative_ttl`. `invalidate()` drops an entry, e.g. when the order
+    service reports a change.
+    """
+
+    def __init__(
+        self,
+        backend: OrderBackend,
+        *,
+        maxsize: int = 10_000,
+        terminal_ttl: float = 6 * 3600,
+        active_ttl: float = 30.0,
+        negative_ttl: float = 60.0,
+    ) -> None:
+        self.backend = backend
+        self.terminal_ttl = terminal_ttl
+        self.active_ttl = active_ttl
+        self.negative_ttl = negative_ttl
+        # Values are status dicts, or None for an order id known not to exist.
+        self.cache: TTLCache[str, dict[str, Any] | None] = TTLCache(maxsize)
+
+    def ttl_for(self, order: Mapping[str, Any]) -> float:
+        status = str(order.get("status") or "").strip().lower()
+        return self.terminal_ttl if status in TERMINAL_STATUSES else self.active_ttl
+
+    def cached(self, order_id: str) -> dict[str, Any] | None:
+        """Cached status, if any; raises OrderNotFound for a cached miss."""
+
+        entry = self.cache.get(str(order_id), _NOT_CACHED)
+        if entry is _NOT_CACHED:
+            return None
+        if entry is None:
+            raise OrderNotFound(str(order_id))
+        return copy.deepcopy(entry)
+
+    def status(self, order_id: str) -> dict[str, Any]:
+        order_id = str(order_id)
+        hit = self.cached(order_id)
+        if hit is not None:
+            return hit
+        try:
+            order = self.backend.status(order_id)
+        except OrderNotFound:
+            self.cache.set(order_id, None, ttl=self.negative_ttl)
+            raise
+        self._store(order_id, order)
+        return copy.deepcopy(order)
+
+    def statuses(self, order_ids: Iterable[str]) -> list[dict[str, Any] | None]:
+        ids = [str(i) for i in order_ids]
+        found, missing = self._lookup(ids)
+        if missing:
+            self._record(found, missing, self.backend.statuses(missing))
+        return [copy.deepcopy(found[i]) for i in ids]
+
+    async def astatus(self, order_id: str) -> dict[str, Any]:
+        order_id = str(order_id)
+        hit = self.cached(order_id)
+        if hit is not None:
+            return hit
+        try:
+            order = await self.backend.astatus(order_id)
+        except OrderNotFound:
+            self.cache.set(order_id, None, ttl=self.negative_ttl)
+            raise
+        self._store(order_id, order)
+        return copy.deepcopy(order)
+
+    async def astatuses(self, order_ids: Iterable[str]) -> list[dict[str, Any] | None]:
+        ids = [str(i) for i in order_ids]
+        found, missing = self._lookup(ids)
+        if missing:
+            self._record(found, missing, await self.backend.astatuses(missing))
+        return [copy.deepcopy(found[i]) for i in ids]
+
+    def invalidate(self, order_id: str) -> bool:
+        return self.cache.invalidate(str(order_id))
+
+    def snapshot(self) -> dict[str, Any]:
+        return self.cache.snapshot()
+
+    def _lookup(self, ids: list[str]) -> tuple[dict[str, dict[str, Any] | None], list[str]]:
+        """Cached entries by id, and the distinct ids that are not cached."""
+
+        found: dict[str, dict[str, Any] | None] = {}
+        for order_id in dict.fromkeys(ids):
+            entry = self.cache.get(order_id, _NOT_CACHED)
+            if entry is not _NOT_CACHED:
+                found[order_id] = entry
+        return found, [i for i in dict.fromkeys(ids) if i not in found]
+
+    def _record(
+        self,
+        found: dict[str, dict[str, Any] | None],
+        missing: list[str],
+        orders: list[dict[str, Any] | None],
+    ) -> None:
+        for order_id, order in zip(missing, orders):
+            if order is None:
+                # Only the ids the backend does not know are cached as misses.
+                self.cache.set(order_id, None, ttl=self.negative_ttl)
+            else:
+                self._store(order_id, order)
+            found[order_id] = order
+
+    def _store(self, order_id: str, order: dict[str, Any]) -> None:
+        self.cache.set(order_id, copy.deepcopy(order), ttl=self.ttl_for(order))
+
+
+_NOT_CACHED: Any = object()
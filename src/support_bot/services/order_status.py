@@ -1,40 +1,113 @@
-# mock order status service.
+# Order status service: delegates to the configured order backend (see order_backend.py).
+# Without ORDER_SERVICE_URL the deterministic mock is used. Order-service lookups go
+# through a status-aware cache unless ORDER_CACHE_SIZE=0; the mock is never cached, as
+# it answers without I/O and its delivery estimates are relative to today.
 
 from __future__ import annotations
 
-import re
-from datetime import datetime, timedelta
-from typing import Any
+import threading
+from typing import Any, Iterable
+
+from support_bot.cache import register_cache_metrics
+from support_bot.config import (
+    order_cache_size,
+    order_cache_ttls,
+    order_service_max_concurrency,
+    order_service_pool_size,
+    order_service_retries,
+    order_service_timeout,
+    order_service_url,
+)
+from support_bot.services.order_backend import (
+    CachedOrderBackend,
+    HttpOrderBackend,
+    MockOrderBackend,
+    OrderBackend,
+)
+
+_BACKEND: OrderBackend | None = None
+_BACKEND_LOCK = threading.Lock()
+
+
+def order_backend() -> OrderBackend:
+    """Return the shared order backend, creating it from the environment on first use."""
+
+    global _BACKEND
+    backend = _BACKEND
+    if backend is None:
+        with _BACKEND_LOCK:
+            if _BACKEND is None:
+                _BACKEND = _backend_from_env()
+            backend = _BACKEND
+    return backend
+
+
+def _backend_from_env() -> OrderBackend:
+    url = order_service_url()
+    if not url:
+        return MockOrderBackend()
+    backend: OrderBackend = HttpOrderBackend(
+        url,
+        pool_size=order_service_pool_size(),
+        max_concurrency=order_service_max_concurrency(),
+        timeout=order_service_timeout(),
+        retries=order_service_retries(),
+    )
+    size = order_cache_size()
+    if size > 0:
+        terminal_ttl, active_ttl, negative_ttl = order_cache_ttls()
+        backend = CachedOrderBackend(
+            backend,
+            maxsize=size,
+            terminal_ttl=terminal_ttl,
+            active_ttl=active_ttl,
+            negative_ttl=negative_ttl,
+        )
+    return backend
+
+
+def set_order_backend(backend: OrderBackend | None) -> None:
+    """Replace the shared backend; None re-reads the environment on next use."""
+
+    global _BACKEND
+    with _BACKEND_LOCK:
+        _BACKEND = backend
+
+
+def invalidate_order(order_id: str) -> bool:
+    """Drop a cached order (e.g. on an order-update webhook); True if it was cached."""
+
+    backend = order_backend()
+    if isinstance(backend, CachedOrderBackend):
+        return backend.invalidate(order_id)
+    return False
+
+
+def order_cache_stats() -> dict[str, Any] | None:
+    backend = order_backend()
+    return backend.snapshot() if isinstance(backend, CachedOrderBackend) else None
+
+
+register_cache_metrics("order", order_cache_stats)
 
 
 def getOrderStatus(order_id: str) -> dict[str, Any]:
+    return order_backend().status(order_id)
+
+
+def getOrderStatuses(order_ids: Iterable[str]) -> list[dict[str, Any] | None]:
+    """Bulk lookup: one status dict per id, in the given order; None for an unknown id."""
+
+    return order_backend().statuses(order_ids)
+
+
+# Async counterparts for the asyncio pipeline (`Executor.aexecute`); each backend
+# decides how to avoid blocking the event loop (see order_backend.py).
+
+
+async def agetOrderStatus(order_id: str) -> dict[str, Any]:
+    return await order_backend().astatus(order_id)
+
 
-    oid = re.sub(r"[^0-9]", "", str(order_id)) or "0"
-    n = int(oid) if oid.isdigit() else 0
-
-    statuses = ["Processing", "Shipped", "Out for delivery", "Delivered", "Cancelled"]
-    status = statuses[n % len(statuses)]
-
-    today = datetime.utcnow().date()
-    if status == "Processing":
-        est = today + timedelta(days=3)
-    elif status == "Shipped":
-        est = today + timedelta(days=2)
-    elif status == "Out for delivery":
-        est = today + timedelta(days=1)
-    elif status == "Delivered":
-        est = today - timedelta(days=1)
-    else:
-        est = None
-
-    mock_items = [
-        {"id": "P1001", "name": "SmartWatch Pro", "qty": 1},
-    ]
-
-    return {
-        "order_id": str(order_id),
-        "status": status,
-        "estimated_delivery": est.isoformat() if est else None,
-        "tracking_id": f"TRK{n:06d}",
-        "items": mock_items,
-    }
+async def agetOrderStatuses(order_ids: Iterable[str]) -> list[dict[str, Any] | None]:
+    return await order_backend().astatuses(order_ids)
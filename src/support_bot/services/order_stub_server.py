@@ -0,0 +1,127 @@
+# Local stand-in for the order service, speaking the protocol of `HttpOrderBackend`.
+#
+# Answers from the deterministic mock, with optional latency and injected failures so
+# pooling, retries and coalescing can be exercised offline:
+#
+#     python -m support_bot.services.order_stub_server --port 8081 --latency 0.02
+#     ORDER_SERVICE_URL=http://127.0.0.1:8081 python -m support_bot.web.app
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from support_bot.services.order_backend import MockOrderBackend
+
+
+class OrderStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int] = ("127.0.0.1", 0),
+        *,
+        latency: float = 0.0,
+        fail_rate: float = 0.0,
+        fail_first: int = 0,
+    ) -> None:
+        super().__init__(address, _Handler)
+        self.backend = MockOrderBackend()
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.fail_first = fail_first
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "OrderStubServer":
+        """Serve on a daemon thread; returns self."""
+
+        threading.Thread(target=self.serve_forever, name="order-stub", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            if self.fail_first > 0:
+                self.fail_first -= 1
+                return True
+        return self.fail_rate > 0 and random.random() < self.fail_rate
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    server: OrderStubServer
+
+    def do_GET(self) -> None:
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        if server._should_fail():
+            self._send(503, {"error": "injected failure"})
+            return
+
+        url = urlsplit(self.path)
+        if url.path == "/orders":
+            ids = [i for i in (parse_qs(url.query).get("ids") or [""])[0].split(",") if i]
+            orders = [server.backend.status(i) if _known(i) else None for i in ids]
+            self._send(200, {"orders": orders})
+        elif url.path.startswith("/orders/"):
+            order_id = unquote(url.path[len("/orders/") :])
+            if _known(order_id):
+                self._send(200, server.backend.status(order_id))
+            else:
+                self._send(404, {"error": "order not found"})
+        else:
+            self._send(404, {"error": "not found"})
+
+    def _send(self, status: int, body: Any) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def _known(order_id: str) -> bool:
+    return any(ch.isdigit() for ch in order_id)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the order service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    args = parser.parse_args(argv)
+
+    server = OrderStubServer((args.host, args.port), latency=args.latency, fail_rate=args.fail_rate)
+    print(f"order stub listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,133 +1,389 @@
 # Loads the product catalog from JSON and performs rule-based keyword search with scoring
 # bg normalization 
+# search scores only the candidates found through the inverted token index, using the
+# per-product text precomputed at load time (catalog_index.py)
 
 from __future__ import annotations
 
-import json
-import re
-from dataclasses import dataclass
+import heapq
+import logging
+import os
+import threading
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Mapping, Sequence
 
-from support_bot.config import products_path
+from support_bot.cache import TTLCache, register_cache_metrics
+from support_bot.config import (
+    catalog_compact,
+    catalog_shards,
+    catalog_snapshot_path,
+    products_path,
+    search_cache_size,
+    search_cache_ttl,
+    search_ranking,
+)
+from support_bot.services.bg_stemmer import normalize_bulgarian
+from support_bot.services.catalog_index import CatalogIndex, ProductText, catalog_language
+from support_bot.services.catalog_loader import LoadReport, iter_products
+from support_bot.services.catalog_snapshot import SnapshotIndex, open_snapshot
+from support_bot.services.compact_products import CompactProducts
+
+if TYPE_CHECKING:
+    from support_bot.services.bm25 import BM25Ranker
+    from support_bot.services.catalog_shards import ShardedCatalog
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SearchPage:
+    """One page of search results plus the total number of matches."""
+
+    items: list[Mapping[str, Any]]
+    total: int
+    offset: int = 0
+    limit: int | None = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.offset + len(self.items) < self.total
+
+
+def _rank_key(scored: tuple[float, int]) -> tuple[float, int]:
+    # Highest score first; equal scores keep catalog order (like a stable sort).
+    score, position = scored
+    return (-score, position)
 
 
 @dataclass(frozen=True)
 class ProductCatalog:
-    products: list[dict[str, Any]]
+    products: Sequence[Mapping[str, Any]]
+    index: CatalogIndex | SnapshotIndex | None = field(default=None, compare=False, repr=False)
+    report: LoadReport | None = field(default=None, compare=False, repr=False)
+    # Alternative ranking engine; None means the rule-based scorer.
+    ranker: BM25Ranker | None = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.index is None:
+            object.__setattr__(self, "index", CatalogIndex.build(self.products, normalize_bulgarian))
 
     @classmethod
-    def load(cls, path: Path | None = None) -> "ProductCatalog":
+    def load(cls, path: Path | None = None, *, compact: bool | None = None) -> "ProductCatalog":
+        """Stream products from a JSON array or JSON Lines file.
+
+        Records and index entries are built one product at a time. Malformed records
+        are skipped and listed in `report`; a missing or unreadable file gives an empty
+        catalog with `report.fatal` set. `compact` (default: `CATALOG_COMPACT`) selects
+        columnar storage.
+        """
+
         p = path or products_path()
+        if compact is None:
+            compact = catalog_compact()
+
+        report = LoadReport(path=str(p))
+        index = CatalogIndex(normalize=normalize_bulgarian, compact=compact)
+        products: CompactProducts | list[Mapping[str, Any]] = CompactProducts() if compact else []
         try:
-            with p.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            if not isinstance(data, list):
-                data = []
-        except Exception:
-            data = []
-        return cls(products=data)
+            for product in iter_products(p, report):
+                products.append(product)
+                index.add(product)
+        except (OSError, UnicodeDecodeError) as e:
+            report.fatal = f"cannot read catalog: {e}"
+        if isinstance(products, CompactProducts):
+            products.freeze()
+        index.freeze()
+
+        if report.fatal or report.skipped:
+            logger.warning(
+                "catalog %s: %d records loaded, %d skipped%s",
+                p,
+                report.records,
+                report.skipped,
+                f" ({report.fatal})" if report.fatal else "",
+            )
+        return cls(products=products, index=index, report=report)
+
+    @classmethod
+    def open(
+        cls,
+        path: Path | None = None,
+        *,
+        snapshot: Path | None = None,
+        compact: bool | None = None,
+        ranking: str | None = None,
+    ) -> "ProductCatalog":
+        """Open the catalog from its compiled snapshot if it is fresh, else from JSON.
+
+        `snapshot` defaults to `CATALOG_SNAPSHOT`; the snapshot is used only if it was
+        compiled from the current contents of `path`. `ranking` defaults to
+        `SEARCH_RANKING`.
+        """
+
+        p = path or products_path()
+        catalog: ProductCatalog | None = None
+        snap_path = snapshot or catalog_snapshot_path()
+        if snap_path is not None:
+            snap = open_snapshot(snap_path, source=p)
+            if snap is not None:
+                report = LoadReport(path=str(snap_path), format="snapshot", records=len(snap.products))
+                catalog = cls(products=snap.products, index=snap.index, report=report)
+        if catalog is None:
+            catalog = cls.load(p, compact=compact)
+        return catalog.with_ranking(ranking or search_ranking())
+
+    def with_ranking(self, ranking: str) -> "ProductCatalog":
+        """Return this catalog ranked by "rules" (the default scorer) or "bm25"."""
+
+        if ranking == "bm25":
+            if self.ranker is not None:
+                return self
+            from support_bot.services.bm25 import BM25Ranker
+
+            return replace(self, ranker=BM25Ranker(self.products, normalize_bulgarian))
+        if ranking == "rules":
+            return self if self.ranker is None else replace(self, ranker=None)
+        raise ValueError(f"unknown ranking: {ranking}")
+
+    def with_shards(self, shards: int | None = None) -> "ShardedCatalog":
+        """Serve this catalog's searches from `shards` worker processes (rules ranking only).
+
+        `shards` defaults to `CATALOG_SHARDS`, else the CPU count. The caller owns the
+        workers: close the returned `ShardedCatalog` when done.
+        """
+
+        from support_bot.services.catalog_shards import ShardedCatalog
+
+        return ShardedCatalog(self, shards or catalog_shards() or os.cpu_count() or 1)
 
     def _normalize_bulgarian(self, word: str) -> str:
-        """Remove Bulgarian articles and case endings for matching.
-        
-        Handles definite articles: та (the-fem), то (the-neut), ят (the-pl), ът (the-masc)
-        Also removes common adjective endings: ски, ска, на, ен, а
+        """Remove Bulgarian articles and case endings for matching (see `bg_stemmer`)."""
+
+        return normalize_bulgarian(word)
+
+    def search(
+        self,
+        keyword: str,
+        language: str = "en",
+        *,
+        limit: int | None = None,
+        offset: int = 0,
+        use_index: bool = True,
+    ) -> list[Mapping[str, Any]]:
+        """Rank products matching `keyword`; see `search_page`."""
+
+        return self.search_page(keyword, language, limit=limit, offset=offset, use_index=use_index).items
+
+    def search_page(
+        self,
+        keyword: str,
+        language: str = "en",
+        *,
+        limit: int | None = None,
+        offset: int = 0,
+        use_index: bool = True,
+    ) -> SearchPage:
+        """Rank products matching `keyword` and return one page of the ranking.
+
+        With a `limit`, only the top `offset + limit` matches are selected (heap-based)
+        instead of sorting every match. Ties keep catalog order.
+
+        By default only the candidates returned by the inverted index are scored.
+        `use_index=False` scores every product (the reference linear scan) with the
+        rule-based scorer, whatever the catalog's ranking engine.
+
+        A product matches a multiword keyword when any of its words matches, so there
+        is no separate word-by-word fallback: a phrase that matches nothing has no word
+        that matches anything either.
         """
-        word = word.lower()
-        original_len = len(word)
-        
-        article_endings = [
-            'ята',
-            'ято',
-            'ятo',
-            'та',
-            'то',
-            'ят',
-            'ът',
-            'ьт',
-        ]
-        
-        # Try each article ending, removing only one
-        for ending in article_endings:
-            if word.endswith(ending) and len(word) > len(ending) + 2:
-                return word[:-len(ending)]
-        # if no article is found, try removing descriptor endings
-        descriptor_endings = ['ската', 'ски', 'ска', 'на', 'ен', 'ни', 'а']
-        for ending in sorted(descriptor_endings, key=len, reverse=True):
-            if word.endswith(ending) and len(word) > len(ending) + 3:
-                return word[:-len(ending)]
-        
-        return word
-
-    def search(self, keyword: str, language: str = "en") -> list[dict[str, Any]]:
-        
+
+        offset = max(0, offset)
+        scored = self._scored(keyword, language, use_index=use_index)
+        if limit is None:
+            ranked = sorted(scored, key=_rank_key)[offset:]
+        else:
+            ranked = heapq.nsmallest(offset + max(0, limit), scored, key=_rank_key)[offset:]
+        items = [self.products[i] for _, i in ranked]
+        return SearchPage(items=items, total=len(scored), offset=offset, limit=limit)
+
+    def _scored(self, keyword: str, language: str, *, use_index: bool = True) -> list[tuple[float, int]]:
+        """(score, position) of every matching product, in catalog order."""
+
         if not keyword:
             return []
-        
-        name_field = "name_bg" if language == "bg" else "name"
-        desc_field = "description_bg" if language == "bg" else "description"
-        
+
+        if self.ranker is not None and use_index:
+            return self.ranker.scored(keyword, language)
+
         keywords = keyword.split()
-        
+
         # Normalize keywords (especially for Bulgarian morphology)
         if language == "bg":
-            normalized_keywords = [self._normalize_bulgarian(kw) for kw in keywords]
+            normalized_keywords = [normalize_bulgarian(kw) for kw in keywords]
         else:
             normalized_keywords = [kw.lower() for kw in keywords]
-        
-        results_with_scores: list[tuple[dict[str, Any], int]] = []
-        
-        for p in self.products:
-            name_text = str(p.get(name_field, "")).lower()
-            desc_text = str(p.get(desc_field, "")).lower()
-            category_text = str(p.get("category", "")).lower()
-            full_text = f"{name_text} {desc_text} {category_text}"
-            
-            if language == "bg":
-                name_words = re.findall(r'[\u0400-\u04FF]+', name_text)
-                desc_words = re.findall(r'[\u0400-\u04FF]+', desc_text)
-                
-                normalized_name_words = [self._normalize_bulgarian(w) for w in name_words]
-                normalized_desc_words = [self._normalize_bulgarian(w) for w in desc_words]
-                
-                normalized_product_text = " ".join(normalized_name_words + normalized_desc_words)
-                normalized_product_text += " " + full_text
-            else:
-                normalized_product_text = full_text
-            
-            match_count = 0
-            for i, norm_kw in enumerate(normalized_keywords):
-                if norm_kw in normalized_product_text:
-                    match_count += 1
-                elif keywords[i].lower() in full_text:
-                    match_count += 1
-            
-            if match_count > 0:
-                bonus = 0
-                for orig_kw in keywords:
-                    if orig_kw.lower() in full_text:
-                        bonus += 2
-                
-                # Extra boost if product name contains the keywords (prioritize name over description)
-                if language == "bg":
-                    name_match_boost = sum(1 for nkw in normalized_keywords if nkw in " ".join(normalized_name_words))
-                    bonus += name_match_boost * 3
-                else:
-                    name_match_boost = sum(1 for kw in keywords if kw.lower() in name_text)
-                    bonus += name_match_boost * 3
-                
-                results_with_scores.append((p, match_count + bonus))
-        
-        results_with_scores.sort(key=lambda x: x[1], reverse=True)
-        results = [p for p, _ in results_with_scores]
-        return results
-
-
-_DEFAULT_CATALOG = ProductCatalog.load()
-
-
-def file_search_products(keyword: str, language: str = "en") -> list[dict[str, Any]]:
+
+        lowered_keywords = [kw.lower() for kw in keywords]
+
+        if use_index:
+            needles = normalized_keywords + lowered_keywords
+            texts = ((i, self.index.text(i, language)) for i in self.index.candidates(needles, language))
+        else:
+            texts = (
+                (i, ProductText.build(p, language, normalize_bulgarian)) for i, p in enumerate(self.products)
+            )
+
+        scored: list[tuple[float, int]] = []
+        for i, text in texts:
+            score = self._score(text, lowered_keywords, normalized_keywords)
+            if score > 0:
+                scored.append((score, i))
+        return scored
+
+    @staticmethod
+    def _score(text: ProductText, lowered_keywords: list[str], normalized_keywords: list[str]) -> int:
+        """Score one product's precomputed text; 0 means it does not match."""
+
+        normalized_product_text = text.normalized_text
+        full_text = text.full_text
+
+        match_count = 0
+        for i, norm_kw in enumerate(normalized_keywords):
+            if norm_kw in normalized_product_text:
+                match_count += 1
+            elif lowered_keywords[i] in full_text:
+                match_count += 1
+
+        if match_count == 0:
+            return 0
+
+        bonus = 0
+        for kw in lowered_keywords:
+            if kw in full_text:
+                bonus += 2
+
+        # Extra boost if product name contains the keywords (prioritize name over description).
+        # For "bg" the name text is the normalized name words; otherwise it is the lowercased name.
+        name_text = text.normalized_name_text
+        name_match_boost = sum(1 for nkw in normalized_keywords if nkw in name_text)
+        bonus += name_match_boost * 3
+
+        return match_count + bonus
+
+
+_DEFAULT_CATALOG: ProductCatalog | None = None
+_DEFAULT_CATALOG_LOCK = threading.Lock()
+
+
+def default_catalog() -> ProductCatalog:
+    """Return the shared catalog, loading it from `products_path()` on first use."""
+
+    global _DEFAULT_CATALOG
+    catalog = _DEFAULT_CATALOG
+    if catalog is None:
+        with _DEFAULT_CATALOG_LOCK:
+            if _DEFAULT_CATALOG is None:
+                _DEFAULT_CATALOG = ProductCatalog.open()
+            catalog = _DEFAULT_CATALOG
+    return catalog
+
+
+def set_default_catalog(catalog: ProductCatalog) -> None:
+    """Atomically replace the shared catalog.
+
+    Callers that already hold the previous catalog (e.g. an in-flight search) keep
+    using it; new calls see the fully built replacement.
+    """
+
+    global _DEFAULT_CATALOG
+    with _DEFAULT_CATALOG_LOCK:
+        _DEFAULT_CATALOG = catalog
+
+
+def warmup() -> ProductCatalog:
+    """Load the shared catalog now (e.g. in a server master before forking workers)."""
+
+    return default_catalog()
+
+
+class SearchCache:
+    """LRU+TTL cache of search pages for the default catalog.
+
+    Keys are the whitespace/case-normalized keyword, the catalog language and the page
+    bounds (search is case-insensitive, so these give identical results). Entries
+    belong to one catalog instance: when the default catalog is swapped, the cache is
+    cleared and late writes for the old catalog land under a dead generation.
+    Cached pages hold tuples, and every hit returns a fresh list.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None) -> None:
+        self.cache: TTLCache[tuple[Any, ...], SearchPage] = TTLCache(maxsize, ttl)
+        self._catalog: ProductCatalog | None = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def page(
+        self,
+        catalog: ProductCatalog,
+        keyword: str,
+        language: str,
+        limit: int | None,
+        offset: int,
+    ) -> SearchPage:
+        generation = self._generation
+        if catalog is not self._catalog:
+            with self._lock:
+                if catalog is not self._catalog:
+                    self.cache.clear()
+                    self._catalog = catalog
+                    self._generation += 1
+                generation = self._generation
+
+        key = (
+            generation,
+            " ".join(keyword.lower().split()),
+            catalog_language(language),
+            limit,
+            max(0, offset),
+        )
+        page = self.cache.get(key)
+        if page is None:
+            page = catalog.search_page(keyword, language, limit=limit, offset=offset)
+            page = replace(page, items=tuple(page.items))
+            self.cache.set(key, page)
+        return replace(page, items=list(page.items))
+
+
+_SEARCH_CACHE = SearchCache(search_cache_size(), search_cache_ttl())
+
+
+def search_cache_stats() -> dict[str, Any]:
+    return _SEARCH_CACHE.cache.snapshot()
+
+
+register_cache_metrics("search", search_cache_stats)
+
+
+def file_search_products(
+    keyword: str,
+    language: str = "en",
+    *,
+    limit: int | None = None,
+    offset: int = 0,
+) -> list[Mapping[str, Any]]:
     """Backwards-compatible function wrapper that supports language parameter."""
 
-    return _DEFAULT_CATALOG.search(keyword, language)
+    return search_products_page(keyword, language, limit=limit, offset=offset).items
+
+
+def search_products_page(
+    keyword: str,
+    language: str = "en",
+    *,
+    limit: int | None = None,
+    offset: int = 0,
+) -> SearchPage:
+    """Like `file_search_products`, but also reports the total number of matches."""
+
+    return _SEARCH_CACHE.page(default_catalog(), keyword, language, limit, offset)
@@ -0,0 +1,218 @@
+"""Async serving entry point: the chat web app as a plain ASGI application.
+
+Same routes, templates and client as the Flask app in `app.py`, but `/api/chat` awaits
+the agent (`arun_user_query`), so a chat waiting on an order backend holds no thread.
+Chat sessions live server-side, keyed by a random cookie.
+
+Serve it with any ASGI server, e.g.:
+
+    uvicorn support_bot.web.asgi:app
+
+or `python -m support_bot.web.asgi`, which uses uvicorn when it is installed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import mimetypes
+import os
+import secrets
+import time
+from http.cookies import SimpleCookie
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from support_bot.cache import TTLCache
+from support_bot.chat.handler import arun_user_query
+from support_bot.config import catalog_reload_interval
+from support_bot.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from support_bot.metrics import REGISTRY
+from support_bot.services.catalog_reloader import start_reloader
+from support_bot.services.product_catalog import warmup
+from support_bot.web.turns import (
+    begin_turn,
+    clean_message,
+    end_turn,
+    get_chat,
+    get_int_env,
+    order_webhook,
+    record_request,
+)
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+WEB_DIR = Path(__file__).parent
+STATIC_DIR = WEB_DIR / "static"
+SESSION_COOKIE = "support_bot_sid"
+MAX_BODY_BYTES = 1 << 20
+# Only these routes read or write the chat session; others (static files, metrics
+# scrapes, webhooks) must not create sessions that push real chats out of the LRU.
+SESSION_ROUTES = {("GET", "/"), ("POST", "/api/chat"), ("POST", "/api/clear")}
+
+
+def _url_for(endpoint: str, filename: str = "") -> str:
+    # The templates only link static files.
+    return f"/static/{filename}" if endpoint == "static" else "/"
+
+
+class ChatApp:
+    """ASGI app serving the chat page, static files and the `/api/...` routes of `app.py`."""
+
+    def __init__(self, *, max_sessions: int | None = None, session_ttl: float | None = None) -> None:
+        self.sessions: TTLCache[str, dict[str, Any]] = TTLCache(
+            max_sessions if max_sessions is not None else get_int_env("CHAT_MAX_SESSIONS", 10_000),
+            session_ttl if session_ttl is not None else get_int_env("CHAT_SESSION_TTL", 24 * 3600),
+        )
+        self.templates = Environment(
+            loader=FileSystemLoader(str(WEB_DIR / "templates")),
+            autoescape=select_autoescape(["html"]),
+        )
+        self.templates.globals["url_for"] = _url_for
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        method, path = scope["method"], scope["path"]
+        headers: list[tuple[bytes, bytes]] = []
+        if (method, path) in SESSION_ROUTES:
+            sid, store, is_new = self._session(scope)
+            if is_new:
+                cookie = f"{SESSION_COOKIE}={sid}; Path=/; HttpOnly; SameSite=Lax"
+                headers.append((b"set-cookie", cookie.encode("latin-1")))
+
+        if method == "GET" and path == "/":
+            html = self.templates.get_template("index.html").render(chat=get_chat(store))
+            status, content_type, body = 200, "text/html; charset=utf-8", html.encode("utf-8")
+        elif method == "GET" and path.startswith("/static/"):
+            status, content_type, body = self._static(path[len("/static/") :])
+        elif method == "GET" and path == "/metrics":
+            status, content_type, body = 200, METRICS_CONTENT_TYPE, REGISTRY.render().encode("utf-8")
+        elif method == "POST" and path == "/api/chat":
+            started = time.perf_counter()
+            status, data = await self._chat(store, receive)
+            record_request("/api/chat", status, started)
+            content_type, body = "application/json", json.dumps(data, ensure_ascii=False).encode("utf-8")
+        elif method == "POST" and path == "/api/webhooks/orders":
+            status, data = await self._order_webhook(scope, receive)
+            content_type, body = "application/json", json.dumps(data).encode("utf-8")
+        elif method == "POST" and path == "/api/clear":
+            store["chat"] = []
+            store.pop("more_products", None)
+            status, content_type, body = 200, "application/json", b'{"ok": true}'
+        else:
+            status, content_type, body = 404, "text/plain; charset=utf-8", b"Not Found"
+
+        if (method, path) in SESSION_ROUTES:
+            # Re-storing refreshes the session's idle timeout.
+            self.sessions.set(sid, store)
+        headers += [(b"content-type", content_type.encode("latin-1")), (b"content-length", str(len(body)).encode())]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    def _session(self, scope: Scope) -> tuple[str, dict[str, Any], bool]:
+        for name, value in scope.get("headers") or []:
+            if name == b"cookie":
+                morsel = SimpleCookie(value.decode("latin-1")).get(SESSION_COOKIE)
+                if morsel is not None:
+                    store = self.sessions.get(morsel.value)
+                    if store is not None:
+                        return morsel.value, store, False
+        return secrets.token_urlsafe(24), {}, True
+
+    async def _chat(self, store: dict[str, Any], receive: Receive) -> tuple[int, dict[str, Any]]:
+        raw = await _read_body(receive)
+        if raw is None:
+            return 413, {"ok": False, "error": "Message is too large."}
+        try:
+            payload = json.loads(raw or b"null")
+        except ValueError:
+            payload = None
+        message, debug = clean_message(payload)
+        if not message:
+            return 400, {"ok": False, "error": "Message is empty."}
+
+        try:
+            query_text, search_offset = begin_turn(store, message)
+            output = await arun_user_query(query_text, debug=debug, search_offset=search_offset)
+            return 200, end_turn(store, query_text, output, debug)
+        except Exception as e:
+            return 500, {"ok": False, "error": f"Server error: {e}"}
+
+    @staticmethod
+    async def _order_webhook(scope: Scope, receive: Receive) -> tuple[int, dict[str, Any]]:
+        token = None
+        for name, value in scope.get("headers") or []:
+            if name == b"x-webhook-token":
+                token = value.decode("latin-1")
+        raw = await _read_body(receive)
+        try:
+            payload = json.loads(raw or b"null")
+        except ValueError:
+            payload = None
+        return order_webhook(token, payload)
+
+    @staticmethod
+    def _static(name: str) -> tuple[int, str, bytes]:
+        path = (STATIC_DIR / name).resolve()
+        if STATIC_DIR.resolve() not in path.parents or not path.is_file():
+            return 404, "text/plain; charset=utf-8", b"Not Found"
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        return 200, content_type, path.read_bytes()
+
+    @staticmethod
+    async def _lifespan(receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # Load the catalog before the first request instead of during it.
+                await asyncio.get_running_loop().run_in_executor(None, warmup)
+                reload_interval = catalog_reload_interval()
+                if reload_interval > 0:
+                    start_reloader(reload_interval)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+async def _read_body(receive: Receive) -> bytes | None:
+    """The request body, or None if it exceeds MAX_BODY_BYTES."""
+
+    chunks: list[bytes] = []
+    size = 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+app = ChatApp()
+
+
+def main() -> None:
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("Serving the ASGI app needs an ASGI server, e.g. `pip install uvicorn`.")
+
+    host = os.getenv("HOST", "127.0.0.1")
+    port = get_int_env("PORT", 5000)
+    uvicorn.run(app, host=host, port=port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Chat turn handling shared by the Flask app (`app.py`) and the ASGI app (`asgi.py`).
+
+`store` is the per-user session mapping: Flask's `session`, or the ASGI app's
+server-side session dict.
+"""
+
+from __future__ import annotations
+
+import hmac
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, MutableMapping
+
+from support_bot.agent.core.models import AgentOutput
+from support_bot.config import order_webhook_token
+from support_bot.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS
+from support_bot.services.order_status import invalidate_order
+
+DEFAULT_MAX_MESSAGES = 30
+DEFAULT_MAX_MESSAGE_CHARS = 2000
+
+# Replies that ask for the next page of the previous product search.
+MORE_WORDS = {"more", "show more", "next", "още", "покажи още", "следващи"}
+
+
+def _utc_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def get_int_env(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+# maximum character limit
+def _truncate(text: str, limit: int) -> str:
+    if text is None:
+        return ""
+    text = str(text)
+    if len(text) <= limit:
+        return text
+    return text[: max(0, limit - 1)] + "…"
+
+
+def get_chat(store: MutableMapping[str, Any]) -> list[dict]:
+    chat = store.get("chat")
+    if not isinstance(chat, list):
+        chat = []
+        store["chat"] = chat
+    return chat
+
+# appends message to session chat history , max of messages 
+def _append_message(store: MutableMapping[str, Any], msg: dict) -> None:
+    chat = get_chat(store)
+    chat.append(msg)
+
+    max_messages = get_int_env("CHAT_MAX_MESSAGES", DEFAULT_MAX_MESSAGES)
+    if max_messages > 0 and len(chat) > max_messages:
+        store["chat"] = chat[-max_messages:]
+
+
+def clean_message(payload: Any) -> tuple[str, bool]:
+    payload = payload if isinstance(payload, dict) else {}
+    message = payload.get("message", "")
+    debug = bool(payload.get("debug", False))
+    max_chars = get_int_env("CHAT_MAX_MESSAGE_CHARS", DEFAULT_MAX_MESSAGE_CHARS)
+    return _truncate(message, max_chars).strip(), debug
+
+
+def begin_turn(store: MutableMapping[str, Any], message: str) -> tuple[str, int]:
+    """Record the user message; returns the query to run and its search offset."""
+
+    # "Show more" paging: a bare "more" continues the previous product search
+    # from where its last reply stopped. Any other message starts over.
+    query_text = message
+    search_offset = 0
+    more = store.pop("more_products", None)
+    if isinstance(more, dict) and message.lower() in MORE_WORDS:
+        query_text = str(more.get("message") or "")
+        search_offset = int(more.get("offset") or 0)
+
+    _append_message(store, {"role": "user", "text": message, "ts": _utc_iso()})
+    return query_text, search_offset
+
+
+def end_turn(store: MutableMapping[str, Any], query_text: str, output: AgentOutput, debug: bool) -> dict:
+    """Record the bot reply; returns the JSON body for the client."""
+
+    reply = output.response_text
+
+    if output.product_page is not None:
+        store["more_products"] = {"message": query_text, "offset": output.product_page["next_offset"]}
+
+    if debug:
+        _append_message(store, {"role": "bot", "text": reply, "ts": _utc_iso(), "debug": output.debug})
+        return {"ok": True, "reply": reply, "debug": output.debug}
+
+    _append_message(store, {"role": "bot", "text": reply, "ts": _utc_iso()})
+    return {"ok": True, "reply": reply}
+
+
+def order_webhook(token: str | None, payload: Any) -> tuple[int, dict]:
+    """Order-update webhook: drop the named orders from the order cache.
+
+    Disabled (404) unless `ORDER_WEBHOOK_TOKEN` is set; callers must send it in the
+    `X-Webhook-Token` header. Body: {"order_id": "..."} or {"order_ids": [...]}.
+    """
+
+    expected = order_webhook_token()
+    if expected is None:
+        return 404, {"ok": False, "error": "Not found."}
+    # compare_digest only takes ASCII str, so compare bytes: any header is then a plain 401.
+    if not token or not hmac.compare_digest(token.encode(), expected.encode()):
+        return 401, {"ok": False, "error": "Invalid webhook token."}
+
+    payload = payload if isinstance(payload, dict) else {}
+    order_ids = payload.get("order_ids")
+    if not isinstance(order_ids, list):
+        order_ids = [payload["order_id"]] if payload.get("order_id") else []
+    if not order_ids:
+        return 400, {"ok": False, "error": "order_id is missing."}
+    invalidated = sum(invalidate_order(str(order_id)) for order_id in order_ids)
+    return 200, {"ok": True, "invalidated": invalidated}
+
+
+def record_request(route: str, status: int, started: float) -> None:
+    """Count a handled request; `started` is its `time.perf_counter()` start."""
+
+    HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, route)
+    HTTP_REQUESTS.inc(route, str(status))
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+# The package is not installed for the test run; import it from the source tree.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from support_bot.agent.archetypes.context_builder import ContextBuilder
+from support_bot.agent.archetypes.critic import Critic
+from support_bot.agent.archetypes.executor import Executor
+from support_bot.agent.archetypes.planner import Planner
+from support_bot.agent.archetypes.reporter import Reporter
+from support_bot.agent.archetypes.run_manager import RunManager
+from support_bot.agent.governance.memory_manager import MemoryManager
+from support_bot.agent.governance.safety_guard import SafetyGuard
+from support_bot.services import product_catalog
+
+
+@pytest.fixture
+def make_agent() -> Callable[..., RunManager]:
+    """Builds a RunManager from fresh parts; keyword arguments replace or add fields."""
+
+    def make(**overrides: Any) -> RunManager:
+        safety = SafetyGuard()
+        parts: dict[str, Any] = {
+            "safety": safety,
+            "context_builder": ContextBuilder(memory=MemoryManager()),
+            "planner": Planner(),
+            "executor": Executor(concurrent=False),
+            "critic": Critic(safety=safety),
+            "reporter": Reporter(),
+        }
+        return RunManager(**{**parts, **overrides})
+
+    return make
+
+
+@pytest.fixture
+def restore_default_catalog():
+    """Lets a test swap the shared default catalog; the previous one is put back after it."""
+
+    previous = product_catalog._DEFAULT_CATALOG
+    yield
+    product_catalog.set_default_catalog(previous)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import io
+import json
+
+from support_bot.agent.archetypes import executor as executor_module
+from support_bot.agent.archetypes.run_manager import ResponseCache
+from support_bot.agent.core.models import AgentInput
+from support_bot.chat.batch import replay
+from support_bot.chat.handler import handle_user_queries
+
+MESSAGES = [
+    "Do you have the Pro model?",
+    "Where is order 12345?",
+    "Do you have the Pro model?",
+    "Status of orders 12345 and 777?",
+    "hello",
+    "Какво е състоянието на поръчка 777?",
+    "pro",
+]
+
+
+def test_run_batch_matches_single_runs_and_shares_tool_calls(monkeypatch, make_agent):
+    agent = make_agent(response_cache=ResponseCache(maxsize=0, ttl=None))
+    expected = [agent.run(AgentInput(user_text=m)) for m in MESSAGES]
+
+    searches: list[str] = []
+    bulk_lookups: list[list[str]] = []
+    search, statuses = executor_module.search_products_page, executor_module.getOrderStatuses
+    monkeypatch.setattr(executor_module, "search_products_page", lambda **kw: searches.append(kw["keyword"]) or search(**kw))
+    monkeypatch.setattr(executor_module, "getOrderStatuses", lambda ids: bulk_lookups.append(ids) or statuses(ids))
+
+    outputs = agent.run_batch([AgentInput(user_text=m) for m in MESSAGES])
+    assert [o.response_text for o in outputs] == [o.response_text for o in expected]
+    assert [o.tools_called for o in outputs] == [o.tools_called for o in expected]
+    assert sorted(searches) == sorted(set(searches))
+    assert bulk_lookups == [["12345", "777"]]
+
+
+def test_handle_user_queries_fans_out_across_processes():
+    replies = handle_user_queries(MESSAGES, processes=2)
+    assert replies == handle_user_queries(MESSAGES)
+    assert len(replies) == len(MESSAGES) and all(isinstance(r, str) for r in replies)
+
+
+def test_replay_streams_jsonl_in_input_order():
+    lines = [
+        json.dumps({"id": 1, "message": "Where is order 12345?"}),
+        "",
+        "not json",
+        json.dumps("pro"),
+        json.dumps({"id": "x", "message": "pro", "search_offset": "a"}),
+    ]
+    out = io.StringIO()
+    assert replay(lines, out, batch_size=2) == 4
+
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert rows[0]["id"] == 1 and "12345" in rows[0]["reply"]
+    assert rows[1]["line"] == 3 and "invalid JSON" in rows[1]["error"]
+    assert "reply" in rows[2] and "id" not in rows[2]
+    assert rows[3] == {"line": 5, "id": "x", "error": "search_offset must be an integer"}
+
+
+
+def test_replay_starts_one_worker_pool_for_all_batches(monkeypatch):
+    from support_bot.chat import batch as batch_module
+
+    pools = []
+    original = batch_module.batch_pool
+    monkeypatch.setattr(batch_module, "batch_pool", lambda processes: pools.append(original(processes)) or pools[-1])
+
+    lines = [json.dumps(message) for message in MESSAGES]
+    out = io.StringIO()
+    assert replay(lines, out, batch_size=3, processes=2) == len(MESSAGES)
+    assert len(pools) == 1
+    assert [json.loads(line)["reply"] for line in out.getvalue().splitlines()] == handle_user_queries(MESSAGES)
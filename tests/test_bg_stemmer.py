@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import pytest
+
+from support_bot.services.bg_stemmer import normalize_bulgarian
+
+
+@pytest.mark.parametrize(
+    "word, stem",
+    [
+        ("Четката", "четка"),  # article "та", lowercased
+        ("електрическата", "електрическа"),  # article wins over "ската"
+        ("часовникът", "часовник"),
+        ("децата", "деца"),
+        ("ята", "ята"),  # too short to strip anything
+        ("хората", "хора"),
+        ("българската", "българска"),  # articles are tried before "ската"
+        ("електрическа", "електриче"),  # longest descriptor ending "ска"
+        ("умна", "умна"),  # descriptors need 4 letters left
+        ("сушилня", "сушилня"),
+        ("зъби", "зъби"),
+        ("", ""),
+    ],
+)
+def test_normalize_bulgarian(word, stem):
+    assert normalize_bulgarian(word) == stem
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from support_bot.services.product_catalog import ProductCatalog
+
+QUERIES = [
+    ("електрическата сушилня", "bg"),
+    ("електрическа четка за зъби", "bg"),
+    ("сушилня", "bg"),
+    ("pro", "en"),
+    ("smart watch", "en"),
+    ("wireless headphones", "en"),
+]
+
+
+def test_bm25_returns_same_matches_as_rules():
+    rules = ProductCatalog.load()
+    bm25 = rules.with_ranking("bm25")
+    for keyword, language in QUERIES:
+        expected = sorted(p["id"] for p in rules.search(keyword, language))
+        assert sorted(p["id"] for p in bm25.search(keyword, language)) == expected, keyword
+
+
+def test_bm25_ranks_name_matches_first():
+    bm25 = ProductCatalog.load().with_ranking("bm25")
+    assert bm25.search("сушилня", "bg")[0]["id"] == "P1100"
+    assert bm25.search("wireless headphones", "en")[0]["id"] == "P1003"
+    page = bm25.search_page("pro", "en", limit=2)
+    assert len(page.items) == 2 and page.total == len(bm25.search("pro", "en"))
+
+
+def test_bm25_counts_each_keyword_once_per_product():
+    # "Surge Protector" has two terms containing "pro"; the exact word still wins.
+    names = [p["name"] for p in ProductCatalog.load().with_ranking("bm25").search("pro", "en")]
+    assert names.index("SmartWatch Pro") < names.index("Surge Protector")
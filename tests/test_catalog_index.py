@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import re
+
+from support_bot.services.product_catalog import ProductCatalog
+
+
+def _queries(catalog: ProductCatalog) -> list[tuple[str, str]]:
+    queries: list[tuple[str, str]] = []
+    for p in catalog.products[:20]:
+        for word in re.findall(r"\w+", p["name"] + " " + p["description"]):
+            queries.append((word, "en"))
+            queries.append((word[1:4], "en"))
+        for word in re.findall(r"[\u0400-\u04FF]+", p["name_bg"] + " " + p["description_bg"]):
+            queries.append((word, "bg"))
+    queries += [
+        ("pro", "en"),
+        ("WATCH", "en"),
+        ("smart watch", "en"),
+        ("електрическата сушилня", "bg"),
+        ("четката за зъби", "bg"),
+        ("часовник Pro", "bg"),
+        ("nothing-like-this", "en"),
+    ]
+    return sorted(set(queries))
+
+
+def test_indexed_search_matches_reference_scan():
+    catalog = ProductCatalog.load()
+    for keyword, language in _queries(catalog):
+        indexed = catalog.search(keyword, language)
+        scanned = catalog.search(keyword, language, use_index=False)
+        assert [p["id"] for p in indexed] == [p["id"] for p in scanned], (keyword, language)
+
+
+def test_substring_inside_token_is_found():
+    catalog = ProductCatalog(
+        products=[
+            {"id": "A", "name": "SmartWatch", "description": "", "category": "Wearables"},
+            {"id": "B", "name": "Pocket Watch", "description": "", "category": "Wearables"},
+        ]
+    )
+    assert [p["id"] for p in catalog.search("watch")] == ["A", "B"]
+
+
+def test_ngram_lookup_finds_same_tokens_as_vocabulary_scan():
+    catalog = ProductCatalog.load()
+    index = catalog.index
+    for language in ("en", "bg"):
+        for token in list(index.postings[language])[:200]:
+            for needle in {token[:3], token[1:5], token[-4:], token}:
+                if len(needle) < 3:
+                    continue
+                assert sorted(index.ngram_tokens(needle, language)) == sorted(index.matching_tokens(needle, language))
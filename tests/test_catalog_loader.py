@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import json
+
+from support_bot.config import default_products_path
+from support_bot.services import catalog_loader
+from support_bot.services.catalog_loader import LoadReport, iter_products
+from support_bot.services.product_catalog import ProductCatalog
+
+
+def _read(path):
+    report = LoadReport(path=str(path))
+    return list(iter_products(path, report)), report
+
+
+def test_streams_json_array_across_small_chunks(monkeypatch):
+    monkeypatch.setattr(catalog_loader, "CHUNK_SIZE", 7)
+    path = default_products_path()
+    products, report = _read(path)
+    assert products == json.loads(path.read_text(encoding="utf-8"))
+    assert report.ok and report.format == "json"
+
+
+def test_malformed_array_record_is_reported_and_skipped(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog_loader, "CHUNK_SIZE", 16)
+    path = tmp_path / "products.json"
+    path.write_text('[{"id": "A"}, 42, {"id": "B" "name": 1}, {"id": "C"}]', encoding="utf-8")
+    products, report = _read(path)
+    assert [p["id"] for p in products] == ["A", "C"]
+    assert report.records == 2 and report.skipped == 2
+    assert report.errors[0].startswith("record 1: expected an object")
+    assert report.errors[1].startswith("record 2:")
+
+
+def test_json_lines_with_bad_line(tmp_path):
+    path = tmp_path / "products.jsonl"
+    path.write_text('{"id": "A"}\n\n{"id": \n{"id": "C"}\n', encoding="utf-8")
+    products, report = _read(path)
+    assert [p["id"] for p in products] == ["A", "C"]
+    assert report.format == "jsonl"
+    assert report.errors == [report.errors[0]] and report.errors[0].startswith("line 3:")
+
+
+def test_missing_or_non_array_file_gives_empty_catalog(tmp_path):
+    catalog = ProductCatalog.load(tmp_path / "missing.json")
+    assert list(catalog.products) == [] and catalog.report.fatal
+
+    path = tmp_path / "products.json"
+    path.write_text('"nope"', encoding="utf-8")
+    catalog = ProductCatalog.load(path)
+    assert list(catalog.products) == [] and catalog.report.fatal
+
+
+def test_unicode_escapes_split_across_chunks(tmp_path, monkeypatch):
+    products = [{"id": f"P{i}", "name": f"Продукт {i} “quoted”"} for i in range(300)]
+    path = tmp_path / "products.json"
+    for indent in (None, 2):
+        # ensure_ascii output is full of \uXXXX escapes that chunk boundaries cut.
+        path.write_text(json.dumps(products, indent=indent), encoding="utf-8")
+        for chunk_size in (7, 64, 1000):
+            monkeypatch.setattr(catalog_loader, "CHUNK_SIZE", chunk_size)
+            loaded, report = _read(path)
+            assert loaded == products
+            assert report.ok
+
+
+def test_json_lines_keep_unicode_line_separators_in_strings(tmp_path):
+    path = tmp_path / "products.jsonl"
+    records = [{"id": "A"}, {"id": "B", "description": "one\u2028two\u2029three\x85four"}, {"id": "C"}]
+    path.write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records), encoding="utf-8")
+    loaded, report = _read(path)
+    assert loaded == records
+    assert report.ok and report.records == 3
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+import os
+
+from support_bot.metrics import REGISTRY
+from support_bot.services import catalog_reloader
+from support_bot.services.catalog_reloader import CatalogReloader
+
+
+def _write(path, products, mtime_ns):
+    path.write_text(json.dumps(products), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_reload_swaps_catalog_on_change(tmp_path):
+    path = tmp_path / "products.json"
+    _write(path, [{"id": "A", "name": "Lamp", "description": "", "category": "Home"}], 1_000_000_000)
+
+    swapped = []
+    reloader = CatalogReloader(path, on_swap=swapped.append)
+    assert reloader.check() is False
+
+    _write(path, [{"id": "B", "name": "Desk Lamp", "description": "", "category": "Home"}], 2_000_000_000)
+    assert reloader.check() is True
+    assert reloader.check() is False
+
+    assert len(swapped) == 1
+    assert [p["id"] for p in swapped[0].search("lamp")] == ["B"]
+    assert reloader.stats.reloads == 1
+    assert reloader.stats.last_duration_s is not None
+
+
+def test_partly_written_or_emptied_file_is_not_swapped_in(tmp_path):
+    path = tmp_path / "products.json"
+    products = [{"id": f"P{i}", "name": f"Lamp {i}", "description": "", "category": "Home"} for i in range(100)]
+    _write(path, products, 1_000_000_000)
+
+    swapped = []
+    reloader = CatalogReloader(path, on_swap=swapped.append)
+    text = json.dumps(products)
+
+    for mtime, partial in enumerate([text[: len(text) // 3], "", text[:-1], text.replace('"P5",', '"P5"')], 2):
+        path.write_text(partial, encoding="utf-8")
+        os.utime(path, ns=(mtime * 1_000_000_000, mtime * 1_000_000_000))
+        assert reloader.check() is False, partial[-20:]
+        assert reloader.stats.last_error
+    assert swapped == []
+
+    # Once the writer finishes, the next tick picks the file up.
+    _write(path, products[:50], 9_000_000_000)
+    assert reloader.check() is True
+    assert len(swapped[0].products) == 50
+
+
+def test_truncated_json_lines_are_not_swapped_in(tmp_path):
+    path = tmp_path / "products.jsonl"
+    path.write_text('{"id": "A"}\n', encoding="utf-8")
+    reloader = CatalogReloader(path, on_swap=lambda catalog: None, max_skipped=5)
+    path.write_text('{"id": "A"}\n{"id": "B", "na', encoding="utf-8")
+    os.utime(path, ns=(5_000_000_000, 5_000_000_000))
+    assert reloader.check() is False
+    assert reloader.stats.last_error == "catalog file ends mid-record"
+
+
+def test_reload_stats_are_exported_as_metrics(tmp_path, monkeypatch):
+    path = tmp_path / "products.json"
+    _write(path, [{"id": "A", "name": "Lamp", "description": "", "category": "Home"}], 1_000_000_000)
+    monkeypatch.setattr(catalog_reloader, "_RELOADER", None)
+    assert "support_bot_catalog_reloads_total{" not in REGISTRY.render()
+
+    reloader = CatalogReloader(path, on_swap=lambda catalog: None)
+    monkeypatch.setattr(catalog_reloader, "_RELOADER", reloader)
+    _write(path, [{"id": "B", "name": "Lamp", "description": "", "category": "Home"}], 2_000_000_000)
+    reloader.check()
+    reloader.check()
+
+    text = REGISTRY.render()
+    assert 'support_bot_catalog_reloads_total{event="check"} 2' in text
+    assert 'support_bot_catalog_reloads_total{event="reload"} 1' in text
+    assert 'support_bot_catalog_reloads_total{event="failure"} 0' in text
+    assert "support_bot_catalog_reload_seconds_total " in text
+    assert "support_bot_catalog_last_reload_seconds " in text
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import pytest
+
+from support_bot.services.catalog_shards import shard_bounds
+from support_bot.services.product_catalog import ProductCatalog
+
+
+def test_shard_bounds_cover_the_catalog():
+    assert shard_bounds(10, 3) == [(0, 4), (4, 7), (7, 10)]
+    assert shard_bounds(2, 4) == [(0, 1), (1, 2)]
+    assert shard_bounds(0, 4) == [(0, 0)]
+
+
+def test_sharded_search_matches_single_process():
+    catalog = ProductCatalog.load()
+    with catalog.with_shards(3) as sharded:
+        for keyword, language in [("pro", "en"), ("a", "en"), ("с", "bg"), ("zzz qqq", "en")]:
+            for limit, offset in [(None, 0), (3, 0), (3, 2), (5, 100)]:
+                expected = catalog.search_page(keyword, language, limit=limit, offset=offset)
+                page = sharded.search_page(keyword, language, limit=limit, offset=offset)
+                assert page == expected
+
+
+def test_sharding_rejects_bm25():
+    with pytest.raises(ValueError):
+        ProductCatalog.load().with_ranking("bm25").with_shards(2)
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import os
+import shutil
+import struct
+
+from support_bot.config import default_products_path
+from support_bot.services import catalog_snapshot
+from support_bot.services.catalog_snapshot import open_snapshot
+from support_bot.services.compile_catalog import compile_snapshot
+from support_bot.services.product_catalog import ProductCatalog
+
+QUERIES = [
+    ("pro", "en"),
+    ("Wireless", "en"),
+    ("smart watch", "en"),
+    ("ch", "en"),
+    ("часовник", "bg"),
+    ("електрическата четка", "bg"),
+    ("GPS", "bg"),
+    ("zzz", "en"),
+]
+
+
+def test_snapshot_search_matches_json_catalog(tmp_path):
+    source = tmp_path / "products.json"
+    shutil.copy(default_products_path(), source)
+    snap = tmp_path / "products.snap"
+    assert compile_snapshot(source, snap) > 0
+
+    from_json = ProductCatalog.load(source)
+    from_snap = ProductCatalog.open(source, snapshot=snap)
+    assert from_snap.report.format == "snapshot"
+    assert list(from_snap.products) == list(from_json.products)
+    for keyword, language in QUERIES:
+        assert from_snap.search(keyword, language) == from_json.search(keyword, language), (keyword, language)
+
+
+def test_stale_snapshot_falls_back_to_json(tmp_path):
+    source = tmp_path / "products.json"
+    shutil.copy(default_products_path(), source)
+    snap = tmp_path / "products.snap"
+    compile_snapshot(source, snap)
+
+    source.write_text('[{"id": "X", "name": "Kettle", "description": "", "category": "Kitchen"}]', encoding="utf-8")
+    assert open_snapshot(snap, source=source) is None
+
+    catalog = ProductCatalog.open(source, snapshot=snap)
+    assert catalog.report.format == "json"
+    assert [p["id"] for p in catalog.search("kettle")] == ["X"]
+
+
+def test_source_is_hashed_only_when_its_mtime_or_size_changed(tmp_path, monkeypatch):
+    source = tmp_path / "products.json"
+    shutil.copy(default_products_path(), source)
+    snap = tmp_path / "products.snap"
+    compile_snapshot(source, snap)
+
+    hashed = []
+    source_hash = catalog_snapshot.source_hash
+    monkeypatch.setattr(catalog_snapshot, "source_hash", lambda path: hashed.append(path) or source_hash(path))
+    assert open_snapshot(snap, source=source) is not None
+    assert hashed == []
+
+    # Touched but unchanged: the hash still matches.
+    os.utime(source, ns=(1_000_000_000, 1_000_000_000))
+    assert open_snapshot(snap, source=source) is not None
+    assert hashed == [source]
+
+
+def test_damaged_snapshot_is_ignored(tmp_path):
+    source = tmp_path / "products.json"
+    shutil.copy(default_products_path(), source)
+    snap = tmp_path / "products.snap"
+    compile_snapshot(source, snap)
+    data = snap.read_bytes()
+    header = catalog_snapshot._HEADER.size
+
+    damaged = [
+        data[: len(data) // 2],  # truncated
+        data[:header] + struct.pack("<QQ", len(data), 8) + data[header + 16 :],  # section past the end
+        data[:header] + struct.pack("<QQ", 0, 8) + data[header + 16 :],  # section over the header
+    ]
+    # A length that is not a whole number of uint64 offsets.
+    record_ends = header + 16
+    offset, length = struct.unpack_from("<QQ", data, record_ends)
+    damaged.append(data[:record_ends] + struct.pack("<QQ", offset, length - 1) + data[record_ends + 16 :])
+    for i, contents in enumerate(damaged):
+        snap.write_bytes(contents)
+        assert open_snapshot(snap, source=source) is None, i
+
+    catalog = ProductCatalog.open(source, snapshot=snap)
+    assert catalog.report.format == "json"
+
+
+def test_snapshot_trigram_lookup_matches_catalog_index(tmp_path):
+    source = tmp_path / "products.json"
+    shutil.copy(default_products_path(), source)
+    snap = tmp_path / "products.snap"
+    compile_snapshot(source, snap)
+
+    index = ProductCatalog.load(source).index
+    snap_index = open_snapshot(snap, source=source).index
+    for language in ("en", "bg"):
+        tokens = sorted(index.postings[language])
+        needles = {t[i : i + n] for t in tokens[::7] for n in (3, 4, 6) for i in range(0, max(1, len(t) - n + 1), 2)}
+        needles |= {"zzzz", "proq", "ръчно"}
+        for needle in sorted(needles):
+            assert snap_index.candidates([needle], language) == index.candidates([needle], language), needle
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from support_bot.services.catalog_index import CompactTexts
+from support_bot.services.compact_products import CompactProducts
+from support_bot.services.product_catalog import ProductCatalog
+
+
+def test_records_read_back_exactly():
+    products = [
+        {"id": "P1", "name": "Lamp", "description": "Desk lamp", "price": 19.5, "category": "Home", "name_bg": "Лампа", "description_bg": "Настолна лампа"},
+        {"id": "P2", "name": "Mug", "price": 5, "category": "Kitchen", "color": "red"},
+        {"id": "P3", "name": None, "description": "", "price": 1.0, "category": "Home", "name_bg": "", "description_bg": ""},
+    ]
+    store = CompactProducts.from_products(products)
+
+    assert len(store) == 3
+    assert [dict(r) for r in store] == products
+    assert list(store[1]) == ["id", "name", "price", "category", "color"]
+    assert store[1].get("description", "") == ""
+    assert store[-1]["name"] is None
+
+
+def test_compact_catalog_search_matches_dict_catalog():
+    plain = ProductCatalog.load(compact=False)
+    compact = ProductCatalog.load(compact=True)
+    for keyword, language in [("pro", "en"), ("wireless", "en"), ("часовник", "bg"), ("четката за зъби", "bg")]:
+        expected = plain.search(keyword, language)
+        got = compact.search(keyword, language)
+        assert [dict(p) for p in got] == expected
+
+
+def test_compact_catalog_keeps_index_text_in_columns():
+    plain = ProductCatalog.load(compact=False)
+    compact = ProductCatalog.load(compact=True)
+    for language in ("en", "bg"):
+        texts = compact.index.texts[language]
+        assert isinstance(texts, CompactTexts)
+        assert list(texts) == plain.index.texts[language]
+        assert texts[-1] == plain.index.text(len(plain.products) - 1, language)
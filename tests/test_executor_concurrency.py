@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from support_bot.agent.archetypes import executor as executor_module
+from support_bot.agent.archetypes.executor import Executor
+from support_bot.agent.core.models import AgentContext, PlanStep, ToolCall
+
+
+def _steps() -> list[PlanStep]:
+    return [
+        PlanStep(kind="tool", tool_call=ToolCall(name="file_search_products", args={"keyword": "pro", "limit": 3})),
+        PlanStep(kind="tool", tool_call=ToolCall(name="getOrderStatus", args={"order_id": "12345"})),
+        PlanStep(kind="tool", tool_call=ToolCall(name="noSuchTool", args={})),
+        PlanStep(kind="respond"),
+    ]
+
+
+def test_concurrent_results_match_sequential():
+    context = AgentContext(language="en", normalized_text="")
+    seq_results, seq_state = Executor(concurrent=False).execute(_steps(), context)
+    par_results, par_state = Executor(concurrent=True).execute(_steps(), context)
+    assert par_results == seq_results
+    assert par_state == seq_state
+    assert [r.name for r in par_results] == ["file_search_products", "getOrderStatus", "noSuchTool"]
+
+
+def test_slow_tool_times_out_without_blocking_others(monkeypatch):
+    release = threading.Event()
+
+    def slow_status(order_id):
+        release.wait(5)
+        return {"order_id": order_id, "status": "Shipped"}
+
+    monkeypatch.setattr(executor_module, "getOrderStatus", slow_status)
+    context = AgentContext(language="en", normalized_text="")
+    started = time.monotonic()
+    try:
+        results, state = Executor(concurrent=True, tool_timeouts={"getOrderStatus": 0.05}).execute(
+            _steps()[:2], context
+        )
+    finally:
+        release.set()
+    assert time.monotonic() - started < 2
+    assert results[0].ok and state.products_found
+    assert not results[1].ok and "timed out" in (results[1].error or "")
+    assert state.order_info is None
+
+
+def test_expired_deadline_skips_sequential_steps():
+    context = AgentContext(language="en", normalized_text="")
+    results, _ = Executor(concurrent=False).execute(_steps()[:2], context, deadline=time.monotonic() - 1)
+    assert [r.error for r in results] == ["deadline exceeded", "deadline exceeded"]
+
+
+def test_async_results_match_sequential():
+    import asyncio
+
+    context = AgentContext(language="en", normalized_text="")
+    expected = Executor(concurrent=False).execute(_steps(), context)
+    assert asyncio.run(Executor().aexecute(_steps(), context)) == expected
+
+
+def test_deadline_is_not_counted_twice_for_later_steps(monkeypatch):
+    import asyncio
+
+    def slow_search(**kwargs):
+        time.sleep(0.4)
+        return search_products_page(**kwargs)
+
+    def slower_status(order_id):
+        time.sleep(0.85)
+        return {"order_id": order_id, "status": "Shipped"}
+
+    async def aslower_status(order_id):
+        await asyncio.sleep(0.85)
+        return {"order_id": order_id, "status": "Shipped"}
+
+    search_products_page = executor_module.search_products_page
+    monkeypatch.setattr(executor_module, "search_products_page", slow_search)
+    monkeypatch.setattr(executor_module, "getOrderStatus", slower_status)
+    monkeypatch.setattr(executor_module, "agetOrderStatus", aslower_status)
+    context = AgentContext(language="en", normalized_text="")
+
+    # Both tools finish within the 1.2s deadline, even though the second is awaited
+    # only after the first one returned.
+    for run in (
+        lambda deadline: Executor(concurrent=True, timeout=None).execute(_steps()[:2], context, deadline=deadline),
+        lambda deadline: asyncio.run(Executor(timeout=None).aexecute(_steps()[:2], context, deadline=deadline)),
+    ):
+        results, state = run(time.monotonic() + 1.2)
+        assert [r.ok for r in results] == [True, True], [r.error for r in results]
+        assert state.order_info["status"] == "Shipped"
+
+
+def test_unknown_ids_in_a_bulk_lookup_do_not_hide_the_known_orders(monkeypatch):
+    from support_bot.agent.archetypes.reporter import Reporter
+
+    def statuses(order_ids):
+        return [{"order_id": i, "status": "Shipped"} if i != "999" else None for i in order_ids]
+
+    monkeypatch.setattr(executor_module, "getOrderStatuses", statuses)
+    call = ToolCall(name="getOrderStatuses", args={"order_ids": ["12", "999", "34"]})
+    steps = [PlanStep(kind="tool", tool_call=call)]
+    context = AgentContext(language="en", normalized_text="")
+    for concurrent in (False, True):
+        results, state = Executor(concurrent=concurrent).execute(steps, context)
+        assert results[0].ok
+        assert [o["order_id"] for o in state.orders] == ["12", "34"]
+        assert state.unknown_order_ids == ["999"]
+        text = Reporter().format(context=context, state=state)
+        assert "Order 12 is currently Shipped." in text and "Order 34" in text
+        assert "couldn't find any order with number 999" in text
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+IMPORT_BUDGET_SECONDS = 0.5
+
+_PROBE = """
+import time
+t0 = time.perf_counter()
+import support_bot
+elapsed = time.perf_counter() - t0
+import sys
+from support_bot.services import product_catalog
+lazy = not {"numpy", "support_bot.services.bm25"} & set(sys.modules)
+print(product_catalog._DEFAULT_CATALOG is None, lazy, elapsed)
+"""
+
+
+def test_import_does_not_load_catalog(tmp_path):
+    # A catalog big enough that parsing it at import would blow the budget.
+    big = tmp_path / "products.json"
+    products = [
+        {"id": f"P{i}", "name": f"Item {i}", "description": "Synthetic product " * 20, "price": 1.0}
+        for i in range(50_000)
+    ]
+    big.write_text(json.dumps(products), encoding="utf-8")
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(Path(__file__).resolve().parents[1] / "src")
+    env["PRODUCTS_PATH"] = str(big)
+    out = subprocess.run([sys.executable, "-c", _PROBE], env=env, capture_output=True, text=True, check=True)
+
+    not_loaded, lazy, elapsed = out.stdout.split()
+    assert not_loaded == "True"
+    # The BM25 engine and NumPy are only imported when SEARCH_RANKING=bm25.
+    assert lazy == "True"
+    assert float(elapsed) < IMPORT_BUDGET_SECONDS
+
+
+def test_default_catalog_loads_once():
+    from support_bot.services import product_catalog
+
+    first = product_catalog.warmup()
+    assert product_catalog.default_catalog() is first
+    assert first.products
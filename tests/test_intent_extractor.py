@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from support_bot.agent.archetypes.context_builder import extract_intent
+
+
+def test_language_order_ids_and_quoted_term():
+    intent = extract_intent("What's the price of the 'Pro' model and status of order #123 and 4567?")
+    assert (intent.language, intent.order_ids, intent.product_term) == ("en", ("123", "4567"), "Pro")
+    assert intent.order_id == "123"
+
+    intent = extract_intent("Имате ли слушалки?")
+    assert (intent.language, intent.order_id, intent.product_term) == ("bg", None, "слушалки")
+
+
+def test_fallback_word_is_whole_word_and_deterministic():
+    # "abc1" and "x_yz" are not whole letter words; "cable" is the only candidate.
+    assert extract_intent("abc1 x_yz cable").product_term == "cable"
+    # Equally short words: the first one in the message wins.
+    assert extract_intent("hello there").product_term == "hello"
+    assert extract_intent("status 12345").product_term is None
+    assert extract_intent("cables").product_term == "cable"
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from support_bot.agent.governance.memory_manager import MemoryManager
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction_and_read_only_contexts():
+    memory = MemoryManager(max_sessions=2, idle_ttl=None, max_bytes=None)
+    memory.store_turn("a", "hi", "hello")
+    memory.store_turn("b", "hi", "hello")
+    assert memory.get_context("a")["last_user_text"] == "hi"  # "a" is now most recent
+    memory.store_turn("c", "hi", "hello")
+
+    assert memory.get_context("b") == {}
+    assert memory.get_context("c")["last_response_text"] == "hello"
+    with pytest.raises(TypeError):
+        memory.get_context("a")["last_user_text"] = "changed"
+    assert memory.get_context(None) == {}
+
+    stats = memory.snapshot()
+    assert (stats["size"], stats["evictions"], stats["hits"], stats["misses"]) == (2, 1, 3, 1)
+
+
+def test_idle_sessions_expire_and_reads_keep_them_alive():
+    clock = FakeClock()
+    memory = MemoryManager(max_sessions=10, idle_ttl=60, max_bytes=None, clock=clock)
+    memory.store_turn("idle", "a", "b")
+    memory.store_turn("busy", "a", "b")
+
+    clock.now = 50
+    assert memory.get_context("busy")
+    clock.now = 100
+    memory.store_turn("new", "a", "b")  # sweeps "idle"
+    assert len(memory) == 2
+    assert memory.get_context("busy")
+    assert memory.get_context("idle") == {}
+    assert memory.snapshot()["expirations"] == 1
+
+
+def test_byte_budget_and_accounting():
+    memory = MemoryManager(max_sessions=100, idle_ttl=None, max_bytes=None)
+    memory.store_turn("s1", "x" * 1000, "y")
+    one_session = memory.bytes
+    assert one_session > 1000
+
+    memory = MemoryManager(max_sessions=100, idle_ttl=None, max_bytes=2 * one_session + 10)
+    for i in range(5):
+        memory.store_turn(f"s{i}", "x" * 1000, "y")
+    assert len(memory) == 2
+    assert memory.bytes <= memory.max_bytes
+    memory.store_turn("s4", "short", "y")  # replacing an entry releases its bytes
+    assert memory.forget("s3") and not memory.forget("s3")
+    assert memory.bytes == memory.snapshot()["bytes"] < one_session
+
+
+def test_concurrent_writers_stay_within_bounds():
+    memory = MemoryManager(max_sessions=50, idle_ttl=None, max_bytes=None)
+
+    def worker(n: int) -> None:
+        for i in range(500):
+            memory.store_turn(f"{n}-{i % 80}", "question", "answer")
+            memory.get_context(f"{n}-{i % 7}")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(memory) == 50
+    assert memory.bytes == sum(size for _, size, _ in memory._store.values())
+
+
+def test_default_agent_memory_is_exported_as_metrics():
+    from support_bot.agent.factory import build_default_agent
+    from support_bot.metrics import REGISTRY
+
+    memory = build_default_agent().context_builder.memory
+    memory.store_turn("metrics-session", "hi", "hello")
+    memory.get_context("metrics-session")
+    stats = memory.snapshot()
+
+    text = REGISTRY.render()
+    assert f"support_bot_session_cache_entries {stats['size']}" in text
+    assert f'support_bot_session_cache_events_total{{event="hits"}} {stats["hits"]}' in text
+    assert f"support_bot_session_memory_bytes {stats['bytes']}" in text
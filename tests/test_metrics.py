@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import pytest
+
+from support_bot.metrics import AGENT_STAGE_SECONDS, TOOL_CALLS, Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.histogram("test_seconds", "Test latency.", ("stage",), buckets=(0.1, 1.0))
+    calls = registry.counter("test_total", "Test calls.", ("outcome",))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value, "plan")
+    calls.inc("ok")
+    calls.inc("ok", amount=2)
+
+    text = registry.render()
+    assert '# TYPE test_seconds histogram' in text
+    assert 'test_seconds_bucket{stage="plan",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{stage="plan",le="1"} 3' in text
+    assert 'test_seconds_bucket{stage="plan",le="+Inf"} 4' in text
+    assert 'test_seconds_count{stage="plan"} 4' in text
+    assert 'test_seconds_sum{stage="plan"} 4.05' in text
+    assert 'test_total{outcome="ok"} 3' in text
+
+    with pytest.raises(ValueError):
+        calls.inc()
+    with pytest.raises(ValueError):
+        registry.counter("test_total", "Duplicate.")
+
+
+def test_callback_metrics_read_their_samples_when_rendered():
+    registry = Registry()
+    stats = {"hits": 1}
+    registry.callback("test_hits_total", "Test hits.", lambda: {("a",): stats["hits"]}, kind="counter", labelnames=("cache",))
+    registry.callback("test_size", "Test size.", lambda: None)
+    stats["hits"] = 5
+
+    text = registry.render()
+    assert "# TYPE test_hits_total counter" in text
+    assert 'test_hits_total{cache="a"} 5' in text
+    assert text.endswith("# TYPE test_size gauge\n")
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    registry.counter("test_total", "Test.", ("tool",)).inc('a"b\\c\nd')
+    assert 'test_total{tool="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+
+def test_metrics_route_reports_agent_stages():
+    from support_bot.web.app import create_app
+
+    client = create_app().test_client()
+    plans_before = AGENT_STAGE_SECONDS.count("plan")
+    calls_before = TOOL_CALLS.value("getOrderStatus", "ok")
+    assert client.post("/api/chat", json={"message": "Where is order 12345?"}).status_code == 200
+    assert AGENT_STAGE_SECONDS.count("plan") == plans_before + 1
+    assert TOOL_CALLS.value("getOrderStatus", "ok") == calls_before + 1
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    text = response.get_data(as_text=True)
+    assert 'support_bot_agent_stage_seconds_count{stage="critic"}' in text
+    assert 'support_bot_tool_seconds_bucket{tool="getOrderStatus",le="+Inf"}' in text
+    assert 'support_bot_http_requests_total{route="/api/chat",status="200"}' in text
@@ -32,3 +32,11 @@ def test_bulgarian_order_status():
     reply, dbg = handle_user_query("Статус на поръчка #12345", debug=True)
     assert "getOrderStatus" in [t["name"] for t in dbg["tools_called"]]
     assert "Поръчка" in reply
+
+
+def test_several_order_ids_are_looked_up_in_one_call():
+    reply, dbg = handle_user_query("Where are my orders #1234, #1235 and #1236?", debug=True)
+    calls = [t for t in dbg["tools_called"] if t["name"].startswith("getOrderStatus")]
+    assert [t["name"] for t in calls] == ["getOrderStatuses"]
+    for order_id in ("1234", "1235", "1236"):
+        assert f"Order {order_id} is currently" in reply
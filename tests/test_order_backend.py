@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from support_bot.services.order_backend import HttpOrderBackend, MockOrderBackend, OrderNotFound
+from support_bot.services.order_stub_server import OrderStubServer
+
+
+@pytest.fixture
+def stub():
+    server = OrderStubServer(latency=0.05).start()
+    yield server
+    server.stop()
+
+
+def test_http_backend_matches_mock_and_reuses_connections(stub):
+    client = HttpOrderBackend(stub.url)
+    mock = MockOrderBackend()
+    assert client.status("12345") == mock.status("12345")
+    repeated = client.statuses(["1234", "1235", "1234"])
+    assert repeated == mock.statuses(["1234", "1235", "1234"])
+    assert repeated[0] is not repeated[2]
+    assert client.statuses(["1234", "abc", "1235"]) == [mock.status("1234"), None, mock.status("1235")]
+    with pytest.raises(OrderNotFound):
+        client.status("abc")
+    assert client.stats.connections_opened == 1
+    client.close()
+
+
+def test_concurrent_lookups_of_one_order_are_coalesced(stub):
+    client = HttpOrderBackend(stub.url)
+    barrier = threading.Barrier(10)
+    results = []
+
+    def lookup():
+        barrier.wait()
+        results.append(client.status("777"))
+
+    threads = [threading.Thread(target=lookup) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(results) == 10 and all(r["order_id"] == "777" for r in results)
+    # Coalesced callers each get their own copy.
+    results[0]["items"].clear()
+    assert all(r["items"] for r in results[1:])
+    assert stub.requests < 10
+    assert client.stats.coalesced == 10 - stub.requests
+    client.close()
+
+
+def test_failed_requests_are_retried(stub):
+    stub.fail_first = 2
+    client = HttpOrderBackend(stub.url, retries=2, backoff=0.001)
+    assert client.status("12345")["order_id"] == "12345"
+    assert client.stats.retries == 2
+    client.close()
+
+
+def test_async_lookups_run_on_the_clients_own_sized_pool(stub):
+    client = HttpOrderBackend(stub.url, max_concurrency=2)
+    mock = MockOrderBackend()
+    ids = [str(1000 + i) for i in range(6)]
+
+    async def lookup_all():
+        return await asyncio.gather(*(client.astatus(i) for i in ids), client.astatuses(["1", "abc"]))
+
+    *singles, bulk = asyncio.run(lookup_all())
+    assert singles == [mock.status(i) for i in ids]
+    assert bulk == [mock.status("1"), None]
+    workers = [t for t in threading.enumerate() if t.name.startswith("order-backend")]
+    assert 0 < len(workers) <= 2
+    client.close()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from support_bot.services.order_backend import CachedOrderBackend, MockOrderBackend, OrderNotFound
+
+
+class _CountingBackend(MockOrderBackend):
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    def status(self, order_id):
+        self.calls.append(order_id)
+        if not any(ch.isdigit() for ch in order_id):
+            raise OrderNotFound(order_id)
+        return super().status(order_id)
+
+    def statuses(self, order_ids):
+        orders = []
+        for order_id in order_ids:
+            try:
+                orders.append(self.status(order_id))
+            except OrderNotFound:
+                orders.append(None)
+        return orders
+
+
+def test_ttl_depends_on_status_and_misses_are_cached():
+    upstream = _CountingBackend()
+    cache = CachedOrderBackend(upstream, terminal_ttl=3600, active_ttl=5, negative_ttl=60)
+
+    delivered = cache.status("1238")  # 1238 % 5 == 3 -> Delivered
+    assert delivered["status"] == "Delivered"
+    assert cache.ttl_for(delivered) == 3600
+    assert cache.ttl_for(cache.status("1235")) == 5  # Processing
+
+    delivered["status"] = "changed by caller"
+    assert cache.status("1238")["status"] == "Delivered"
+    assert cache.statuses(["1235", "1238", "1236"])[2]["status"] == "Shipped"
+    assert upstream.calls == ["1238", "1235", "1236"]
+
+    for _ in range(2):
+        with pytest.raises(OrderNotFound):
+            cache.status("abc")
+    assert upstream.calls.count("abc") == 1
+
+    assert cache.invalidate("1238") is True
+    cache.status("1238")
+    assert upstream.calls.count("1238") == 2
+    assert cache.snapshot()["hits"] >= 3
+
+
+def test_bulk_lookup_caches_only_the_unknown_ids_as_misses():
+    upstream = _CountingBackend()
+    cache = CachedOrderBackend(upstream, negative_ttl=60)
+
+    first = cache.statuses(["1236", "abc", "1239"])
+    assert [o and o["order_id"] for o in first] == ["1236", None, "1239"]
+    assert cache.statuses(["abc", "1239"]) == [None, first[2]]
+    assert upstream.calls == ["1236", "abc", "1239"]
+    with pytest.raises(OrderNotFound):
+        cache.status("abc")
+
+
+def test_async_lookups_share_the_cache():
+    upstream = _CountingBackend()
+    cache = CachedOrderBackend(upstream, negative_ttl=60)
+
+    async def lookups():
+        first = await cache.astatuses(["1236", "abc"])
+        again = await cache.astatus("1236")
+        with pytest.raises(OrderNotFound):
+            await cache.astatus("abc")
+        return first, again
+
+    first, again = asyncio.run(lookups())
+    assert first == [cache.status("1236"), None] and again == first[0]
+    assert upstream.calls == ["1236", "abc"]
+
+
+def test_order_cache_stats_are_exported_as_metrics():
+    from support_bot.metrics import REGISTRY
+    from support_bot.services import order_status
+
+    cache = CachedOrderBackend(_CountingBackend())
+    order_status.set_order_backend(cache)
+    try:
+        cache.status("1236")
+        cache.status("1236")
+        text = REGISTRY.render()
+    finally:
+        order_status.set_order_backend(None)
+    assert 'support_bot_order_cache_events_total{event="hits"} 1' in text
+    assert 'support_bot_order_cache_events_total{event="misses"} 1' in text
+    assert "support_bot_order_cache_entries 1" in text
+
+
+def test_mock_backend_is_not_cached(monkeypatch):
+    # Mock delivery estimates move with the date; a cached one would go stale at midnight.
+    from support_bot.services import order_status
+
+    monkeypatch.delenv("ORDER_SERVICE_URL", raising=False)
+    assert isinstance(order_status._backend_from_env(), MockOrderBackend)
+    monkeypatch.setenv("ORDER_SERVICE_URL", "http://127.0.0.1:9")
+    assert isinstance(order_status._backend_from_env(), CachedOrderBackend)
+
+
+def test_order_webhook_invalidates(monkeypatch):
+    from support_bot.web.app import create_app
+
+    app = create_app()
+    app.testing = True
+    with app.test_client() as c:
+        assert c.post("/api/webhooks/orders", json={"order_id": "1"}).status_code == 404
+        monkeypatch.setenv("ORDER_WEBHOOK_TOKEN", "s3cret")
+        assert c.post("/api/webhooks/orders", json={"order_id": "1"}).status_code == 401
+        r = c.post("/api/webhooks/orders", json={"order_id": "1"}, headers={"X-Webhook-Token": "sécret"})
+        assert r.status_code == 401
+        r = c.post("/api/webhooks/orders", json={"order_ids": ["123"]}, headers={"X-Webhook-Token": "s3cret"})
+        assert r.status_code == 200 and r.get_json()["ok"] is True
+
+
+def test_order_webhook_rejects_non_ascii_token(monkeypatch):
+    from support_bot.web.turns import order_webhook
+
+    monkeypatch.setenv("ORDER_WEBHOOK_TOKEN", "s3cret")
+    assert order_webhook("тайна", {"order_id": "1"})[0] == 401
+    monkeypatch.setenv("ORDER_WEBHOOK_TOKEN", "тайна")
+    assert order_webhook("тайна", {"order_id": "1"})[0] == 200
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import pytest
+
+from support_bot.agent.archetypes import executor as executor_module
+from support_bot.agent.archetypes.run_manager import ResponseCache
+from support_bot.agent.core.models import AgentInput
+from support_bot.services.product_catalog import ProductCatalog, set_default_catalog
+
+
+def _agent(make_agent):
+    return make_agent(response_cache=ResponseCache(maxsize=16, ttl=60))
+
+
+def _count_searches(monkeypatch) -> list[str]:
+    calls: list[str] = []
+    search = executor_module.search_products_page
+
+    def counting_search(keyword, *args, **kwargs):
+        calls.append(keyword)
+        return search(keyword, *args, **kwargs)
+
+    monkeypatch.setattr(executor_module, "search_products_page", counting_search)
+    return calls
+
+
+def test_repeated_product_question_is_served_from_cache(monkeypatch, make_agent):
+    calls = _count_searches(monkeypatch)
+    agent = _agent(make_agent)
+
+    first = agent.run(AgentInput(user_text="Do you have the Pro model?", debug=True))
+    second = agent.run(AgentInput(user_text="  Do you have   the Pro model? ", debug=True))
+    assert len(calls) == 1
+    assert second.response_text == first.response_text
+    assert second.tools_called == first.tools_called
+    assert first.debug["response_cache"]["hit"] is False
+    assert second.debug["response_cache"]["hit"] is True
+    assert second.debug["response_cache"]["hits"] == 1
+    assert [r["stage"] for r in second.debug["trace"]][-2:] == ["cache", "output"]
+
+    # Another page of the same search is a different reply.
+    agent.run(AgentInput(user_text="Do you have the Pro model?", search_offset=3))
+    assert len(calls) == 2
+
+
+def test_order_and_session_queries_bypass_cache(monkeypatch, make_agent):
+    calls = _count_searches(monkeypatch)
+    agent = _agent(make_agent)
+
+    for _ in range(2):
+        output = agent.run(AgentInput(user_text="pro and order 12345", debug=True))
+        assert "response_cache" not in output.debug
+        agent.run(AgentInput(user_text="pro", session_id="s1"))
+    assert len(calls) == 4
+    assert agent.response_cache.snapshot()["size"] == 0
+
+
+@pytest.mark.usefixtures("restore_default_catalog")
+def test_catalog_swap_invalidates_cached_replies(make_agent):
+    products = [
+        {"id": "A", "name": "Pro Phone", "description": "", "category": "phones", "price": 1.0},
+        {"id": "B", "name": "Phone case", "description": "", "category": "cases", "price": 2.0},
+    ]
+    agent = _agent(make_agent)
+    set_default_catalog(ProductCatalog(products))
+    assert "Pro Phone" in agent.run(AgentInput(user_text="phone")).response_text
+    set_default_catalog(ProductCatalog(products[1:]))
+    assert "Pro Phone" not in agent.run(AgentInput(user_text="phone")).response_text
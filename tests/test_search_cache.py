@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import pytest
+
+from support_bot.cache import TTLCache
+from support_bot.metrics import REGISTRY
+from support_bot.services.product_catalog import (
+    ProductCatalog,
+    file_search_products,
+    search_cache_stats,
+    set_default_catalog,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_lru_and_expiry():
+    clock = _Clock()
+    cache: TTLCache[str, int] = TTLCache(2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    cache.set("d", 4, ttl=1)
+    clock.now = 5
+    assert cache.get("d") is None
+    assert cache.get("a") is None  # evicted by "d"
+    assert cache.get("c") == 3
+    clock.now = 11
+    assert cache.get("c") is None
+
+    stats = cache.snapshot()
+    assert (stats["evictions"], stats["expirations"]) == (2, 2)
+
+
+@pytest.mark.usefixtures("restore_default_catalog")
+def test_search_cache_hits_and_catalog_swap():
+    products = [
+        {"id": "A", "name": "Pro Phone", "description": "", "category": "phones", "price": 1.0},
+        {"id": "B", "name": "Phone case", "description": "", "category": "cases", "price": 2.0},
+    ]
+    set_default_catalog(ProductCatalog(products))
+    before = search_cache_stats()["hits"]
+    first = file_search_products("Phone")
+    first.clear()  # callers may mutate their copy
+    again = file_search_products("  phone ")
+    assert [p["id"] for p in again] == ["A", "B"]
+    assert search_cache_stats()["hits"] == before + 1
+    assert f'support_bot_search_cache_events_total{{event="hits"}} {before + 1}' in REGISTRY.render()
+
+    set_default_catalog(ProductCatalog(products[1:]))
+    assert [p["id"] for p in file_search_products("phone")] == ["B"]
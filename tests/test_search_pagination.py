@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from support_bot.agent.archetypes.planner import Planner
+from support_bot.agent.core.models import AgentInput
+from support_bot.services.product_catalog import ProductCatalog
+
+
+def test_top_k_pages_match_full_ranking():
+    catalog = ProductCatalog.load()
+    for keyword, language in [("pro", "en"), ("a", "en"), ("с", "bg")]:
+        full = catalog.search(keyword, language)
+        page = catalog.search_page(keyword, language, limit=3, offset=2)
+        assert page.items == full[2:5]
+        assert page.total == len(full)
+        assert page.has_more == (len(full) > 5)
+        assert catalog.search(keyword, language, offset=len(full)) == []
+
+
+def test_agent_reply_is_paged_with_show_more_hint(make_agent):
+    agent = make_agent(planner=Planner(page_size=2))
+
+    first = agent.run(AgentInput(user_text="pro"))
+    assert first.response_text.count("Price:") == 2
+    assert "Showing 1–2 of 6 matches." in first.response_text
+    assert first.product_page == {"offset": 0, "limit": 2, "total": 6, "next_offset": 2}
+
+    last = agent.run(AgentInput(user_text="pro", search_offset=4))
+    assert last.response_text.count("Price:") == 2
+    assert "Showing" not in last.response_text
+    assert last.product_page is None
+
+
+def test_phrase_search_equals_phrase_then_word_retry():
+    # The agent used to retry a multiword keyword word by word (last word first) when
+    # the phrase matched nothing. A product matches when any word does, so the retry
+    # can never find anything and dropping it leaves every result unchanged.
+    catalog = ProductCatalog.load()
+    queries = [
+        ("wireless pro headphones", "en"),
+        ("zzz qqq", "en"),
+        ("laptop qqq", "en"),
+        ("qqq laptop", "en"),
+        ("слушалки за телефон", "bg"),
+        ("електрическата четка", "bg"),
+    ]
+    for keyword, language in queries:
+        for use_index in (True, False):
+            expected = catalog.search_page(keyword, language, limit=3, use_index=use_index)
+            if not expected.total:
+                words = keyword.split()
+                for word in [words[-1]] + words[:-1]:
+                    expected = catalog.search_page(word, language, limit=3, use_index=use_index)
+                    if expected.total:
+                        break
+            page = catalog.search_page(keyword, language, limit=3, use_index=use_index)
+            assert (page.items, page.total) == (expected.items, expected.total), keyword
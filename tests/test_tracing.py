@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+
+from support_bot.agent.core.models import AgentInput
+from support_bot.agent.core.tracing import NOOP_TRACE, NdjsonExporter, RingBufferExporter, Tracer
+
+
+def test_unsampled_run_records_nothing(make_agent):
+    ring = RingBufferExporter()
+    tracer = Tracer(sample_rate=0.0, exporter=ring)
+    assert tracer.start("agent.run") is NOOP_TRACE
+
+    output = make_agent(tracer=tracer).run(AgentInput(user_text="order 12345"))
+    assert output.trace == []
+    assert ring.snapshot() == []
+
+
+def test_debug_run_keeps_legacy_trace_shape(make_agent):
+    agent = make_agent(tracer=Tracer(sample_rate=0.0, exporter=None))
+    output = agent.run(AgentInput(user_text="order 12345", debug=True))
+    stages = [r["stage"] for r in output.debug["trace"]]
+    assert stages == ["input", "context", "plan", "tool", "report", "critic", "output"]
+    assert all(set(r) == {"ts", "stage", "message", "data"} for r in output.debug["trace"])
+    assert [c["name"] for c in output.debug["tools_called"]] == ["getOrderStatus"]
+
+
+def test_sampled_run_exports_timed_spans(make_agent):
+    ring = RingBufferExporter(capacity=100)
+    make_agent(tracer=Tracer(sample_rate=1.0, exporter=ring)).run(AgentInput(user_text="order 12345"))
+
+    spans = ring.snapshot()
+    root, stages = spans[0], spans[1:]
+    assert root["name"] == "agent.run" and root["parent_id"] is None
+    assert {s["trace_id"] for s in spans} == {root["trace_id"]}
+    assert all(s["parent_id"] == root["span_id"] for s in stages)
+    assert all(s["duration_ns"] >= 0 for s in spans)
+    tool = next(s for s in stages if s["name"] == "tool")
+    assert 0 < tool["duration_ns"] <= root["duration_ns"]
+
+
+def test_ring_buffer_is_bounded_and_ndjson_appends(tmp_path, make_agent):
+    ring = RingBufferExporter(capacity=3)
+    ring.export([{"n": i} for i in range(5)])
+    assert ring.snapshot() == [{"n": 2}, {"n": 3}, {"n": 4}]
+
+    path = tmp_path / "spans.ndjson"
+    agent = make_agent(tracer=Tracer(sample_rate=1.0, exporter=NdjsonExporter(path)))
+    agent.run(AgentInput(user_text="hello"))
+    agent.run(AgentInput(user_text="hello"))
+    agent.tracer.exporter.flush()
+    spans = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len({s["trace_id"] for s in spans}) == 2
+    assert sum(s["name"] == "agent.run" for s in spans) == 2
+
+
+def test_export_failures_do_not_fail_the_run(tmp_path, make_agent):
+    class Broken:
+        def export(self, spans):
+            raise RuntimeError("exporter down")
+
+    output = make_agent(tracer=Tracer(sample_rate=1.0, exporter=Broken())).run(AgentInput(user_text="hello"))
+    assert output.response_text
+
+    # The parent directory does not exist, so every write fails.
+    exporter = NdjsonExporter(tmp_path / "missing" / "spans.ndjson")
+    agent = make_agent(tracer=Tracer(sample_rate=1.0, exporter=exporter))
+    assert agent.run(AgentInput(user_text="order 12345", debug=True)).debug["trace"]
+    exporter.flush()
+    assert exporter.dropped == 1
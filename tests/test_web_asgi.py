@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from support_bot.chat.handler import ahandle_user_query, handle_user_query
+
+
+def _request(app, method: str, path: str, payload=None, cookie: str | None = None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    scope = {"type": "http", "method": method, "path": path, "headers": headers}
+    sent: list[dict] = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start, response = sent
+    headers = dict(start["headers"])
+    return start["status"], headers, response["body"]
+
+
+def test_async_handler_matches_sync():
+    question = "What's the price of the 'Pro' model, and what's the status of order #12345?"
+    reply, dbg = asyncio.run(ahandle_user_query(question, debug=True))
+    sync_reply, sync_dbg = handle_user_query(question, debug=True)
+    assert reply == sync_reply
+    assert dbg["tools_called"] == sync_dbg["tools_called"]
+
+
+def test_asgi_chat_keeps_session_and_pages():
+    from support_bot.web.asgi import ChatApp, SESSION_COOKIE
+
+    app = ChatApp()
+    status, headers, body = _request(app, "POST", "/api/chat", {"message": "pro"})
+    assert status == 200 and json.loads(body)["ok"] is True
+    cookie = headers[b"set-cookie"].decode().split(";")[0]
+    assert cookie.startswith(SESSION_COOKIE + "=")
+
+    status, _, body = _request(app, "POST", "/api/chat", {"message": "   "}, cookie)
+    assert status == 400
+
+    status, _, body = _request(app, "GET", "/", cookie=cookie)
+    assert status == 200 and b"bubble--user" in body
+
+    assert _request(app, "GET", "/static/../asgi.py")[0] == 404
+    assert _request(app, "GET", "/static/app.js")[0] == 200
+
+    status, headers, body = _request(app, "GET", "/metrics")
+    assert status == 200 and headers[b"content-type"].startswith(b"text/plain")
+    assert b'support_bot_http_requests_total{route="/api/chat",status="400"}' in body
+
+
+def test_non_chat_routes_do_not_create_sessions():
+    from support_bot.web.asgi import ChatApp
+
+    app = ChatApp(max_sessions=2)
+    _, headers, _ = _request(app, "POST", "/api/chat", {"message": "pro"})
+    cookie = headers[b"set-cookie"].decode().split(";")[0]
+
+    for path in ["/metrics", "/static/app.js", "/nope", "/metrics"]:
+        _, headers, _ = _request(app, "GET", path)
+        assert b"set-cookie" not in headers
+    _request(app, "POST", "/api/webhooks/orders", {"order_id": "1"})
+    assert len(app.sessions) == 1
+
+    status, headers, body = _request(app, "GET", "/", cookie=cookie)
+    assert b"set-cookie" not in headers and b"bubble--user" in body